@@ -0,0 +1,276 @@
+import os
+import re
+import glob
+import sqlite3
+import logging
+import argparse
+import pytz
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from db_connection import DB_PATH, connect
+from database import DIMENSION_TABLES, DIMENSION_COLUMNS
+from migrations import migrate
+
+# Eski maçların taşındığı aylık arşiv veritabanlarının dizini
+ARCHIVE_DIR = os.getenv('DB_ARCHIVE_DIR', 'db_archive')
+
+# Bu kadar günden eski maçlar ana veritabanından arşive taşınır
+ARCHIVE_HORIZON_DAYS = int(os.getenv('ARCHIVE_HORIZON_DAYS', '90'))
+
+# Türkiye saat dilimi; maç tarihleri bu saate göre tutulur
+TR_TIMEZONE = pytz.timezone('Europe/Istanbul')
+
+ARCHIVE_FILE_PATTERN = re.compile(r'soccer_analysis_(\d{4})_(\d{2})\.db$')
+
+def archive_path(month: str, archive_dir: str = ARCHIVE_DIR) -> str:
+    """'2024-03' ayının arşiv dosyasının yolunu döndürür"""
+    return os.path.join(archive_dir, f"soccer_analysis_{month.replace('-', '_')}.db")
+
+def list_archives(archive_dir: str = ARCHIVE_DIR, start_date: str = None, end_date: str = None) -> List[Tuple[str, str]]:
+    """Tarih aralığıyla kesişen arşivleri (ay, yol) olarak yeniden eskiye sıralı döndürür"""
+    archives = []
+    for path in glob.glob(os.path.join(archive_dir, 'soccer_analysis_*.db')):
+        match = ARCHIVE_FILE_PATTERN.search(path)
+        if not match:
+            continue
+        month = f"{match.group(1)}-{match.group(2)}"
+        if start_date and month < start_date[:7]:
+            continue
+        if end_date and month > end_date[:7]:
+            continue
+        archives.append((month, path))
+    return sorted(archives, reverse=True)
+
+def match_tables(conn, schema: str = 'main') -> List[str]:
+    """match_id sütunu olan tabloları döndürür; matches ilk sıradadır (alt tablolar ona bağlı)"""
+    tables = [
+        row[0] for row in conn.execute(
+            f"SELECT name FROM {schema}.sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        )
+    ]
+    tables = [table for table in tables if 'match_id' in table_columns(conn, table, schema)]
+    return ['matches'] + [table for table in tables if table != 'matches']
+
+def table_columns(conn, table: str, schema: str = 'main') -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")]
+
+def remapped_columns(table: str, columns: List[str], source: str, target: str, alias: str = 't') -> str:
+    """source şemasındaki satırların SELECT listesi; sözlük ID'leri target şemasının ID'lerine çevrilir
+
+    Her veritabanı dosyası sözlük ID'lerini kendisi atar; aynı ad farklı
+    dosyalarda farklı ID alabileceği için ID'ler ad üzerinden eşlenir.
+    """
+    expressions = []
+    for column in columns:
+        dimension = DIMENSION_COLUMNS.get(table, {}).get(column)
+        if dimension is None:
+            expressions.append(f"{alias}.{column}")
+            continue
+        id_column = DIMENSION_TABLES[dimension]
+        expressions.append(
+            f"(SELECT dt.{id_column} FROM {target}.{dimension} dt JOIN {source}.{dimension} ds ON dt.name = ds.name "
+            f"WHERE ds.{id_column} = {alias}.{column}) AS {column}"
+        )
+    return ', '.join(expressions)
+
+def _copy_dimension_names(conn, tables: List[str]):
+    """Arşivlenecek satırların kullandığı lig, takım ve bahis şirketi adlarını arşive ekler"""
+    for dimension, id_column in DIMENSION_TABLES.items():
+        references = [
+            f"SELECT {column} FROM main.{table} WHERE match_id IN (SELECT match_id FROM _archived_ids)"
+            for table in tables
+            for column, column_dimension in DIMENSION_COLUMNS.get(table, {}).items()
+            if column_dimension == dimension
+        ]
+        if not references:
+            continue
+        columns = ', '.join(column for column in table_columns(conn, dimension) if column != id_column)
+        conn.execute(f"""
+            INSERT OR IGNORE INTO archive.{dimension} ({columns})
+            SELECT {columns} FROM main.{dimension}
+            WHERE {id_column} IN ({' UNION '.join(references)})
+        """)
+
+def enable_incremental_vacuum(conn):
+    """Ana veritabanını auto_vacuum=INCREMENTAL'a geçirir (bir kerelik tam VACUUM gerektirir)"""
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+        return
+    logging.info("auto_vacuum=INCREMENTAL etkinleştiriliyor (tek seferlik VACUUM)...")
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("VACUUM")
+
+def _attach_limit() -> int:
+    conn = sqlite3.connect(':memory:')
+    try:
+        return conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+    finally:
+        conn.close()
+
+def _migrate_archive(path: str):
+    """Arşiv şemasını ana veritabanıyla aynı sürüme getirir (güncelse hemen döner)"""
+    archive_conn = connect(path)
+    try:
+        migrate(archive_conn)
+    finally:
+        archive_conn.close()
+
+def _archive_month(conn, month: str, cutoff: str, archive_dir: str) -> int:
+    """Ayın cutoff'tan eski maçlarını ve alt satırlarını arşive kopyalar, sonra ana veritabanından siler"""
+    path = archive_path(month, archive_dir)
+    _migrate_archive(path)
+
+    month_start = f"{month}-01"
+    month_end = (datetime.strptime(month_start, "%Y-%m-%d") + timedelta(days=32)).strftime("%Y-%m-01")
+    conn.execute("ATTACH DATABASE ? AS archive", (path,))
+    try:
+        tables = match_tables(conn)
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS _archived_ids (match_id INTEGER PRIMARY KEY)")
+
+        # Arşiv yazılır ve aynı transaction'da ana veritabanından silinir. WAL
+        # modunda iki dosyanın commit'i tek atomik işlem değildir; arada bir
+        # kesinti olursa satırlar iki tarafta da kalır ve iş tekrar çalışınca
+        # (INSERT OR REPLACE ile) düzelir, veri kaybolmaz.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("""
+                INSERT INTO _archived_ids (match_id)
+                SELECT match_id FROM main.matches
+                WHERE match_date >= ? AND match_date < ? AND match_date < ?
+            """, (month_start, month_end, cutoff))
+            count = conn.execute("SELECT COUNT(*) FROM _archived_ids").fetchone()[0]
+
+            _copy_dimension_names(conn, tables)
+            for table in tables:
+                # id her dosyada ayrı atanır; aynı maç tekrar arşivlenirse doğal anahtar eşleşir
+                columns = [column for column in table_columns(conn, table) if column != 'id']
+                conn.execute(f"""
+                    INSERT OR REPLACE INTO archive.{table} ({', '.join(columns)})
+                    SELECT {remapped_columns(table, columns, 'main', 'archive')} FROM main.{table} t
+                    WHERE t.match_id IN (SELECT match_id FROM _archived_ids)
+                """)
+            for table in reversed(tables):
+                conn.execute(f"DELETE FROM main.{table} WHERE match_id IN (SELECT match_id FROM _archived_ids)")
+            conn.execute("DELETE FROM _archived_ids")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    finally:
+        conn.execute("DETACH DATABASE archive")
+
+    return count
+
+def archive_old_matches(horizon_days: int = ARCHIVE_HORIZON_DAYS, archive_dir: str = ARCHIVE_DIR,
+                        db_path: str = DB_PATH) -> Dict[str, int]:
+    """horizon_days'ten eski maçları aylık arşiv dosyalarına taşır ve boşalan sayfaları geri verir"""
+    os.makedirs(archive_dir, exist_ok=True)
+    cutoff = (datetime.now(TR_TIMEZONE) - timedelta(days=horizon_days)).strftime("%Y-%m-%d")
+
+    conn = connect(db_path)
+    try:
+        migrate(conn)
+        enable_incremental_vacuum(conn)
+
+        months = [
+            row[0] for row in conn.execute(
+                "SELECT DISTINCT substr(match_date, 1, 7) FROM matches WHERE match_date < ? ORDER BY 1", (cutoff,)
+            )
+        ]
+        stats = {}
+        for month in months:
+            stats[month] = _archive_month(conn, month, cutoff, archive_dir)
+            logging.info(f"📦 {month}: {stats[month]} maç arşive taşındı")
+
+        freed = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        # Pragma her adımda bir sayfa bırakır; execute() tek adım çalıştırdığı
+        # için sonuna kadar çalıştıran executescript kullanılır
+        conn.executescript("PRAGMA incremental_vacuum;")
+        logging.info(f"Arşivleme tamamlandı: {sum(stats.values())} maç, {freed} boş sayfa geri verildi")
+        return stats
+    finally:
+        conn.close()
+
+@contextmanager
+def archive_connection(start_date: str = None, end_date: str = None, include_hot: bool = True,
+                       archive_dir: str = ARCHIVE_DIR, db_path: str = DB_PATH,
+                       archives: Optional[List[Tuple[str, str]]] = None) -> Iterator[sqlite3.Connection]:
+    """Ana veritabanı ve tarih aralığındaki arşivler tek veritabanıymış gibi okunabilen bağlantı
+
+    Arşivler ATTACH edilir ve her maç tablosu için aynı adda geçici bir
+    UNION ALL view'ı oluşturulur; geçici nesneler ana tablolardan önce
+    çözümlendiği için mevcut sorgular değiştirilmeden çalışır. Arşiv
+    satırlarının sözlük ID'leri ana veritabanının ID'lerine çevrilir, lig ve
+    takım adları ana veritabanının sözlük tablolarından okunur. SQLite'ın
+    ATTACH sınırı aşılırsa ValueError fırlatılır (query_all gruplar halinde okur).
+    """
+    if archives is None:
+        archives = list_archives(archive_dir, start_date, end_date)
+
+    attach_limit = _attach_limit()
+    if len(archives) > attach_limit:
+        raise ValueError(f"En fazla {attach_limit} arşiv eklenebilir, {len(archives)} istendi")
+
+    conn = connect(db_path)
+    try:
+        schemas = ['main'] if include_hot else []
+        for i, (month, path) in enumerate(archives):
+            _migrate_archive(path)
+            schema = f"archive_{i}"
+            conn.execute("ATTACH DATABASE ? AS " + schema, (path,))
+            schemas.append(schema)
+
+        if archives:
+            for table in match_tables(conn):
+                columns = table_columns(conn, table)
+                union = ' UNION ALL '.join(
+                    f"SELECT {remapped_columns(table, columns, schema, 'main')} FROM {schema}.{table} t"
+                    if schema != 'main' else f"SELECT {', '.join(columns)} FROM main.{table}"
+                    for schema in schemas
+                )
+                conn.execute(f"CREATE TEMP VIEW {table} AS {union}")
+
+        conn.execute("PRAGMA query_only = ON")
+        yield conn
+    finally:
+        conn.close()
+
+def query_all(query: str, params: List[Any] = (), start_date: str = None, end_date: str = None,
+              archive_dir: str = ARCHIVE_DIR, db_path: str = DB_PATH) -> List[tuple]:
+    """Sorguyu ana veritabanı ve aralıktaki bütün arşivlerde çalıştırır
+
+    Arşivler ATTACH sınırına göre yeniden eskiye gruplanır ve her grup ayrı
+    bağlantıda sorgulanır; sonuçlar grup sırasıyla birleştirilir. Bu yüzden
+    tarihe göre azalan (ORDER BY match_date DESC) sıralı sorgularda toplam
+    sıra korunur. Aynı maçın bütün satırları aynı aylık dosyada olduğundan
+    JOIN'ler grup içinde tamamlanır.
+    """
+    archives = list_archives(archive_dir, start_date, end_date)
+    attach_limit = _attach_limit()
+
+    rows = []
+    include_hot = True
+    while include_hot or archives:
+        group, archives = archives[:attach_limit], archives[attach_limit:]
+        with archive_connection(include_hot=include_hot, db_path=db_path, archives=group) as conn:
+            rows.extend(conn.execute(query, params).fetchall())
+        include_hot = False
+    return rows
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('archive.log'),
+            logging.StreamHandler()
+        ]
+    )
+
+    parser = argparse.ArgumentParser(description="Eski maçları aylık arşiv veritabanlarına taşır")
+    parser.add_argument('--horizon-days', type=int, default=ARCHIVE_HORIZON_DAYS,
+                        help="Bu kadar günden eski maçlar arşivlenir")
+    parser.add_argument('--archive-dir', default=ARCHIVE_DIR, help="Arşiv dosyalarının dizini")
+    args = parser.parse_args()
+
+    archive_old_matches(args.horizon_days, args.archive_dir)
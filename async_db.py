@@ -0,0 +1,147 @@
+import time
+import queue
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+from concurrency import percentile
+from database import create_connection
+from metrics import STAGE_METRICS
+
+# Gecikme yüzdelikleri için saklanan son bekleme ölçümü sayısı
+WAIT_SAMPLE_SIZE = 1000
+
+class AsyncDatabase:
+    """asyncio döngüsünü bloklamayan veritabanı cephesi
+
+    Bütün çağrılar tek bir veritabanı thread'inde, tek bağlantı üzerinden ve
+    geliş sırasıyla çalışır; böylece yazımlar tek yerde sıraya girer, event
+    loop da bu sırada ağ isteklerine devam eder. Çağrılan fonksiyon ilk
+    argüman olarak bağlantıyı alır:
+
+        async with AsyncDatabase() as db:
+            existing = await db.run(get_existing_match_ids, match_ids)
+
+    Her çağrının kuyrukta ve çalışırken geçen toplam süresi 'db_wait'
+    aşaması olarak kaydedilir; wait_stats() özetini döndürür.
+    """
+
+    def __init__(self, connection_factory: Callable[[], Any] = create_connection, name: str = 'db'):
+        self.name = name
+        self._connection_factory = connection_factory
+        self._jobs = queue.Queue()
+        self._thread = None
+        self._ready = threading.Event()
+        self._start_error = None
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._wait_total = 0.0
+        self._waits = deque(maxlen=WAIT_SAMPLE_SIZE)
+        self._queued = deque(maxlen=WAIT_SAMPLE_SIZE)
+        self._peak_depth = 0
+
+    def start(self):
+        """Veritabanı thread'ini başlatır ve bağlantı açılana kadar bekler"""
+        if self._thread is not None:
+            return
+        self._ready.clear()
+        self._start_error = None
+        self._thread = threading.Thread(target=self._serve, name=f"{self.name}-writer", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._start_error is not None:
+            self._thread = None
+            raise self._start_error
+
+    def _serve(self):
+        try:
+            conn = self._connection_factory()
+        except Exception as e:
+            self._start_error = e
+            self._ready.set()
+            return
+        self._ready.set()
+
+        try:
+            while True:
+                job = self._jobs.get()
+                if job is None:
+                    return
+                loop, future, submitted, func, args, kwargs = job
+                started = time.perf_counter()
+                with self._lock:
+                    self._queued.append(started - submitted)
+                try:
+                    result, error = func(conn, *args, **kwargs), None
+                except BaseException as e:
+                    result, error = None, e
+                loop.call_soon_threadsafe(_resolve, future, result, error)
+        finally:
+            conn.close()
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """func(conn, *args, **kwargs) çağrısını veritabanı thread'inde çalıştırır ve sonucunu döndürür"""
+        if self._thread is None:
+            raise RuntimeError(f"{self.name} veritabanı thread'i başlatılmadı")
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        submitted = time.perf_counter()
+        self._jobs.put((loop, future, submitted, func, args, kwargs))
+        with self._lock:
+            self._peak_depth = max(self._peak_depth, self._jobs.qsize())
+        try:
+            return await future
+        finally:
+            waited = time.perf_counter() - submitted
+            with self._lock:
+                self._calls += 1
+                self._wait_total += waited
+                self._waits.append(waited)
+            STAGE_METRICS.record('db_wait', waited)
+
+    async def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """func(*args, **kwargs) çağrısını bağlantı vermeden veritabanı thread'inde çalıştırır
+
+        Kendi bağlantısını tutan yazımlar (ör. çalıştırma günlüğü) için: event
+        loop'u bloklamaz ve bekleme süresi run() gibi 'db_wait'e sayılır.
+        """
+        return await self.run(lambda conn: func(*args, **kwargs))
+
+    def close(self):
+        """Kuyruktaki işler bitince thread'i durdurur ve bağlantıyı kapatır"""
+        if self._thread is None:
+            return
+        self._jobs.put(None)
+        self._thread.join()
+        self._thread = None
+
+    async def __aenter__(self) -> 'AsyncDatabase':
+        await asyncio.to_thread(self.start)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await asyncio.to_thread(self.close)
+
+    def wait_stats(self) -> Dict[str, Optional[float]]:
+        """Çağrı sayısı, toplam bekleme ve bekleme/kuyruk sürelerinin yüzdelikleri"""
+        with self._lock:
+            waits = list(self._waits)
+            queued = list(self._queued)
+            return {
+                'calls': self._calls,
+                'wait_seconds': self._wait_total,
+                'p50': percentile(waits, 50),
+                'p95': percentile(waits, 95),
+                'queue_p95': percentile(queued, 95),
+                'peak_depth': self._peak_depth
+            }
+
+def _resolve(future: asyncio.Future, result: Any, error: Optional[BaseException]):
+    # Bekleyen coroutine iptal edildiyse sonuç atılır
+    if future.cancelled():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
@@ -0,0 +1,136 @@
+import sys
+import logging
+import asyncio
+import argparse
+import aiohttp
+from datetime import datetime, timedelta
+from typing import List, Dict, Any
+from tqdm import tqdm
+from bot import ingest_date_async, format_summary, ANALYZE_LIMITER, MAX_CONCURRENT_TASKS
+from async_db import AsyncDatabase
+from migrations import migrate
+from http_client import create_async_session
+from concurrency import RequestBudget
+from journal import IngestJournal, DONE, FAILED
+
+# Aynı anda işlenecek gün sayısı
+DEFAULT_PARALLEL_DAYS = 3
+
+def date_range(start_date: str, end_date: str) -> List[str]:
+    """İki tarih arasındaki (dahil) günleri YYYY-MM-DD olarak döndürür"""
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+    if end < start:
+        raise ValueError(f"Bitiş tarihi başlangıçtan önce: {start_date} > {end_date}")
+    return [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range((end - start).days + 1)]
+
+async def backfill_async(start_date: str, end_date: str, parallel_days: int = DEFAULT_PARALLEL_DAYS,
+                         max_requests: int = None, rate: float = None, retry_failed: bool = False) -> Dict[str, Any]:
+    """Tarih aralığındaki günleri paralel olarak işler
+
+    Tüm günler tek bir eş zamanlılık sınırlayıcısını (ANALYZE_LIMITER) ve tek bir
+    istek bütçesini paylaşır. Her gün çalıştırma günlüğüne yazıldığı için yarıda
+    kesilen bir backfill aynı komutla devam ettirilebilir.
+    """
+    days = date_range(start_date, end_date)
+    budget = RequestBudget(max_requests=max_requests, rate=rate)
+    results = {}
+
+    # Bütün günler tek veritabanı thread'ini paylaşır; yazımlar orada sıraya girer
+    db = AsyncDatabase()
+    await asyncio.to_thread(db.start)
+    # Günlük yazımları da veritabanı thread'inde sıraya girer
+    journal = await db.call(IngestJournal)
+    try:
+        await db.run(migrate)
+
+        # Önceki backfill'de tamamlanmış günler atlanır
+        remaining_days = [day for day in days if retry_failed or not await db.call(journal.is_complete, day)]
+        logging.info(f"🚀 Backfill: {len(days)} gün, {len(days) - len(remaining_days)} gün zaten tamamlanmış")
+
+        day_slots = asyncio.Semaphore(parallel_days)
+        progress = tqdm(total=0, unit='maç', desc='Backfill')
+        failed = 0
+
+        def on_queued(count: int):
+            progress.total += count
+            progress.refresh()
+
+        def on_progress(state: str):
+            nonlocal failed
+            progress.update(1)
+            if state == FAILED:
+                failed += 1
+                progress.set_postfix(başarısız=failed, istek=budget.spent)
+
+        async def run_day(session: aiohttp.ClientSession, day: str):
+            async with day_slots:
+                if budget.exhausted:
+                    return
+                try:
+                    counts = await ingest_date_async(
+                        db, journal, session, day,
+                        limiter=ANALYZE_LIMITER,
+                        worker_count=MAX_CONCURRENT_TASKS,
+                        retry_failed=retry_failed,
+                        budget=budget,
+                        on_queued=on_queued,
+                        on_progress=on_progress
+                    )
+                    results[day] = counts
+                    if counts is not None:
+                        logging.info(format_summary(day, counts))
+                except Exception as e:
+                    logging.error(f"{day} işlenirken hata: {type(e).__name__}: {str(e)}")
+                    results[day] = None
+
+        async with create_async_session() as session:
+            await asyncio.gather(*[run_day(session, day) for day in remaining_days])
+
+        progress.close()
+    finally:
+        await db.call(journal.close)
+        await asyncio.to_thread(db.close)
+
+    done_days = sum(1 for counts in results.values() if counts and counts[DONE] + counts['skipped'] == counts['total'])
+    logging.info(f"✅ Backfill bitti: {done_days}/{len(remaining_days)} gün tamamlandı, "
+                 f"{budget.spent} istek harcandı")
+    db_stats = db.wait_stats()
+    logging.info(f"Veritabanı bekleme: {db_stats['calls']} çağrı, toplam {db_stats['wait_seconds']:.2f}s, "
+                 f"p95 {db_stats['p95'] or 0:.3f}s")
+    if budget.exhausted:
+        logging.warning("⚠️ İstek bütçesi doldu, kalan maçlar için aynı komutu tekrar çalıştırın")
+
+    return {'days': results, 'requests': budget.spent, 'budget_exhausted': budget.exhausted}
+
+def backfill(start_date: str, end_date: str, parallel_days: int = DEFAULT_PARALLEL_DAYS,
+             max_requests: int = None, rate: float = None, retry_failed: bool = False) -> Dict[str, Any]:
+    """Senkron wrapper fonksiyonu"""
+    return asyncio.run(backfill_async(start_date, end_date, parallel_days, max_requests, rate, retry_failed))
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('backfill.log'),
+            logging.StreamHandler()
+        ]
+    )
+
+    parser = argparse.ArgumentParser(description="Tarih aralığı için maç verisi doldurur")
+    parser.add_argument('start_date', help="Başlangıç tarihi (YYYY-MM-DD)")
+    parser.add_argument('end_date', help="Bitiş tarihi (YYYY-MM-DD, dahil)")
+    parser.add_argument('--parallel-days', type=int, default=DEFAULT_PARALLEL_DAYS,
+                        help="Aynı anda işlenecek gün sayısı")
+    parser.add_argument('--max-requests', type=int, default=None,
+                        help="Tüm günler için toplam analyze-match istek bütçesi")
+    parser.add_argument('--rate', type=float, default=None,
+                        help="Saniyedeki en fazla analyze-match isteği")
+    parser.add_argument('--retry-failed', action='store_true',
+                        help="Sadece daha önce başarısız olan maçları yeniden dener")
+    args = parser.parse_args()
+
+    result = backfill(args.start_date, args.end_date, args.parallel_days,
+                      args.max_requests, args.rate, args.retry_failed)
+    sys.exit(0 if not result['budget_exhausted'] else 2)
@@ -0,0 +1,148 @@
+import os
+import sys
+import json
+import time
+import socket
+import sqlite3
+import asyncio
+import logging
+import argparse
+import resource
+import platform
+import tempfile
+import subprocess
+from datetime import datetime
+from typing import Dict, Any, List
+
+# Varsayılan ölçüm boyutları (günlük maç sayısı)
+BENCHMARK_SIZES = [100, 1000, 10000]
+
+# Benchmark'ta kullanılan sabit tarih (sentetik maç ID'leri buna göre üretilir)
+BENCHMARK_DATE = '2024-03-05'
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def _wait_for_port(port: int, timeout: float = 15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Yerel API sunucusu {port} portunda başlamadı")
+
+def _peak_rss_mb() -> float:
+    # Linux'ta ru_maxrss KB, macOS'ta byte cinsindendir
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+def run_single(size: int) -> Dict[str, Any]:
+    """Mevcut dizinde (boş bir veritabanıyla) tek bir boyut için ingest'i ölçer
+
+    Ortam değişkenleri çağıran tarafından yerel sunucuya yönlendirilmiş olmalıdır.
+    """
+    import bot
+    from journal import IngestJournal
+    from metrics import STAGE_METRICS
+
+    logging.getLogger().setLevel(logging.WARNING)
+    STAGE_METRICS.enable()
+
+    started = time.perf_counter()
+    asyncio.run(bot.process_matches_async(target_date=BENCHMARK_DATE))
+    wall_seconds = time.perf_counter() - started
+
+    journal = IngestJournal()
+    try:
+        counts = journal.summary(BENCHMARK_DATE)
+    finally:
+        journal.close()
+
+    limiter_stats = bot.ANALYZE_LIMITER.snapshot()
+    limiter_stats.pop('latencies', None)
+
+    return {
+        'size': size,
+        'wall_seconds': wall_seconds,
+        'matches_per_sec': counts['done'] / wall_seconds if wall_seconds > 0 else None,
+        'peak_rss_mb': _peak_rss_mb(),
+        'counts': counts,
+        'stages': STAGE_METRICS.snapshot(),
+        'limiter': limiter_stats
+    }
+
+def run_benchmark(sizes: List[int] = BENCHMARK_SIZES, stub_args: List[str] = None) -> Dict[str, Any]:
+    """Her boyutu yerel sunucuya karşı ayrı bir süreçte (temiz bellek ve veritabanıyla) çalıştırır"""
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+    stub_args = stub_args or []
+    results = []
+
+    for size in sizes:
+        port = _free_port()
+        stub = subprocess.Popen(
+            [sys.executable, os.path.join(repo_dir, 'stub_api.py'), '--port', str(port),
+             '--matches-per-day', str(size)] + stub_args,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            _wait_for_port(port)
+            with tempfile.TemporaryDirectory(prefix='benchmark_') as work_dir:
+                base_url = f"http://127.0.0.1:{port}"
+                env = {
+                    **os.environ,
+                    'FETCH_MATCHES_URL': f"{base_url}/fetch-matches",
+                    'ANALYZE_MATCH_URL': f"{base_url}/analyze-match",
+                    'API_URL': base_url,
+                    'INGEST_JOURNAL_PATH': os.path.join(work_dir, 'ingest_journal.db'),
+                    'PAYLOAD_ARCHIVE_DIR': os.path.join(work_dir, 'payload_archive'),
+                    'PYTHONPATH': os.pathsep.join(filter(None, [repo_dir, os.environ.get('PYTHONPATH')]))
+                }
+                logging.info(f"⏱️ {size} maç ölçülüyor...")
+                completed = subprocess.run(
+                    [sys.executable, os.path.join(repo_dir, 'benchmark.py'), '--single', str(size)],
+                    cwd=work_dir, env=env, capture_output=True, text=True, check=True
+                )
+                result = json.loads(completed.stdout.strip().splitlines()[-1])
+                logging.info(f"{size} maç: {result['wall_seconds']:.1f} sn, "
+                             f"{result['matches_per_sec'] or 0:.1f} maç/sn, {result['peak_rss_mb']:.0f} MB")
+                results.append(result)
+        finally:
+            stub.terminate()
+            stub.wait()
+
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'stub_args': stub_args,
+        'results': results
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest boru hattını yerel API'ye karşı ölçer")
+    parser.add_argument('--sizes', type=int, nargs='+', default=BENCHMARK_SIZES, help="Günlük maç sayıları")
+    parser.add_argument('--output', default=None, help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument('--single', type=int, default=None, help=argparse.SUPPRESS)
+    args, stub_args = parser.parse_known_args()
+
+    if args.single is not None:
+        # Alt süreç: sonucu stdout'un son satırına JSON olarak yaz
+        print(json.dumps(run_single(args.single)))
+        sys.exit(0)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler()]
+    )
+
+    # Tanınmayan argümanlar yerel sunucuya aktarılır (ör. --analyze-latency lognormal:0.2,0.5)
+    report = json.dumps(run_benchmark(args.sizes, stub_args), indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report)
+    print(report)
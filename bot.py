@@ -1,13 +1,22 @@
-import requests
-import json
-from datetime import datetime
+import os
+import sys
 import time
+import pytz
+from datetime import datetime
 import logging
 import asyncio
 import aiohttp
-from database import create_connection, create_tables, insert_match_info, update_database_schema
-from typing import List, Dict, Any
-from asyncio import Semaphore
+from database import insert_matches_batch, get_existing_match_ids
+from async_db import AsyncDatabase
+from migrations import migrate
+from typing import List, Dict, Any, Callable, Optional
+from concurrency import AdaptiveLimiter, RequestBudget, BudgetExhaustedError
+from retry import retry_call, retry_call_async
+from schemas import decode_fetch_matches, decode_analyze_match, iter_match_ids, PayloadError
+from payload_store import DEFAULT_STORE as PAYLOAD_STORE
+from journal import IngestJournal, PENDING, IN_FLIGHT, FAILED, DONE, SKIPPED
+from metrics import STAGE_METRICS
+from http_client import post, create_async_session
 
 # Logging ayarları
 logging.basicConfig(
@@ -19,175 +28,380 @@ logging.basicConfig(
     ]
 )
 
-# API endpoint'leri
-FETCH_MATCHES_URL = "https://soccer-api-yeni-503570030595.us-central1.run.app/fetch-matches"
-ANALYZE_MATCH_URL = "https://soccer-api-yeni-503570030595.us-central1.run.app/analyze-match"
+# Türkiye saat dilimi ("bugün" bu dilime göre belirlenir)
+TR_TIMEZONE = pytz.timezone('Europe/Istanbul')
+
+# API endpoint'leri (yerel test sunucusu için ortam değişkeniyle değiştirilebilir)
+FETCH_MATCHES_URL = os.getenv('FETCH_MATCHES_URL', "https://soccer-api-yeni-503570030595.us-central1.run.app/fetch-matches")
+ANALYZE_MATCH_URL = os.getenv('ANALYZE_MATCH_URL', "https://soccer-api-yeni-503570030595.us-central1.run.app/analyze-match")
+
+# Eş zamanlı işlem limitleri: adaptif sınırlayıcı başlangıç değerinden başlar,
+# API sağlıklı oldukça MAX_CONCURRENT_TASKS'a kadar büyür
+INITIAL_CONCURRENT_TASKS = 5
+MAX_CONCURRENT_TASKS = 30
+
+# analyze-match uç noktası için adaptif eş zamanlılık sınırlayıcısı
+ANALYZE_LIMITER = AdaptiveLimiter(
+    'analyze-match',
+    initial_limit=INITIAL_CONCURRENT_TASKS,
+    max_limit=MAX_CONCURRENT_TASKS,
+    latency_target=15.0
+)
+
+# Başarısız maçları yeniden deneme modu için ayrı eş zamanlılık bütçesi
+RETRY_FAILED_MAX_CONCURRENT = 5
+RETRY_LIMITER = AdaptiveLimiter(
+    'analyze-match-retry',
+    initial_limit=2,
+    max_limit=RETRY_FAILED_MAX_CONCURRENT,
+    latency_target=15.0
+)
+
+# Tek transaction'da yazılacak en fazla maç sayısı
+WRITE_BATCH_SIZE = 50
 
-# Eş zamanlı işlem limiti
-MAX_CONCURRENT_TASKS = 5
+# Arşivdeki analiz yanıtlarının API'ye gitmeden yeniden kullanılabileceği süre (saniye)
+ANALYZE_CACHE_MAX_AGE = 6 * 3600
+
+# Analiz ve yazma aşamaları arasındaki kuyruğun kapasitesi (geri basınç sınırı)
+PIPELINE_QUEUE_SIZE = 20
+
+def _fetch_daily_matches_once(date_str: str) -> list:
+    """fetch-matches uç noktasına tek bir istek gönderir"""
+    logging.info(f"Maç listesi alınıyor... (Tarih: {date_str})")
+    response = post(FETCH_MATCHES_URL, {"date": date_str})
+    response.raise_for_status()
+    return decode_fetch_matches(response.content)
 
 def fetch_daily_matches(date_str: str) -> list:
     """Günün maç listesini API'den alır"""
-    max_retries = 3
-    retry_delay = 2  # saniye
+    try:
+        started = time.perf_counter()
+        matches = retry_call('fetch-matches', _fetch_daily_matches_once, date_str)
+        STAGE_METRICS.record('fetch_list', time.perf_counter() - started, items=len(matches))
+        logging.info(f"Toplam {len(matches)} maç bulundu")
+        return matches
+    except Exception as e:
+        error_msg = f"Maç listesi alınırken hata oluştu: {type(e).__name__}: {str(e)}"
+        logging.error(error_msg)
+        return []
+
+async def _analyze_match_once(session: aiohttp.ClientSession, match_id: int, limiter: AdaptiveLimiter,
+                              budget: Optional[RequestBudget] = None) -> Dict[str, Any]:
+    """analyze-match uç noktasına tek bir istek gönderir"""
+    logging.info(f"Maç analizi yapılıyor (ID: {match_id})")
+    if budget is not None:
+        await budget.spend_async()
+    # Eş zamanlı istek sayısını adaptif olarak sınırla; geri çekilme beklemeleri hak tutmaz
+    with STAGE_METRICS.timer('analyze'):
+        async with limiter.async_slot():
+            async with session.post(ANALYZE_MATCH_URL, json={"match_id": match_id}) as response:
+                response.raise_for_status()
+                body = await response.read()
     
-    for attempt in range(max_retries):
+    # Zarf ve şema doğrulaması; bozuk alanlar burada reddedilir
+    with STAGE_METRICS.timer('decode'):
+        return decode_analyze_match(body)
+
+async def analyze_match_async(session: aiohttp.ClientSession, match_id: int, limiter: AdaptiveLimiter = ANALYZE_LIMITER,
+                              use_cache: bool = True, budget: Optional[RequestBudget] = None) -> Dict[str, Any]:
+    """Belirli bir maçı eş zamanlı olarak analiz eder"""
+    try:
+        # Yakın zamanda arşivlenmiş bir yanıt varsa API'ye gitme
+        if use_cache:
+            match_analysis = await asyncio.to_thread(PAYLOAD_STORE.get, match_id, ANALYZE_CACHE_MAX_AGE)
+            if match_analysis is not None:
+                logging.info(f"Maç analizi arşivden okundu (ID: {match_id})")
+                return match_analysis
+        
+        match_analysis = await retry_call_async('analyze-match', _analyze_match_once, session, match_id, limiter, budget)
+        # Arşiv hatası başarılı yanıtı kaybettirmez
+        await asyncio.to_thread(PAYLOAD_STORE.try_put, match_id, match_analysis)
+        return match_analysis
+    except BudgetExhaustedError:
+        raise
+    except Exception as e:
+        error_msg = f"Maç analizi sırasında hata oluştu (ID: {match_id}): {type(e).__name__}: {str(e)}"
+        logging.error(error_msg)
+        return None
+
+async def _analyze_worker(session: aiohttp.ClientSession, db: AsyncDatabase, id_queue: asyncio.Queue,
+                          result_queue: asyncio.Queue, limiter: AdaptiveLimiter,
+                          journal: IngestJournal, run_id: str, budget: Optional[RequestBudget] = None):
+    """Kuyruktan maç ID'si alıp analiz eder ve sonucu yazıcı kuyruğuna koyar"""
+    while True:
+        # Bütçe bittiyse kalan maçlar günlükte beklemede kalır, sonraki çalıştırma devam eder
+        if budget is not None and budget.exhausted:
+            return
+        
         try:
-            logging.info(f"Maç listesi alınıyor... (Tarih: {date_str})")
-            response = requests.post(FETCH_MATCHES_URL, json={"date": date_str})
-            response.raise_for_status()
-            data = response.json()
-            
-            if not data:
-                error_msg = "API boş yanıt döndürdü"
-                logging.error(error_msg)
-                if attempt < max_retries - 1:
-                    logging.info(f"Yeniden deneniyor ({attempt + 2}/{max_retries})...")
-                    time.sleep(retry_delay)
-                    continue
-                return []
-            
-            if data.get("status") == "success" and "data" in data and data["data"]:
-                matches = data["data"]
-                logging.info(f"Toplam {len(matches)} maç bulundu")
-                return matches
+            match_id = id_queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        
+        await db.call(journal.mark_in_flight, run_id, match_id)
+        try:
+            match_analysis = await analyze_match_async(session, match_id, limiter, budget=budget)
+        except BudgetExhaustedError:
+            # Maç günlükte bitmemiş (in_flight) kalır, sonraki çalıştırmada yeniden denenir
+            return
+        except Exception as e:
+            logging.error(f"Maç analizi sırasında beklenmeyen hata (ID: {match_id}): {type(e).__name__}: {str(e)}")
+            match_analysis = None
+        
+        # Kuyruk doluysa yazıcı yetişene kadar bekle (geri basınç)
+        await result_queue.put((match_id, match_analysis))
+
+def _mark_states(journal: IngestJournal, run_id: str, states: Dict[int, str], errors: Dict[int, str]):
+    """Grubun maç sonuçlarını günlüğe yazar (veritabanı thread'inde çalışır)
+
+    Tek bir maçın günlük hatası loglanır; diğer maçlar ve yazıcı devam eder.
+    """
+    for match_id, state in states.items():
+        try:
+            if state == DONE:
+                journal.mark_done(run_id, match_id)
             else:
-                error_msg = f"API yanıtı başarısız veya veri yok: {data}"
-                logging.error(error_msg)
-                if attempt < max_retries - 1:
-                    logging.info(f"Yeniden deneniyor ({attempt + 2}/{max_retries})...")
-                    time.sleep(retry_delay)
-                    continue
-                return []
-                
-        except (requests.exceptions.RequestException, json.JSONDecodeError, TypeError, KeyError) as e:
-            error_msg = f"Maç listesi alınırken hata oluştu: {type(e).__name__}: {str(e)}"
-            logging.error(error_msg)
-            
-            if attempt < max_retries - 1:
-                logging.info(f"Yeniden deneniyor ({attempt + 2}/{max_retries})...")
-                time.sleep(retry_delay)
+                journal.mark_failed(run_id, match_id, errors.get(match_id))
+        except Exception as e:
+            logging.error(f"Günlük güncellenemedi (ID: {match_id}): {type(e).__name__}: {str(e)}")
+
+async def _write_results(db: AsyncDatabase, result_queue: asyncio.Queue, journal: IngestJournal, run_id: str,
+                         on_progress: Optional[Callable[[str], None]] = None):
+    """Biten analizleri tamamlanma sırasıyla, gruplar halinde veritabanına yazar
+
+    Kuyrukta bekleyen sonuçlar (en fazla WRITE_BATCH_SIZE) tek transaction'da
+    yazılır; kuyruk boşsa beklemeden eldeki sonuçlar yazılır. Yazım ve günlük
+    güncellemeleri veritabanı thread'inde çalışır, analiz istekleri bu sırada beklemez.
+    """
+    total_rows = 0
+    total_seconds = 0.0
+    stopping = False
+    while not stopping:
+        items = [await result_queue.get()]
+        while len(items) < WRITE_BATCH_SIZE and not result_queue.empty():
+            items.append(result_queue.get_nowait())
+        
+        states = {}
+        errors = {}
+        analyses = []
+        for item in items:
+            if item is None:
+                stopping = True
                 continue
-            return []
+            match_id, match_analysis = item
+            if match_analysis:
+                analyses.append(match_analysis)
+            else:
+                states[match_id] = FAILED
+                errors[match_id] = "Analiz alınamadı"
+                logging.error(f"Maç analizi başarısız (ID: {match_id})")
+        
+        try:
+            if analyses:
+                batch = await db.run(insert_matches_batch, analyses)
+                total_rows += batch['rows']
+                total_seconds += batch['seconds']
+                for match_id in batch['written']:
+                    states[match_id] = DONE
+                for match_id, error_msg in batch['failed'].items():
+                    states[match_id] = FAILED
+                    errors[match_id] = error_msg
+                    logging.error(f"Maç işlenirken hata oluştu (ID: {match_id}): {error_msg}")
+                logging.info(f"{len(batch['written'])} maç analizi kaydedildi ({batch['rows']} satır)")
+        except Exception as e:
+            error_msg = f"{type(e).__name__}: {str(e)}"
+            for match_analysis in analyses:
+                match_id = match_analysis['info']['id']
+                states[match_id] = FAILED
+                errors[match_id] = error_msg
+            logging.error(f"Maç grubu işlenirken hata oluştu: {error_msg}")
+        
+        try:
+            # Günlük güncellemeleri grup başına tek çağrıyla
+            await db.call(_mark_states, journal, run_id, states, errors)
+        finally:
+            for item in items:
+                result_queue.task_done()
+                if item is not None and on_progress is not None:
+                    on_progress(states.get(item[0], FAILED))
     
-    return []
+    if total_seconds > 0:
+        logging.info(f"Veritabanı yazımı: {total_rows} satır, {total_rows / total_seconds:.0f} satır/sn")
 
-async def analyze_match_async(session: aiohttp.ClientSession, match_id: int, semaphore: Semaphore) -> Dict[str, Any]:
-    """Belirli bir maçı eş zamanlı olarak analiz eder"""
-    max_retries = 3
-    retry_delay = 2
+async def _wait_with_writer(writer: asyncio.Task, tasks: List[asyncio.Task]):
+    """tasks bitene kadar bekler; yazıcı bu sırada durursa hatasını yükseltir
+
+    Yazıcı ölürse sınırlı sonuç kuyruğu dolar ve analizler put() üzerinde
+    sonsuza kadar bekler; bu yüzden analizler tek başına beklenmez.
+    """
+    pending = set(tasks)
+    while pending:
+        done, _ = await asyncio.wait(pending | {writer}, return_when=asyncio.FIRST_COMPLETED)
+        if writer in done:
+            # Yazıcı durma sinyalinden önce bitmez; bittiyse hata almıştır
+            writer.result()
+            raise RuntimeError("Sonuç yazıcısı beklenmedik şekilde durdu")
+        for task in done:
+            task.result()
+        pending -= done
+
+async def _collect_match_ids(db: AsyncDatabase, journal: IngestJournal, run_id: str, matches: list, resumed: bool) -> int:
+    """Maç listesini günlüğe kaydeder ve geçersiz kayıt sayısını döndürür"""
+    invalid_count = 0
+    match_ids = []
+    for _, match_id in iter_match_ids(matches):
+        if isinstance(match_id, PayloadError):
+            logging.error(f"Geçersiz maç verisi: {str(match_id)}")
+            invalid_count += 1
+        else:
+            match_ids.append(match_id)
     
-    async with semaphore:  # Eş zamanlı işlem sayısını sınırla
-        for attempt in range(max_retries):
-            try:
-                logging.info(f"Maç analizi yapılıyor (ID: {match_id})")
-                async with session.post(ANALYZE_MATCH_URL, json={"match_id": match_id}) as response:
-                    response.raise_for_status()
-                    data = await response.json()
-                    
-                    if data.get("status") == "success" and "data" in data:
-                        return data["data"]
-                    else:
-                        error_msg = f"Maç analizi başarısız: {data}"
-                        logging.error(error_msg)
-                        
-                        if attempt < max_retries - 1:
-                            logging.info(f"Yeniden deneniyor ({attempt + 2}/{max_retries})...")
-                            await asyncio.sleep(retry_delay)
-                            continue
-                        return None
-                        
-            except Exception as e:
-                error_msg = f"Maç analizi sırasında hata oluştu (ID: {match_id}): {type(e).__name__}: {str(e)}"
-                logging.error(error_msg)
-                
-                if attempt < max_retries - 1:
-                    logging.info(f"Yeniden deneniyor ({attempt + 2}/{max_retries})...")
-                    await asyncio.sleep(retry_delay)
-                    continue
-                return None
+    await db.call(journal.register, run_id, match_ids)
     
-    return None
+    # Veritabanında zaten olan maçları tek sorguda bul, farkı bellekte al.
+    # Devam modunda bu çalıştırmanın kaydettiği maçlar günlükte zaten 'done' durumundadır.
+    existing_ids = await db.run(get_existing_match_ids, match_ids)
+    await db.call(journal.mark_skipped, run_id, existing_ids)
+    
+    if existing_ids and not resumed:
+        logging.info(f"{len(existing_ids)} maç zaten veritabanında mevcut, atlanıyor...")
+    
+    return invalid_count
 
-async def process_matches_async():
-    """Günün maçlarını eş zamanlı olarak işler"""
+async def ingest_date_async(db: AsyncDatabase, journal: IngestJournal, session: aiohttp.ClientSession, target_date: str,
+                            limiter: AdaptiveLimiter = ANALYZE_LIMITER, worker_count: int = MAX_CONCURRENT_TASKS,
+                            retry_failed: bool = False, budget: Optional[RequestBudget] = None,
+                            on_queued: Optional[Callable[[int], None]] = None,
+                            on_progress: Optional[Callable[[str], None]] = None) -> Optional[Dict[str, int]]:
+    """Tek bir günün maçlarını günlük üzerinden analiz edip kaydeder
+
+    Maç bulunamazsa None, aksi halde günlük özetini (ve geçersiz kayıt sayısını) döndürür.
+    """
+    run_id = target_date
+    resumed = await db.call(journal.start_run, run_id, target_date)
+    invalid_count = 0
+    
+    if retry_failed:
+        match_ids = await db.call(journal.match_ids, run_id, [FAILED])
+        logging.info(f"{target_date} tarihi için {len(match_ids)} başarısız maç yeniden denenecek")
+    else:
+        # Günün maçlarını al (senkron istek, event loop'u bloklamasın)
+        matches = await asyncio.to_thread(fetch_daily_matches, target_date)
+        
+        if not matches and not resumed:
+            logging.warning(f"{target_date} tarihi için maç bulunamadı")
+            return None
+        
+        if matches:
+            logging.info(f"{target_date} tarihi için {len(matches)} maç bulundu")
+            invalid_count = await _collect_match_ids(db, journal, run_id, matches, resumed)
+        else:
+            logging.warning("Maç listesi alınamadı, günlükteki bekleyen maçlarla devam ediliyor")
+        
+        # Yarıda kalmış (in_flight) maçlar da bitmemiş sayılır
+        match_ids = await db.call(journal.match_ids, run_id, [PENDING, IN_FLIGHT])
+    
+    if on_queued is not None:
+        on_queued(len(match_ids))
+    
+    # Analiz edilecek maçların kuyruğu
+    id_queue = asyncio.Queue()
+    for match_id in match_ids:
+        id_queue.put_nowait(match_id)
+    
+    # Analiz sonuçları için sınırlı kuyruk: yazıcı geride kalırsa analizler bekler
+    result_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    
+    writer = asyncio.create_task(_write_results(db, result_queue, journal, run_id, on_progress))
+    workers = [
+        asyncio.create_task(_analyze_worker(session, db, id_queue, result_queue, limiter, journal, run_id, budget))
+        for _ in range(min(worker_count, id_queue.qsize()))
+    ]
+    
+    stop = None
     try:
-        # Veritabanı bağlantısını oluştur
-        conn = create_connection()
-        create_tables(conn)
-        update_database_schema(conn)
-        
-        # Bugünün tarihini al
-        today = datetime.now().strftime("%Y-%m-%d")
-        
-        # Günün maçlarını al
-        matches = fetch_daily_matches(today)
-        
-        if not matches:
-            error_msg = f"{today} tarihi için maç bulunamadı"
-            logging.warning(error_msg)
-            return error_msg
-        
-        logging.info(f"{today} tarihi için {len(matches)} maç bulundu")
-        
-        # İstatistikler
-        successful_analyses = 0
-        failed_analyses = 0
-        skipped_analyses = 0
-        
-        # Semaphore oluştur
-        semaphore = Semaphore(MAX_CONCURRENT_TASKS)
-        
-        async with aiohttp.ClientSession() as session:
-            tasks = []
-            
-            for match in matches:
-                try:
-                    match_id = match[0]
-                except (IndexError, TypeError) as e:
-                    logging.error(f"Geçersiz maç verisi: {match}, Hata: {type(e).__name__}: {str(e)}")
-                    failed_analyses += 1
-                    continue
-                
-                # Veritabanında kontrol et
-                cursor = conn.cursor()
-                cursor.execute("SELECT match_id FROM matches WHERE match_id = ?", (match_id,))
-                existing_match = cursor.fetchone()
-                
-                if existing_match:
-                    logging.info(f"Maç zaten veritabanında mevcut (ID: {match_id}), atlanıyor...")
-                    skipped_analyses += 1
-                    continue
-                
-                # Analiz görevini ekle
-                task = asyncio.create_task(analyze_match_async(session, match_id, semaphore))
-                tasks.append((match_id, task))
-            
-            # Tüm görevleri bekle
-            for match_id, task in tasks:
-                try:
-                    match_analysis = await task
-                    if match_analysis:
-                        insert_match_info(conn, match_analysis)
-                        logging.info(f"Maç analizi başarıyla kaydedildi (ID: {match_id})")
-                        successful_analyses += 1
-                    else:
-                        logging.error(f"Maç analizi başarısız (ID: {match_id})")
-                        failed_analyses += 1
-                except Exception as e:
-                    logging.error(f"Maç işlenirken hata oluştu (ID: {match_id}): {type(e).__name__}: {str(e)}")
-                    failed_analyses += 1
-        
-        # İşlem özetini oluştur
-        summary = f"""
-        📊 Analiz Özeti ({today}):
-        ✅ Başarılı: {successful_analyses}
-        ❌ Başarısız: {failed_analyses}
-        ⏭️ Atlanan: {skipped_analyses}
-        📈 Toplam: {len(matches)}
+        await _wait_with_writer(writer, workers)
+        # Analizler bitti, yazıcıya durma sinyali gönder
+        stop = asyncio.create_task(result_queue.put(None))
+        await _wait_with_writer(writer, [stop])
+        await writer
+    finally:
+        # Hata durumunda kalan analizler ve yazıcı iptal edilir
+        for task in workers + [writer] + ([stop] if stop else []):
+            if not task.done():
+                task.cancel()
+    
+    counts = await db.call(journal.summary, run_id)
+    if counts[PENDING] + counts[IN_FLIGHT] == 0:
+        await db.call(journal.finish_run, run_id)
+    counts['invalid'] = invalid_count
+    return counts
+
+def format_summary(target_date: str, counts: Dict[str, int]) -> str:
+    """Günlük özetinden analiz özeti mesajını oluşturur"""
+    return f"""
+        📊 Analiz Özeti ({target_date}):
+        ✅ Başarılı: {counts[DONE]}
+        ❌ Başarısız: {counts[FAILED] + counts['invalid']}
+        ⏭️ Atlanan: {counts[SKIPPED]}
+        ⏳ Bekleyen: {counts[PENDING] + counts[IN_FLIGHT]}
+        📈 Toplam: {counts['total'] + counts['invalid']}
         """
+
+async def process_matches_async(retry_failed: bool = False, target_date: str = None):
+    """Günün maçlarını eş zamanlı olarak işler
+
+    Her maçın durumu çalıştırma günlüğüne yazılır; yarıda kalan bir çalıştırma
+    yeniden başlatıldığında sadece bitmemiş maçlara devam eder. retry_failed
+    verilirse sadece başarısız maçlar ayrı bir eş zamanlılık bütçesiyle yeniden denenir.
+    """
+    db = AsyncDatabase()
+    try:
+        # Veritabanı thread'ini başlat; bütün sorgu ve yazımlar orada sırayla çalışır
+        await asyncio.to_thread(db.start)
+        await db.run(migrate)
+        
+        # Bugünün tarihini Türkiye saatine göre al
+        today = target_date or datetime.now(TR_TIMEZONE).strftime("%Y-%m-%d")
+        
+        # Günlük de veritabanı thread'inde açılır ve yazılır (event loop'u bloklamaz)
+        journal = await db.call(IngestJournal)
+        
+        if retry_failed:
+            limiter, worker_count = RETRY_LIMITER, RETRY_FAILED_MAX_CONCURRENT
+        else:
+            limiter, worker_count = ANALYZE_LIMITER, MAX_CONCURRENT_TASKS
+        
+        async with create_async_session() as session:
+            counts = await ingest_date_async(db, journal, session, today, limiter, worker_count, retry_failed)
+        
+        if counts is None:
+            return f"{today} tarihi için maç bulunamadı"
+        
+        # İşlem özetini günlükten oluştur
+        summary = format_summary(today, counts)
         logging.info(summary)
         
+        # Arşivi TTL ve boyut sınırına göre temizle
+        try:
+            PAYLOAD_STORE.evict()
+        except Exception as e:
+            logging.warning(f"Yanıt arşivi temizlenirken hata: {type(e).__name__}: {str(e)}")
+        
+        limiter_stats = limiter.snapshot()
+        logging.info(
+            f"Eş zamanlılık: limit {limiter_stats['limit']}, en yüksek {limiter_stats['peak_in_flight']}, "
+            f"p50 {limiter_stats['p50'] or 0:.2f}s, p95 {limiter_stats['p95'] or 0:.2f}s, "
+            f"hata oranı {limiter_stats['error_rate']:.0%}"
+        )
+        
+        db_stats = db.wait_stats()
+        logging.info(
+            f"Veritabanı bekleme: {db_stats['calls']} çağrı, toplam {db_stats['wait_seconds']:.2f}s, "
+            f"p95 {db_stats['p95'] or 0:.3f}s, en uzun kuyruk {db_stats['peak_depth']}"
+        )
+        
         return summary
         
     except Exception as e:
@@ -196,13 +410,15 @@ async def process_matches_async():
         return error_msg
         
     finally:
-        if 'conn' in locals():
-            conn.close()
-            logging.info("Veritabanı bağlantısı kapatıldı")
+        if 'journal' in locals():
+            await db.call(journal.close)
+        await asyncio.to_thread(db.close)
+        logging.info("Veritabanı bağlantısı kapatıldı")
 
-def process_matches():
+def process_matches(retry_failed: bool = False, target_date: str = None):
     """Senkron wrapper fonksiyonu"""
-    return asyncio.run(process_matches_async())
+    return asyncio.run(process_matches_async(retry_failed, target_date))
 
 if __name__ == "__main__":
-    process_matches() 
\ No newline at end of file
+    # 'python bot.py retry-failed' sadece bugünkü başarısız maçları yeniden dener
+    process_matches(retry_failed=len(sys.argv) > 1 and sys.argv[1] == "retry-failed") 
\ No newline at end of file
@@ -0,0 +1,253 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+def percentile(values, pct: float) -> Optional[float]:
+    """Sıralı olmayan bir listeden yüzdelik değeri hesaplar"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+class _Slot:
+    """Sınırlayıcıdan alınmış tek bir istek hakkı"""
+
+    def __init__(self, limiter: 'AdaptiveLimiter'):
+        self.limiter = limiter
+        self.started = time.monotonic()
+        self.failed = False
+
+    def mark_error(self):
+        """İsteği başarısız olarak işaretler (ör. 5xx yanıt)"""
+        self.failed = True
+
+    def _finish(self, exc):
+        latency = time.monotonic() - self.started
+        self.limiter._release(latency, self.failed or exc is not None)
+
+class _SyncSlot(_Slot):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._finish(exc)
+        return False
+
+class _AsyncSlot(_Slot):
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._finish(exc)
+        return False
+
+class AdaptiveLimiter:
+    """AIMD tabanlı adaptif eş zamanlılık sınırlayıcısı
+
+    Gecikme (p95) ve hata oranı sağlıklı kaldıkça limiti birer birer artırır,
+    bozulduğunda limiti çarpanla düşürür. Hem thread'lerden (slot) hem de
+    asyncio'dan (async_slot) kullanılabilir.
+    """
+
+    def __init__(self, name: str, initial_limit: int = 5, min_limit: int = 1, max_limit: int = 50,
+                 latency_target: float = 10.0, error_threshold: float = 0.1,
+                 backoff_ratio: float = 0.5, adjust_every: int = 10, window: int = 100):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.error_threshold = error_threshold
+        self.backoff_ratio = backoff_ratio
+        self.adjust_every = adjust_every
+
+        self._limit = max(min_limit, min(initial_limit, max_limit))
+        self._in_flight = 0
+        self._latencies = deque(maxlen=window)
+        self._errors = deque(maxlen=window)
+        self._since_adjust = 0
+        self._since_decrease = 0
+        self._saturated = False
+        self._peak_in_flight = 0
+
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._async_waiters = deque()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def slot(self) -> _SyncSlot:
+        """Thread'ler için engelleyici istek hakkı alır"""
+        with self._cond:
+            while self._in_flight >= self._limit:
+                self._cond.wait()
+            self._take()
+        return _SyncSlot(self)
+
+    def async_slot(self) -> '_AsyncSlotAcquirer':
+        """asyncio için istek hakkı alır (async with ile kullanılır)"""
+        return _AsyncSlotAcquirer(self)
+
+    async def _acquire_async(self) -> _AsyncSlot:
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if self._in_flight < self._limit:
+                    self._take()
+                    return _AsyncSlot(self)
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            await waiter
+
+    def _take(self):
+        self._in_flight += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        if self._in_flight >= self._limit:
+            self._saturated = True
+
+    def _release(self, latency: float, failed: bool):
+        with self._cond:
+            self._in_flight -= 1
+            self._latencies.append(latency)
+            self._errors.append(1 if failed else 0)
+            self._since_adjust += 1
+            self._since_decrease += 1
+
+            # Hatalarda hızlı geri çekil, ancak son düşüşten önce başlamış isteklerin
+            # hataları limiti art arda düşürmesin
+            if self._since_adjust >= self.adjust_every or (failed and self._since_decrease >= self._limit):
+                self._adjust()
+
+            self._cond.notify_all()
+            self._wake_async_waiters()
+
+    def _wake_async_waiters(self):
+        while self._async_waiters:
+            loop, waiter = self._async_waiters.popleft()
+            loop.call_soon_threadsafe(_resolve, waiter)
+
+    def _adjust(self):
+        """Gözlemlenen gecikme ve hata oranına göre limiti günceller"""
+        # Karar yalnızca son ayarlamadan bu yana gelen örneklere bakar, eski örnekler sadece raporlanır
+        recent = max(1, min(self._since_adjust, len(self._latencies)))
+        p95 = percentile(list(self._latencies)[-recent:], 95) or 0.0
+        recent_errors = list(self._errors)[-recent:]
+        error_rate = sum(recent_errors) / len(recent_errors) if recent_errors else 0.0
+        old_limit = self._limit
+
+        if error_rate > self.error_threshold or p95 > self.latency_target:
+            self._limit = max(self.min_limit, int(self._limit * self.backoff_ratio))
+            self._since_decrease = 0
+        elif self._saturated:
+            # Sadece limit gerçekten doluyken büyü
+            self._limit = min(self.max_limit, self._limit + 1)
+
+        self._since_adjust = 0
+        self._saturated = False
+
+        if self._limit != old_limit:
+            logging.info(f"[{self.name}] Eş zamanlılık limiti {old_limit} -> {self._limit} "
+                         f"(p95: {p95:.2f}s, hata oranı: {error_rate:.0%})")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Ayar için mevcut limit ve gözlemlenen gecikmeleri döndürür"""
+        with self._lock:
+            latencies = list(self._latencies)
+            errors = list(self._errors)
+            return {
+                'name': self.name,
+                'limit': self._limit,
+                'in_flight': self._in_flight,
+                'peak_in_flight': self._peak_in_flight,
+                'samples': len(latencies),
+                'p50': percentile(latencies, 50),
+                'p95': percentile(latencies, 95),
+                'p99': percentile(latencies, 99),
+                'error_rate': sum(errors) / len(errors) if errors else 0.0,
+                'latencies': latencies
+            }
+
+class _AsyncSlotAcquirer:
+    def __init__(self, limiter: AdaptiveLimiter):
+        self.limiter = limiter
+        self.slot = None
+
+    async def __aenter__(self) -> _AsyncSlot:
+        self.slot = await self.limiter._acquire_async()
+        return self.slot
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return await self.slot.__aexit__(exc_type, exc, tb)
+
+def _resolve(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+class RateLimiter:
+    """Token bucket tabanlı istek hızı sınırlayıcısı (saniyede rate istek, burst kadar birikir)"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Bir jeton ayırır ve jeton hazır olana kadar beklenecek süreyi döndürür"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self):
+        """Thread'ler için engelleyici bekleme"""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        """asyncio için bekleme"""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+class BudgetExhaustedError(Exception):
+    """İstek bütçesi bitti; istek gönderilmez, maç sonraki çalıştırmaya kalır"""
+
+class RequestBudget:
+    """Birden fazla işin paylaştığı küresel istek bütçesi (toplam sayı ve hız sınırı)"""
+
+    def __init__(self, max_requests: int = None, rate: float = None):
+        self.max_requests = max_requests
+        self.rate_limiter = RateLimiter(rate, burst=max(1, int(rate))) if rate else None
+        self._spent = 0
+        self._lock = threading.Lock()
+
+    @property
+    def spent(self) -> int:
+        return self._spent
+
+    @property
+    def exhausted(self) -> bool:
+        return self.max_requests is not None and self._spent >= self.max_requests
+
+    async def spend_async(self):
+        """Bir istek harcar; hız sınırı varsa jeton bekler, bütçe bittiyse hata fırlatır"""
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async()
+        with self._lock:
+            if self.exhausted:
+                raise BudgetExhaustedError(f"İstek bütçesi bitti ({self.max_requests})")
+            self._spent += 1
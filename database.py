@@ -1,12 +1,180 @@
-import sqlite3
-from typing import Dict, Any
+import sys
+import time
+from array import array
+from collections import defaultdict
+from typing import Dict, Any, Iterable, Set, List, Tuple, Optional, Union
 from datetime import datetime
 import logging
+import numpy as np
+from metrics import STAGE_METRICS
+from db_connection import connect
+from odds_history import history_rows, INSERT_HISTORY_SQL
+
+# Major ligler listesi; yeni eklenen liglerin leagues.is_major değeri bu listeye göre belirlenir
+MAJOR_LEAGUES = [
+    'Spanish La Liga',
+    'English Premier League',
+    'German Bundesliga',
+    'German Bundesliga 2',
+    'Italian Serie A',
+    'Italian Serie B',
+    'French Ligue 1',
+    'Turkey Super Lig',
+    'Uefa Champions League',
+    'Uefa Europa League',
+    'Uefa Europa Conference League',
+    'England Championship',
+    'Uefa Nations League',
+    'Spanish La Liga 2',
+    'Liga Portugal 1',
+    'Holland Eredivisie',
+    'Belgium Pro League',
+    'Switzerland Super League',
+    'Austrian Bundesliga',
+]
+
+# Maç başına tutulan alt tabloların doğal anahtarları; aynı anahtarla gelen
+# yeni veri mevcut satırı günceller (yeni satır eklemez)
+CHILD_TABLE_KEYS = {
+    'predictions': ('match_id',),
+    'goal_stats': ('match_id',),
+    'percentages': ('match_id',),
+    'last_10_matches': ('match_id',),
+    'odds': ('match_id', 'bookmaker_id'),
+    'corner_odds': ('match_id', 'bookmaker_id', 'is_live'),
+    'double_chance_odds': ('match_id', 'bookmaker_id'),
+    'score_odds': ('match_id', 'bookmaker_id'),
+    'match_statistics': ('match_id', 'team_type'),
+    'h2h_matches': ('match_id', 'game_date', 'home_team_id', 'away_team_id'),
+    'h2h_statistics': ('match_id',),
+    'poisson_distribution': ('match_id',),
+    'match_scores': ('match_id',)
+}
+
+# insert_match_info'nun yazdığı sütunlar (tablo başına, VALUES sırasıyla)
+CHILD_TABLE_COLUMNS = {
+    'predictions': ('match_id', 'over_prediction', 'btts_prediction', 'match_result_prediction',
+                    'ht_goal_prediction', 'corner_prediction', 'risky_prediction'),
+    'goal_stats': ('match_id', 'home_goal_exp', 'away_goal_exp', 'home_goal_ht_exp', 'away_goal_ht_exp'),
+    'percentages': ('match_id', 'home_goal_percent', 'away_goal_percent', 'over_percent_1', 'over_percent_2',
+                    'over_percent_3', 'match_result_percents', 'home_goal_ht_percent', 'away_goal_ht_percent',
+                    'over_05_ht_percent', 'over_15_ht_percent', 'over_25_ht_percent', 'ht_result_percents'),
+    'last_10_matches': ('match_id', 'home_team_results', 'away_team_results'),
+    'odds': ('match_id', 'bookmaker_id', 'ms1_opening', 'msx_opening', 'ms2_opening',
+             'ms1_closing', 'msx_closing', 'ms2_closing', 'ht1_opening', 'htx_opening',
+             'ht2_opening', 'ht1_closing', 'htx_closing', 'ht2_closing', 'opening_odds',
+             'opening_goalline', 'opening_side', 'opening_odds_ht', 'opening_goalline_ht',
+             'opening_side_ht', 'closing_odds', 'closing_goalline', 'closing_side',
+             'closing_odds_ht', 'closing_goalline_ht', 'closing_side_ht'),
+    'corner_odds': ('match_id', 'bookmaker_id', 'over_value', 'over_line', 'under_value', 'is_live'),
+    'double_chance_odds': ('match_id', 'bookmaker_id', 'home_draw_value', 'home_away_value', 'away_draw_value'),
+    'score_odds': ('match_id', 'bookmaker_id', 'score_types', 'odds'),
+    'match_statistics': ('match_id', 'team_type', 'over_25_last10', 'btts_last10', 'ht_over_05_last10',
+                         'over_35_last10', 'over_15_last10', 'ht_over_15_last10'),
+    'h2h_matches': ('match_id', 'game_date', 'league_id', 'home_team_id', 'away_team_id', 'score', 'ht_score',
+                    'corners', 'ht_corners'),
+    'h2h_statistics': ('match_id', 'total_matches', 'over_25_count', 'btts_count', 'ht_over_05_count',
+                       'over_35_count', 'over_15_count', 'ht_over_15_count', 'home_wins', 'away_wins', 'draws'),
+    'poisson_distribution': ('match_id', 'distribution_types', 'goals'),
+    'match_scores': ('match_id', 'home_score', 'away_score', 'ht_home_score', 'ht_away_score')
+}
+
+def _upsert_sql(table: str, columns: Iterable[str], key: Iterable[str]) -> str:
+    """Doğal anahtar çakışmasında satırı yerinde güncelleyen INSERT cümlesi üretir"""
+    updates = ', '.join(f"{column} = excluded.{column}" for column in columns if column not in key)
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)}) "
+        f"ON CONFLICT({', '.join(key)}) DO UPDATE SET {updates}"
+    )
+
+UPSERT_SQL = {
+    table: _upsert_sql(table, columns, CHILD_TABLE_KEYS[table])
+    for table, columns in CHILD_TABLE_COLUMNS.items()
+}
+
+# Maç varsa güncelle, yoksa ekle (ayrı bir SELECT sorgusuna gerek yok)
+UPSERT_SQL['matches'] = """
+    INSERT INTO matches 
+    (match_id, match_date, match_time, league_id, home_team_id, away_team_id, stadium, weather)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(match_id) DO UPDATE SET
+        match_date = excluded.match_date,
+        match_time = excluded.match_time,
+        league_id = excluded.league_id,
+        home_team_id = excluded.home_team_id,
+        away_team_id = excluded.away_team_id,
+        stadium = excluded.stadium,
+        weather = excluded.weather,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+# Yazma sırası: alt tablolar matches'e foreign key ile bağlı, önce maçlar yazılır
+WRITE_ORDER = ('matches',) + tuple(CHILD_TABLE_COLUMNS)
+
+# Lig, takım ve bahis şirketi adları sözlük tablolarında bir kez tutulur;
+# diğer tablolar tamsayı ID saklar (sözlük tablosu -> ID sütunu)
+DIMENSION_TABLES = {
+    'leagues': 'league_id',
+    'teams': 'team_id',
+    'bookmakers': 'bookmaker_id'
+}
+
+# Sözlük ID'si tutan sütunlar (tablo -> sütun -> sözlük tablosu). match_rows bu
+# sütunlara adı yazar, _write_rows yazmadan önce adları ID'ye çevirir.
+DIMENSION_COLUMNS = {
+    'matches': {'league_id': 'leagues', 'home_team_id': 'teams', 'away_team_id': 'teams'},
+    'odds': {'bookmaker_id': 'bookmakers'},
+    'corner_odds': {'bookmaker_id': 'bookmakers'},
+    'double_chance_odds': {'bookmaker_id': 'bookmakers'},
+    'score_odds': {'bookmaker_id': 'bookmakers'},
+    'h2h_matches': {'league_id': 'leagues', 'home_team_id': 'teams', 'away_team_id': 'teams'},
+    'odds_history': {'bookmaker_id': 'bookmakers'}
+}
+
+MATCH_COLUMNS = ('match_id', 'match_date', 'match_time', 'league_id', 'home_team_id', 'away_team_id',
+                 'stadium', 'weather')
+
+# Paketlenmiş satırlarda etiketlerin (skor tipi, dağılım tipi) ayracı
+LABEL_SEPARATOR = ','
+
+# Poisson dağılımında tutulan en yüksek gol sayısı (0..5 gol, dağılım başına 6 değer)
+POISSON_MAX_GOALS = 5
+
+def to_float(value: Any) -> Optional[float]:
+    """API'den gelen oranı sayıya çevirir; boş veya geçersiz değerler None (NULL) olur"""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def parse_percent(value: Any) -> Optional[int]:
+    """'65%' biçimindeki yüzdeyi tam sayıya çevirir; boş veya geçersiz değerler None (NULL) olur"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return round(value)
+    try:
+        return round(float(str(value).strip().rstrip('%')))
+    except ValueError:
+        return None
+
+def pack_floats(values: Iterable[float]) -> bytes:
+    """Sayıları little-endian float64 dizisi olarak tek BLOB'a paketler"""
+    packed = array('d', values)
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return packed.tobytes()
+
+def unpack_floats(blob: bytes) -> np.ndarray:
+    """pack_floats ile paketlenmiş BLOB'u salt okunur float64 numpy dizisine çevirir"""
+    return np.frombuffer(blob, dtype='<f8')
 
 def create_connection():
-    """Veritabanı bağlantısı oluşturur"""
+    """Ingest için uzun ömürlü, WAL ayarlı yazma bağlantısı oluşturur"""
     try:
-        conn = sqlite3.connect('soccer_analysis.db')
+        conn = connect()
         conn.execute("PRAGMA foreign_keys = ON")  # Foreign key desteğini aktif et
         return conn
     except Exception as e:
@@ -14,11 +182,15 @@ def create_connection():
         raise
 
 def create_tables(conn):
-    """Veritabanı tablolarını oluşturur"""
+    """Veritabanı tablolarını (yoksa) oluşturur
+
+    Commit etmez; migrations.py'deki ilk sürümün transaction'ı içinde çalışır.
+    Şemanın ilk sürümüdür, sonraki değişiklikler migrations.py'ye eklenir.
+    """
     cursor = conn.cursor()
     
     try:
-        # Maç bilgileri tablosu
+        # Maç bilgileri tablosu (migration 8 ile lig ve takım adları sözlük ID'lerine çevrilir)
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS matches (
             id INTEGER PRIMARY KEY,
@@ -63,7 +235,7 @@ def create_tables(conn):
         )
         ''')
         
-        # Yüzdeler tablosu
+        # Yüzdeler tablosu (migration 6 ile tek değerli yüzdeler INTEGER sütunlara çevrilir)
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS percentages (
             id INTEGER PRIMARY KEY,
@@ -95,7 +267,8 @@ def create_tables(conn):
         )
         ''')
         
-        # Bahis oranları tablosu
+        # Bahis oranları tablosu (migration 8 ile bahis şirketi adı yerine bookmaker_id;
+        # korner, çifte şans ve skor oranlarında da aynı)
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS odds (
             id INTEGER PRIMARY KEY,
@@ -156,7 +329,7 @@ def create_tables(conn):
         )
         ''')
         
-        # Skor oranları tablosu
+        # Skor oranları tablosu (migration 5 ile bahis şirketi başına tek satıra paketlenir)
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS score_odds (
             id INTEGER PRIMARY KEY,
@@ -184,7 +357,7 @@ def create_tables(conn):
         )
         ''')
         
-        # H2H maçları tablosu
+        # H2H maçları tablosu (migration 8 ile lig ve takım adları sözlük ID'lerine çevrilir)
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS h2h_matches (
             id INTEGER PRIMARY KEY,
@@ -220,7 +393,7 @@ def create_tables(conn):
         )
         ''')
         
-        # Poisson dağılımı tablosu
+        # Poisson dağılımı tablosu (migration 5 ile maç başına tek satıra paketlenir)
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS poisson_distribution (
             id INTEGER PRIMARY KEY,
@@ -249,12 +422,8 @@ def create_tables(conn):
         )
         ''')
         
-        conn.commit()
-        logging.info("Veritabanı tabloları başarıyla oluşturuldu/güncellendi")
-        
     except Exception as e:
         logging.error(f"Tablolar oluşturulurken hata: {str(e)}")
-        conn.rollback()
         raise
 
 def format_date(date_str: str) -> str:
@@ -281,349 +450,460 @@ def format_date(date_str: str) -> str:
         logging.error(f"Tarih formatlanırken hata: {str(e)}")
         raise
 
-def insert_match_info(conn, match_data: Dict[str, Any]):
-    """Maç bilgilerini veritabanına ekler veya günceller"""
+def get_existing_match_ids(conn, match_ids: Iterable[int]) -> Set[int]:
+    """Verilen ID'lerden veritabanında zaten bulunanları tek sorguda döndürür"""
     cursor = conn.cursor()
     
     try:
-        # Tarih formatını standardize et
-        match_date = format_date(match_data['info']['mac_tarihi'])
-        
-        # Önce maçın var olup olmadığını kontrol et
-        cursor.execute("""
-            SELECT match_id FROM matches 
-            WHERE match_id = ?
-        """, (match_data['info']['id'],))
-        
-        existing_match = cursor.fetchone()
-        
-        if existing_match:
-            # Maç varsa güncelle
-            cursor.execute("""
-                UPDATE matches 
-                SET match_date = ?,
-                    match_time = ?,
-                    league = ?,
-                    home_team = ?,
-                    away_team = ?,
-                    stadium = ?,
-                    weather = ?,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE match_id = ?
-            """, (
-                match_date,
-                match_data['info']['mac_saati'],
-                match_data['info']['lig'],  # Lig ismi olduğu gibi kullanılıyor
-                match_data['info']['mac'].split(' - ')[0],
-                match_data['info']['mac'].split(' - ')[1],
-                match_data['info']['stadium'],
-                match_data['info']['weather'],
-                match_data['info']['id']
-            ))
-            
-            logging.info(f"Maç bilgileri güncellendi (ID: {match_data['info']['id']})")
-            
-        else:
-            # Maç yoksa ekle
-            cursor.execute("""
-                INSERT INTO matches 
-                (match_id, match_date, match_time, league, home_team, away_team, stadium, weather)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                match_data['info']['id'],
-                match_date,
-                match_data['info']['mac_saati'],
-                match_data['info']['lig'],  # Lig ismi olduğu gibi kullanılıyor
-                match_data['info']['mac'].split(' - ')[0],
-                match_data['info']['mac'].split(' - ')[1],
-                match_data['info']['stadium'],
-                match_data['info']['weather']
-            ))
-            
-            logging.info(f"Yeni maç eklendi (ID: {match_data['info']['id']})")
-        
-        # Tahminleri güncelle/ekle
+        # ID listesini geçici tabloya yükleyip matches ile tek seferde birleştir
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS _fetched_ids (match_id INTEGER PRIMARY KEY)")
+        cursor.execute("DELETE FROM _fetched_ids")
+        cursor.executemany(
+            "INSERT OR IGNORE INTO _fetched_ids (match_id) VALUES (?)",
+            ((match_id,) for match_id in match_ids)
+        )
         cursor.execute("""
-            INSERT OR REPLACE INTO predictions
-            (match_id, over_prediction, btts_prediction, match_result_prediction, 
-            ht_goal_prediction, corner_prediction, risky_prediction)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
-            match_data['info']['id'],
-            match_data['tahminler'].get('ust_tahmini', ''),
-            match_data['tahminler'].get('kg_tahmini', ''),
-            match_data['tahminler'].get('ms_tahmini', ''),
-            match_data['tahminler'].get('iy_gol_tahmini', ''),
-            match_data['tahminler'].get('korner_tahmini', ''),
-            match_data['tahminler'].get('riskli_tahmin', '')
-        ))
-        
-        # Gol istatistiklerini ekle
-        cursor.execute('''
-        INSERT OR REPLACE INTO goal_stats
-        (match_id, home_goal_exp, away_goal_exp, home_goal_ht_exp, away_goal_ht_exp)
-        VALUES (?, ?, ?, ?, ?)
-        ''', (
-            match_data['info']['id'],
-            match_data['home_away_goal']['home_goal'],
-            match_data['home_away_goal']['away_goal'],
-            match_data['home_away_goal']['home_goal_ht'],
-            match_data['home_away_goal']['away_goal_ht']
-        ))
-        
-        # Yüzdeleri ekle
-        cursor.execute('''
-        INSERT OR REPLACE INTO percentages
-        (match_id, home_goal_percent, away_goal_percent, over_percent_1, over_percent_2,
-        over_percent_3, match_result_percents, home_goal_ht_percent, away_goal_ht_percent,
-        over_05_ht_percent, over_15_ht_percent, over_25_ht_percent, ht_result_percents)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            match_data['info']['id'],
-            match_data['yuzdeler']['ev_gol_yuzdesi'],
-            match_data['yuzdeler']['dep_gol_yuzdesi'],
-            match_data['yuzdeler']['ust_yuzdesi_1'],
-            match_data['yuzdeler']['ust_yuzdesi2'],
-            match_data['yuzdeler']['ust_yuzdesi3'],
-            match_data['yuzdeler']['ms_yuzdeleri'],
-            match_data['yuzdeler']['ev_gol_yuzdesi_ht'],
-            match_data['yuzdeler']['dep_gol_yuzdesi_ht'],
-            match_data['yuzdeler']['ust_yuzdesi_05_ht'],
-            match_data['yuzdeler']['ust_yuzdesi_15_ht'],
-            match_data['yuzdeler']['ust_yuzdesi_25_ht'],
-            match_data['yuzdeler']['iy_yuzdeleri_']
-        ))
-        
-        # Son 10 maç sonuçlarını ekle
-        cursor.execute('''
-        INSERT OR REPLACE INTO last_10_matches
-        (match_id, home_team_results, away_team_results)
-        VALUES (?, ?, ?)
-        ''', (
-            match_data['info']['id'],
-            match_data['son_10_mac']['ev_sahibi'],
-            match_data['son_10_mac']['deplasman']
-        ))
-        
-        # Bahis oranlarını ekle (tüm bahis şirketleri için)
-        if 'bahis_oranlari' in match_data:
-            for bookmaker, odds_data in match_data['bahis_oranlari'].items():
-                try:
-                    # Acilis ve kapanis verilerinin varlığını kontrol et
-                    if 'acilis' not in odds_data or 'kapanis' not in odds_data:
-                        logging.warning(f"Bahis oranları için acilis veya kapanis verisi eksik: {bookmaker}")
-                        continue
-                        
-                    cursor.execute('''
-                    INSERT OR REPLACE INTO odds
-                    (match_id, bookmaker, ms1_opening, msx_opening, ms2_opening,
-                    ms1_closing, msx_closing, ms2_closing, ht1_opening, htx_opening,
-                    ht2_opening, ht1_closing, htx_closing, ht2_closing, opening_odds,
-                    opening_goalline, opening_side, opening_odds_ht, opening_goalline_ht,
-                    opening_side_ht, closing_odds, closing_goalline, closing_side,
-                    closing_odds_ht, closing_goalline_ht, closing_side_ht)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        match_data['info']['id'],
-                        bookmaker,
-                        odds_data['acilis'].get('acilis_ms1', ''),
-                        odds_data['acilis'].get('acilis_msx', ''),
-                        odds_data['acilis'].get('acilis_ms2', ''),
-                        odds_data['kapanis'].get('kapanis_ms1', ''),
-                        odds_data['kapanis'].get('kapanis_msx', ''),
-                        odds_data['kapanis'].get('kapanis_ms2', ''),
-                        odds_data['acilis'].get('acilis_iy1', ''),
-                        odds_data['acilis'].get('acilis_iyx', ''),
-                        odds_data['acilis'].get('acilis_iy2', ''),
-                        odds_data['kapanis'].get('kapanis_iy1', ''),
-                        odds_data['kapanis'].get('kapanis_iyx', ''),
-                        odds_data['kapanis'].get('kapanis_iy2', ''),
-                        odds_data['acilis'].get('acilis_oran', ''),
-                        odds_data['acilis'].get('acilis_goalline', ''),
-                        odds_data['acilis'].get('acilis_taraf', ''),
-                        odds_data['acilis'].get('acilis_oran_ht', ''),
-                        odds_data['acilis'].get('acilis_goalline_ht', ''),
-                        odds_data['acilis'].get('acilis_taraf_ht', ''),
-                        odds_data['kapanis'].get('kapanis_oran', ''),
-                        odds_data['kapanis'].get('kapanis_goalline', ''),
-                        odds_data['kapanis'].get('kapanis_taraf', ''),
-                        odds_data['kapanis'].get('kapanis_oran_ht', ''),
-                        odds_data['kapanis'].get('kapanis_goalline_ht', ''),
-                        odds_data['kapanis'].get('kapanis_taraf_ht', '')
-                    ))
-                    logging.info(f"Bahis oranları eklendi: {bookmaker}")
-                except Exception as e:
-                    logging.error(f"Bahis oranları eklenirken hata oluştu ({bookmaker}): {str(e)}")
-        
-        # Korner oranlarını ekle
-        if 'korner_oranlari' in match_data and 'Data' in match_data['korner_oranlari']:
-            for odds in match_data['korner_oranlari']['Data'].get('oddsList', []):
-                if 'odds' in odds:
-                    cursor.execute('''
-                    INSERT OR REPLACE INTO corner_odds
-                    (match_id, bookmaker, over_value, over_line, under_value, is_live)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                    ''', (
-                        match_data['info']['id'],
-                        odds.get('cn', ''),
-                        odds['odds']['f'].get('u', 0),
-                        odds['odds']['f'].get('g', 0),
-                        odds['odds']['f'].get('d', 0),
-                        odds.get('hr', False)
-                    ))
-        
-        # Çifte şans oranlarını ekle
-        if 'cifte_sans_oranlari' in match_data and 'Data' in match_data['cifte_sans_oranlari']:
-            for odds in match_data['cifte_sans_oranlari']['Data'].get('oddsList', []):
-                if 'fodds' in odds:
-                    cursor.execute('''
-                    INSERT OR REPLACE INTO double_chance_odds
-                    (match_id, bookmaker, home_draw_value, home_away_value, away_draw_value)
-                    VALUES (?, ?, ?, ?, ?)
-                    ''', (
-                        match_data['info']['id'],
-                        odds.get('cid', ''),
-                        odds['fodds'].get('u', 0),
-                        odds['fodds'].get('g', 0),
-                        odds['fodds'].get('d', 0)
-                    ))
-        
-        # Skor oranlarını ekle
-        if 'skor_oranlari' in match_data and 'Data' in match_data['skor_oranlari']:
-            for odds in match_data['skor_oranlari']['Data'].get('oddsList', []):
-                if 'odds' in odds:
-                    for score_type, value in odds['odds'].items():
-                        if value and value != '':
-                            cursor.execute('''
-                            INSERT OR REPLACE INTO score_odds
-                            (match_id, bookmaker, score_type, odds_value)
-                            VALUES (?, ?, ?, ?)
-                            ''', (
-                                match_data['info']['id'],
-                                odds.get('cid', ''),
-                                score_type,
-                                float(value)
-                            ))
+            SELECT m.match_id FROM _fetched_ids f
+            INNER JOIN matches m ON m.match_id = f.match_id
+        """)
+        existing_ids = {row[0] for row in cursor.fetchall()}
+        cursor.execute("DELETE FROM _fetched_ids")
+        conn.commit()
+        return existing_ids
         
-        # Maç istatistiklerini ekle
-        if 'match_statistics' in match_data:
-            for team_type in ['home', 'away']:
-                stats = match_data['match_statistics'][team_type]['last_10']
-                cursor.execute('''
-                INSERT OR REPLACE INTO match_statistics
-                (match_id, team_type, over_25_last10, btts_last10, ht_over_05_last10,
-                over_35_last10, over_15_last10, ht_over_15_last10)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    match_data['info']['id'],
-                    team_type,
-                    stats['over_25'],
-                    stats['btts'],
-                    stats['ht_over_05'],
-                    stats['over_35'],
-                    stats['over_15'],
-                    stats['ht_over_15']
+    except Exception as e:
+        logging.error(f"Mevcut maçlar kontrol edilirken hata: {type(e).__name__}: {str(e)}")
+        conn.rollback()
+        raise
+
+def get_score_odds(conn, match_id: int) -> Dict[str, Tuple[List[str], np.ndarray]]:
+    """Maçın skor oranlarını bahis şirketi başına (skor tipleri, oranlar dizisi) olarak döndürür"""
+    cursor = conn.execute(
+        """
+        SELECT b.name, so.score_types, so.odds FROM score_odds so
+        JOIN bookmakers b ON b.bookmaker_id = so.bookmaker_id
+        WHERE so.match_id = ?
+        """, (match_id,)
+    )
+    return {
+        bookmaker: (score_types.split(LABEL_SEPARATOR), unpack_floats(odds))
+        for bookmaker, score_types, odds in cursor.fetchall()
+    }
+
+def get_poisson_distribution(conn, match_id: int) -> Dict[str, np.ndarray]:
+    """Maçın Poisson dağılımlarını tip başına 0..POISSON_MAX_GOALS gol olasılık dizisi olarak döndürür"""
+    row = conn.execute(
+        "SELECT distribution_types, goals FROM poisson_distribution WHERE match_id = ?", (match_id,)
+    ).fetchone()
+    if row is None:
+        return {}
+    
+    goals = unpack_floats(row[1])
+    width = POISSON_MAX_GOALS + 1
+    return {
+        dist_type: goals[i * width:(i + 1) * width]
+        for i, dist_type in enumerate(row[0].split(LABEL_SEPARATOR))
+    }
+
+def match_rows(match_data: Dict[str, Any]) -> Dict[str, List[tuple]]:
+    """Maç verisini tablo başına yazılacak satırlara ayırır (veritabanına dokunmaz)"""
+    rows = defaultdict(list)
+    
+    # Şema schemas.validate_analyze_match ile doğrulanmış olmalı
+    info = match_data['info']
+    match_id = info['id']
+    
+    # Tarih formatını standardize et
+    match_date = format_date(info['mac_tarihi'])
+    
+    home_team, away_team = info['mac'].split(' - ')[:2]
+    rows['matches'].append((
+        match_id,
+        match_date,
+        info['mac_saati'],
+        info['lig'],  # Lig ismi olduğu gibi kullanılıyor
+        home_team,
+        away_team,
+        info['stadium'],
+        info['weather']
+    ))
+    
+    # Tahminleri güncelle/ekle
+    rows['predictions'].append((
+        match_id,
+        match_data['tahminler'].get('ust_tahmini', ''),
+        match_data['tahminler'].get('kg_tahmini', ''),
+        match_data['tahminler'].get('ms_tahmini', ''),
+        match_data['tahminler'].get('iy_gol_tahmini', ''),
+        match_data['tahminler'].get('korner_tahmini', ''),
+        match_data['tahminler'].get('riskli_tahmin', '')
+    ))
+    
+    # Gol istatistiklerini ekle
+    rows['goal_stats'].append((
+        match_id,
+        to_float(match_data['home_away_goal']['home_goal']),
+        to_float(match_data['home_away_goal']['away_goal']),
+        to_float(match_data['home_away_goal']['home_goal_ht']),
+        to_float(match_data['home_away_goal']['away_goal_ht'])
+    ))
+    
+    # Yüzdeleri ekle ('65%' -> 65; MS ve İY yüzdeleri birden fazla değer içerdiği için metin kalır)
+    rows['percentages'].append((
+        match_id,
+        parse_percent(match_data['yuzdeler']['ev_gol_yuzdesi']),
+        parse_percent(match_data['yuzdeler']['dep_gol_yuzdesi']),
+        parse_percent(match_data['yuzdeler']['ust_yuzdesi_1']),
+        parse_percent(match_data['yuzdeler']['ust_yuzdesi2']),
+        parse_percent(match_data['yuzdeler']['ust_yuzdesi3']),
+        match_data['yuzdeler']['ms_yuzdeleri'],
+        parse_percent(match_data['yuzdeler']['ev_gol_yuzdesi_ht']),
+        parse_percent(match_data['yuzdeler']['dep_gol_yuzdesi_ht']),
+        parse_percent(match_data['yuzdeler']['ust_yuzdesi_05_ht']),
+        parse_percent(match_data['yuzdeler']['ust_yuzdesi_15_ht']),
+        parse_percent(match_data['yuzdeler']['ust_yuzdesi_25_ht']),
+        match_data['yuzdeler']['iy_yuzdeleri_']
+    ))
+    
+    # Son 10 maç sonuçlarını ekle
+    rows['last_10_matches'].append((
+        match_id,
+        match_data['son_10_mac']['ev_sahibi'],
+        match_data['son_10_mac']['deplasman']
+    ))
+    
+    # Bahis oranlarını ekle (tüm bahis şirketleri için)
+    if 'bahis_oranlari' in match_data:
+        for bookmaker, odds_data in match_data['bahis_oranlari'].items():
+            try:
+                # Acilis ve kapanis verilerinin varlığını kontrol et
+                if 'acilis' not in odds_data or 'kapanis' not in odds_data:
+                    logging.warning(f"Bahis oranları için acilis veya kapanis verisi eksik: {bookmaker}")
+                    continue
+                
+                opening, closing = odds_data['acilis'], odds_data['kapanis']
+                rows['odds'].append((
+                    match_id,
+                    bookmaker,
+                    to_float(opening.get('acilis_ms1')),
+                    to_float(opening.get('acilis_msx')),
+                    to_float(opening.get('acilis_ms2')),
+                    to_float(closing.get('kapanis_ms1')),
+                    to_float(closing.get('kapanis_msx')),
+                    to_float(closing.get('kapanis_ms2')),
+                    to_float(opening.get('acilis_iy1')),
+                    to_float(opening.get('acilis_iyx')),
+                    to_float(opening.get('acilis_iy2')),
+                    to_float(closing.get('kapanis_iy1')),
+                    to_float(closing.get('kapanis_iyx')),
+                    to_float(closing.get('kapanis_iy2')),
+                    to_float(opening.get('acilis_oran')),
+                    to_float(opening.get('acilis_goalline')),
+                    to_float(opening.get('acilis_taraf')),
+                    to_float(opening.get('acilis_oran_ht')),
+                    to_float(opening.get('acilis_goalline_ht')),
+                    to_float(opening.get('acilis_taraf_ht')),
+                    to_float(closing.get('kapanis_oran')),
+                    to_float(closing.get('kapanis_goalline')),
+                    to_float(closing.get('kapanis_taraf')),
+                    to_float(closing.get('kapanis_oran_ht')),
+                    to_float(closing.get('kapanis_goalline_ht')),
+                    to_float(closing.get('kapanis_taraf_ht'))
                 ))
-        
-        # H2H maçlarını ekle
-        if 'h2h_matches' in match_data:
-            for match in match_data['h2h_matches'].get('matches', []):
-                cursor.execute('''
-                INSERT OR REPLACE INTO h2h_matches
-                (match_id, game_date, league, home_team, away_team, score, ht_score, corners, ht_corners)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    match_data['info']['id'],
-                    match['date'],
-                    match['league'],
-                    match['home_team'],
-                    match['away_team'],
-                    match['score'],
-                    match['ht_score'],
-                    match['corners'],
-                    match['ht_corners']
+                logging.info(f"Bahis oranları eklendi: {bookmaker}")
+            except Exception as e:
+                logging.error(f"Bahis oranları eklenirken hata oluştu ({bookmaker}): {str(e)}")
+    
+    # Korner oranlarını ekle
+    if 'korner_oranlari' in match_data and 'Data' in match_data['korner_oranlari']:
+        for odds in match_data['korner_oranlari']['Data'].get('oddsList', []):
+            if 'odds' in odds:
+                rows['corner_odds'].append((
+                    match_id,
+                    odds.get('cn', ''),
+                    to_float(odds['odds']['f'].get('u')),
+                    to_float(odds['odds']['f'].get('g')),
+                    to_float(odds['odds']['f'].get('d')),
+                    odds.get('hr', False)
                 ))
-        
-        # H2H istatistiklerini ekle
-        if 'h2h_matches' in match_data and 'statistics' in match_data['h2h_matches']:
-            stats = match_data['h2h_matches']['statistics']
-            cursor.execute('''
-            INSERT OR REPLACE INTO h2h_statistics
-            (match_id, total_matches, over_25_count, btts_count, ht_over_05_count,
-            over_35_count, over_15_count, ht_over_15_count, home_wins, away_wins, draws)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                match_data['info']['id'],
-                stats['total_matches'],
+    
+    # Çifte şans oranlarını ekle
+    if 'cifte_sans_oranlari' in match_data and 'Data' in match_data['cifte_sans_oranlari']:
+        for odds in match_data['cifte_sans_oranlari']['Data'].get('oddsList', []):
+            if 'fodds' in odds:
+                rows['double_chance_odds'].append((
+                    match_id,
+                    odds.get('cid', ''),
+                    to_float(odds['fodds'].get('u')),
+                    to_float(odds['fodds'].get('g')),
+                    to_float(odds['fodds'].get('d'))
+                ))
+    
+    # Skor oranlarını ekle (bahis şirketi başına tek satır: skor etiketleri ve paketlenmiş oranlar)
+    if 'skor_oranlari' in match_data and 'Data' in match_data['skor_oranlari']:
+        for odds in match_data['skor_oranlari']['Data'].get('oddsList', []):
+            if 'odds' in odds:
+                score_types = []
+                values = []
+                for score_type, value in odds['odds'].items():
+                    if value and value != '':
+                        score_types.append(score_type)
+                        values.append(float(value))
+                if values:
+                    rows['score_odds'].append((
+                        match_id,
+                        odds.get('cid', ''),
+                        LABEL_SEPARATOR.join(score_types),
+                        pack_floats(values)
+                    ))
+    
+    # Maç istatistiklerini ekle
+    if 'match_statistics' in match_data:
+        for team_type in ['home', 'away']:
+            stats = match_data['match_statistics'][team_type]['last_10']
+            rows['match_statistics'].append((
+                match_id,
+                team_type,
                 stats['over_25'],
                 stats['btts'],
                 stats['ht_over_05'],
                 stats['over_35'],
                 stats['over_15'],
-                stats['ht_over_15'],
-                stats['home_wins'],
-                stats['away_wins'],
-                stats['draws']
+                stats['ht_over_15']
             ))
-        
-        # Poisson dağılımını ekle
-        if 'poisson' in match_data and 'poisson' in match_data['poisson']:
-            for dist_type, values in match_data['poisson']['poisson'].items():
-                cursor.execute('''
-                INSERT OR REPLACE INTO poisson_distribution
-                (match_id, distribution_type, goals_0, goals_1, goals_2, goals_3, goals_4, goals_5)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    match_data['info']['id'],
-                    dist_type,
-                    values.get('0', 0),
-                    values.get('1', 0),
-                    values.get('2', 0),
-                    values.get('3', 0),
-                    values.get('4', 0),
-                    values.get('5', 0)
-                ))
-        
-        # Maç skorunu ekle
-        if 'score' in match_data:
-            home_score = 0
-            away_score = 0
-            ht_home_score = 0
-            ht_away_score = 0
-            
-            # Tam maç skoru
-            if match_data['score'].get('home_score') is not None and match_data['score'].get('away_score') is not None:
-                try:
-                    home_score = int(match_data['score']['home_score'])
-                    away_score = int(match_data['score']['away_score'])
-                except (ValueError, TypeError):
-                    home_score = 0
-                    away_score = 0
-            
-            # İlk yarı skoru
-            if match_data['score'].get('ht_score'):
-                try:
-                    ht_scores = match_data['score']['ht_score'].split('-')
-                    ht_home_score = int(ht_scores[0])
-                    ht_away_score = int(ht_scores[1])
-                except (ValueError, TypeError, IndexError):
-                    ht_home_score = 0
-                    ht_away_score = 0
-            
-            cursor.execute('''
-            INSERT OR REPLACE INTO match_scores
-            (match_id, home_score, away_score, ht_home_score, ht_away_score)
-            VALUES (?, ?, ?, ?, ?)
-            ''', (
-                match_data['info']['id'],
-                home_score,
-                away_score,
-                ht_home_score,
-                ht_away_score
+    
+    # H2H maçlarını ekle
+    if 'h2h_matches' in match_data:
+        for match in match_data['h2h_matches'].get('matches', []):
+            rows['h2h_matches'].append((
+                match_id,
+                match['date'],
+                match['league'],
+                match['home_team'],
+                match['away_team'],
+                match['score'],
+                match['ht_score'],
+                match['corners'],
+                match['ht_corners']
             ))
-        
-        conn.commit()
-        logging.info(f"Maç bilgileri başarıyla kaydedildi (ID: {match_data['info']['id']})")
+    
+    # H2H istatistiklerini ekle
+    if 'h2h_matches' in match_data and 'statistics' in match_data['h2h_matches']:
+        stats = match_data['h2h_matches']['statistics']
+        rows['h2h_statistics'].append((
+            match_id,
+            stats['total_matches'],
+            stats['over_25'],
+            stats['btts'],
+            stats['ht_over_05'],
+            stats['over_35'],
+            stats['over_15'],
+            stats['ht_over_15'],
+            stats['home_wins'],
+            stats['away_wins'],
+            stats['draws']
+        ))
+    
+    # Poisson dağılımını ekle (maç başına tek satır: dağılım başına 0-5 gol olasılıkları art arda)
+    if 'poisson' in match_data and 'poisson' in match_data['poisson']:
+        distributions = match_data['poisson']['poisson']
+        if distributions:
+            rows['poisson_distribution'].append((
+                match_id,
+                LABEL_SEPARATOR.join(distributions),
+                pack_floats(
+                    float(values.get(str(goals)) or 0)
+                    for values in distributions.values()
+                    for goals in range(POISSON_MAX_GOALS + 1)
+                )
+            ))
+    
+    # Maç skorunu ekle
+    if 'score' in match_data:
+        home_score = 0
+        away_score = 0
+        ht_home_score = 0
+        ht_away_score = 0
+        
+        # Tam maç skoru
+        if match_data['score'].get('home_score') is not None and match_data['score'].get('away_score') is not None:
+            try:
+                home_score = int(match_data['score']['home_score'])
+                away_score = int(match_data['score']['away_score'])
+            except (ValueError, TypeError):
+                home_score = 0
+                away_score = 0
+        
+        # İlk yarı skoru
+        if match_data['score'].get('ht_score'):
+            try:
+                ht_scores = match_data['score']['ht_score'].split('-')
+                ht_home_score = int(ht_scores[0])
+                ht_away_score = int(ht_scores[1])
+            except (ValueError, TypeError, IndexError):
+                ht_home_score = 0
+                ht_away_score = 0
+        
+        rows['match_scores'].append((
+            match_id,
+            home_score,
+            away_score,
+            ht_home_score,
+            ht_away_score
+        ))
+    
+    return rows
+
+def resolve_name(cursor, dimension: str, name: Optional[str]) -> Optional[int]:
+    """Adın sözlük ID'sini döndürür; önce takma adlara bakar, bilinmeyen adı ekler
+
+    Ad karşılaştırması büyük/küçük harf duyarsızdır (COLLATE NOCASE); API'nin
+    farklı yazımları name_aliases tablosuyla aynı kayda bağlanır.
+    """
+    if name is None or not str(name).strip():
+        return None
+    id_column = DIMENSION_TABLES[dimension]
+    row = cursor.execute(f"""
+        SELECT COALESCE(
+            (SELECT canonical_id FROM name_aliases WHERE dimension = ? AND alias = ?),
+            (SELECT {id_column} FROM {dimension} WHERE name = ?)
+        )
+    """, (dimension, name, name)).fetchone()
+    if row[0] is not None:
+        return row[0]
+
+    if dimension == 'leagues':
+        cursor.execute("INSERT INTO leagues (name, is_major) VALUES (?, ?)",
+                       (name, str(name).lower() in {league.lower() for league in MAJOR_LEAGUES}))
+    else:
+        cursor.execute(f"INSERT INTO {dimension} (name) VALUES (?)", (name,))
+    return cursor.lastrowid
+
+def encode_names(cursor, rows: Dict[str, List[tuple]]) -> Dict[str, List[tuple]]:
+    """match_rows çıktısındaki lig, takım ve bahis şirketi adlarını sözlük ID'lerine çevirir
+
+    Doğal anahtardaki adı boş olan satırlar (ör. bahis şirketi adı gelmeyen
+    korner oranı) atlanır: NULL anahtar UNIQUE index'te hiçbir satırla
+    eşleşmez, ON CONFLICT çalışmaz ve her yeniden analizde tekrar eden satır eklenirdi.
+    """
+    resolved = {}
+    encoded = {}
+    for table, table_rows in rows.items():
+        dimension_columns = DIMENSION_COLUMNS.get(table)
+        if not dimension_columns or not table_rows:
+            encoded[table] = table_rows
+            continue
+
+        columns = MATCH_COLUMNS if table == 'matches' else CHILD_TABLE_COLUMNS[table]
+        positions = [(columns.index(column), dimension) for column, dimension in dimension_columns.items()]
+        key_positions = [columns.index(column) for column in CHILD_TABLE_KEYS.get(table, ())
+                         if column in dimension_columns]
+        encoded[table] = []
+        skipped = 0
+        for row in table_rows:
+            row = list(row)
+            for position, dimension in positions:
+                key = (dimension, row[position])
+                if key not in resolved:
+                    resolved[key] = resolve_name(cursor, dimension, row[position])
+                row[position] = resolved[key]
+            if any(row[position] is None for position in key_positions):
+                skipped += 1
+                continue
+            encoded[table].append(tuple(row))
+        if skipped:
+            logging.warning(f"{table}: anahtar adı boş olan {skipped} satır atlandı")
+    return encoded
+
+def _write_rows(cursor, rows: Dict[str, List[tuple]], observed_at: Union[int, Dict[int, int]] = None) -> int:
+    """Satırları tablo başına tek executemany ile yazar, yazılan satır sayısını döndürür
+
+    Değişen oranlar odds_history'ye fark olarak eklenir; önceki değerler
+    upsert'ten önce okunur, geçmiş satırları maçlar yazıldıktan sonra eklenir.
+    observed_at, gözlem zamanıdır (ms; tek değer ya da match_id -> ms, varsayılan: şimdi).
+    """
+    rows = encode_names(cursor, rows)
+    history = history_rows(cursor, rows, CHILD_TABLE_COLUMNS, observed_at)
+    row_count = 0
+    for table in WRITE_ORDER:
+        if rows.get(table):
+            cursor.executemany(UPSERT_SQL[table], rows[table])
+            row_count += len(rows[table])
+    if history:
+        cursor.executemany(INSERT_HISTORY_SQL, history)
+    return row_count
+
+def _non_blank(column: str) -> str:
+    return f"LENGTH(TRIM(COALESCE({column}, ''))) > 0"
+
+_HAS_MAIN_PREDICTION = ' OR '.join(
+    _non_blank(f"p.{column}")
+    for column in ('over_prediction', 'btts_prediction', 'match_result_prediction', 'risky_prediction')
+)
+
+# Paylaşım sorgularının okuduğu daily_predictions satırları: maç, tahmin, yüzde
+# ve Bet365 oranları birleştirilir, filtre koşulları bayrak olarak hesaplanır
+REFRESH_DAILY_PREDICTIONS_SQL = f"""
+    INSERT OR REPLACE INTO daily_predictions (
+        match_id, match_date, match_time, league, home_team, away_team,
+        over_prediction, btts_prediction, match_result_prediction, ht_goal_prediction, risky_prediction,
+        over_05_ht_percent, over_15_ht_percent,
+        opening_goalline, closing_goalline, opening_goalline_ht, closing_goalline_ht,
+        has_any_prediction, has_main_prediction, is_major_league, ht_eligible
+    )
+    SELECT m.match_id, m.match_date, m.match_time, l.name, ht.name, at.name,
+           p.over_prediction, p.btts_prediction, p.match_result_prediction, p.ht_goal_prediction, p.risky_prediction,
+           pc.over_05_ht_percent, pc.over_15_ht_percent,
+           o.opening_goalline, o.closing_goalline, o.opening_goalline_ht, o.closing_goalline_ht,
+           ({_HAS_MAIN_PREDICTION}) OR {_non_blank('p.ht_goal_prediction')},
+           {_HAS_MAIN_PREDICTION},
+           COALESCE(l.is_major, 0),
+           {_non_blank('p.ht_goal_prediction')} AND (o.closing_goalline_ht IS NULL OR o.closing_goalline_ht >= 1)
+    FROM matches m
+    LEFT JOIN leagues l ON l.league_id = m.league_id
+    LEFT JOIN teams ht ON ht.team_id = m.home_team_id
+    LEFT JOIN teams at ON at.team_id = m.away_team_id
+    LEFT JOIN predictions p ON m.match_id = p.match_id
+    LEFT JOIN percentages pc ON m.match_id = pc.match_id
+    LEFT JOIN odds o ON m.match_id = o.match_id
+        AND o.bookmaker_id = (SELECT bookmaker_id FROM bookmakers WHERE name = 'Bet365')
+"""
+
+# Tek sorguda bağlanan en fazla maç ID'si (SQLite parametre sınırının altında)
+REFRESH_CHUNK_SIZE = 500
+
+def refresh_daily_predictions(cursor, match_ids: Iterable[int] = None):
+    """Verilen maçların daily_predictions satırlarını yeniden hesaplar (None: bütün maçlar)
+
+    Yazımla aynı transaction'da çağrılır; commit çağırana aittir.
+    """
+    if match_ids is None:
+        cursor.execute(REFRESH_DAILY_PREDICTIONS_SQL)
+        return
+
+    match_ids = list(match_ids)
+    for i in range(0, len(match_ids), REFRESH_CHUNK_SIZE):
+        chunk = match_ids[i:i + REFRESH_CHUNK_SIZE]
+        placeholders = ','.join('?' for _ in chunk)
+        cursor.execute(f"{REFRESH_DAILY_PREDICTIONS_SQL} WHERE m.match_id IN ({placeholders})", chunk)
+
+def insert_match_info(conn, match_data: Dict[str, Any], observed_at: int = None):
+    """Maç bilgilerini veritabanına ekler veya günceller, yazılan satır sayısını döndürür
+
+    observed_at, oranların gözlem zamanıdır (Unix ms, varsayılan: şimdi).
+    """
+    cursor = conn.cursor()
+    started = time.perf_counter()
+    match_id = match_data['info']['id']
+    
+    try:
+        row_count = _write_rows(cursor, match_rows(match_data), observed_at)
+        refresh_daily_predictions(cursor, [match_id])
+        STAGE_METRICS.record('insert_match_info', time.perf_counter() - started)
+        with STAGE_METRICS.timer('commit'):
+            conn.commit()
+        logging.info(f"Maç bilgileri başarıyla kaydedildi (ID: {match_id})")
+        return row_count
         
     except Exception as e:
         error_msg = f"Maç bilgileri kaydedilirken hata: {type(e).__name__}: {str(e)}"
@@ -631,41 +911,56 @@ def insert_match_info(conn, match_data: Dict[str, Any]):
         conn.rollback()
         raise
 
-def update_database_schema(conn):
-    """Veritabanı şemasını günceller, yeni sütunlar ekler"""
+def insert_matches_batch(conn, matches: List[Dict[str, Any]], observed_at: Dict[int, int] = None) -> Dict[str, Any]:
+    """Birden fazla maçı tek transaction'da, tablo başına executemany ile yazar
+
+    Satırlara ayrılamayan maçlar atlanır. Toplu yazım hata verirse transaction
+    geri alınır ve hatalı maçı bulmak için maçlar tek tek yazılır. observed_at
+    verilirse oran geçmişi maç başına bu zamanlarla (match_id -> Unix ms) yazılır.
+    Yazılan ve başarısız maç ID'lerini, satır sayısını ve satır/sn değerini döndürür.
+    """
     cursor = conn.cursor()
+    started = time.perf_counter()
+    batch_rows = defaultdict(list)
+    valid_matches = []
+    failed = {}
     
+    for match_data in matches:
+        try:
+            rows = match_rows(match_data)
+        except Exception as e:
+            match_id = match_data.get('info', {}).get('id') if isinstance(match_data, dict) else None
+            failed[match_id] = f"{type(e).__name__}: {str(e)}"
+            logging.error(f"Maç verisi satırlara ayrılamadı (ID: {match_id}): {failed[match_id]}")
+            continue
+        for table, table_rows in rows.items():
+            batch_rows[table].extend(table_rows)
+        valid_matches.append(match_data)
+    
+    written = [match_data['info']['id'] for match_data in valid_matches]
     try:
-        # Odds tablosunda yeni sütunların varlığını kontrol et
-        cursor.execute("PRAGMA table_info(odds)")
-        columns = [column[1] for column in cursor.fetchall()]
-        
-        # Yeni sütunları ekle
-        new_columns = {
-            "opening_odds": "REAL",
-            "opening_goalline": "REAL",
-            "opening_side": "REAL",
-            "opening_odds_ht": "REAL",
-            "opening_goalline_ht": "REAL",
-            "opening_side_ht": "REAL",
-            "closing_odds": "REAL",
-            "closing_goalline": "REAL",
-            "closing_side": "REAL",
-            "closing_odds_ht": "REAL",
-            "closing_goalline_ht": "REAL",
-            "closing_side_ht": "REAL"
-        }
-        
-        for column_name, column_type in new_columns.items():
-            if column_name not in columns:
-                cursor.execute(f"ALTER TABLE odds ADD COLUMN {column_name} {column_type}")
-                logging.info(f"Yeni sütun eklendi: {column_name}")
-        
-        conn.commit()
-        logging.info("Veritabanı şeması güncellendi")
-        
+        row_count = _write_rows(cursor, batch_rows, observed_at)
+        refresh_daily_predictions(cursor, written)
+        STAGE_METRICS.record('insert_match_info', time.perf_counter() - started, items=len(written))
+        with STAGE_METRICS.timer('commit', items=len(written)):
+            conn.commit()
     except Exception as e:
-        error_msg = f"Veritabanı şeması güncellenirken hata: {type(e).__name__}: {str(e)}"
-        logging.error(error_msg)
         conn.rollback()
-        raise
\ No newline at end of file
+        logging.warning(f"Toplu yazım başarısız, maçlar tek tek yazılıyor: {type(e).__name__}: {str(e)}")
+        written, row_count = [], 0
+        for match_data in valid_matches:
+            match_id = match_data['info']['id']
+            try:
+                row_count += insert_match_info(conn, match_data, (observed_at or {}).get(match_id))
+                written.append(match_id)
+            except Exception as single_error:
+                failed[match_id] = f"{type(single_error).__name__}: {str(single_error)}"
+    
+    elapsed = time.perf_counter() - started
+    return {
+        'written': written,
+        'failed': failed,
+        'rows': row_count,
+        'seconds': elapsed,
+        'rows_per_sec': row_count / elapsed if elapsed > 0 else None
+    }
@@ -0,0 +1,229 @@
+import os
+import queue
+import urllib.parse
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+# Ana veritabanı dosyası (testler ve yerel denemeler için ortam değişkeniyle değiştirilebilir)
+DB_PATH = os.getenv('SOCCER_DB_PATH', 'soccer_analysis.db')
+
+# Kilitli veritabanında hata vermeden önce beklenecek süre (milisaniye)
+BUSY_TIMEOUT_MS = 30000
+
+# Bağlantı başına sayfa önbelleği (negatif değer KB cinsindendir: 16 MB)
+CACHE_SIZE_KB = 16 * 1024
+
+# Dosyanın belleğe eşlenecek kısmı (byte): okumalar sistem çağrısı yapmadan sayfa önbelleğinden gelir
+MMAP_SIZE = 256 * 1024 * 1024
+
+# Bağlantı başına önbelleğe alınan hazır sorgu (prepared statement) sayısı
+CACHED_STATEMENTS = 256
+
+# Havuzda aynı anda açık tutulacak en fazla okuma bağlantısı
+MAX_READERS = 8
+
+def configure_connection(conn: sqlite3.Connection, read_only: bool = False,
+                         immutable: bool = False) -> sqlite3.Connection:
+    """Bağlantıya WAL ve performans ayarlarını uygular
+
+    WAL modunda okuyucular yazıcıyı, yazıcı da okuyucuları bloklamaz;
+    synchronous=NORMAL ile commit her seferinde fsync beklemez (WAL'da
+    güvenlidir, sadece elektrik kesintisinde son commit'ler kaybolabilir).
+    Değişmeyen (immutable) dosyalarda günlük ayarlarına dokunulmaz.
+    """
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    if not immutable:
+        # journal_mode veritabanı dosyasında kalıcıdır, diğer ayarlar bağlantı başınadır
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    if read_only or immutable:
+        # Okuma bağlantısından yanlışlıkla yazılmasını engelle
+        conn.execute("PRAGMA query_only = ON")
+    else:
+        # Sadece henüz tablo içermeyen yeni dosyalarda etkilidir; mevcut
+        # veritabanları archive.enable_incremental_vacuum ile bir kez geçirilir
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    return conn
+
+def connect(path: str = DB_PATH, read_only: bool = False, immutable: bool = False) -> sqlite3.Connection:
+    """Ayarları uygulanmış yeni bir bağlantı açar (kapatmak çağıranın sorumluluğundadır)
+
+    immutable=True, yerinde hiç değişmeyen dosyalar içindir (ör. günlük
+    snapshot): SQLite kilit ve değişiklik kontrolü yapmadan okur.
+    """
+    database = path
+    if immutable:
+        database = f"file:{urllib.parse.quote(os.path.abspath(path))}?immutable=1"
+    # Havuzdaki bağlantılar farklı thread'lerde kullanılır; aynı anda tek thread
+    # kullanmasını havuz garanti eder
+    conn = sqlite3.connect(
+        database,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        check_same_thread=False,
+        cached_statements=CACHED_STATEMENTS,
+        uri=immutable
+    )
+    return configure_connection(conn, read_only, immutable)
+
+class ConnectionPool:
+    """Tek veritabanı dosyası için thread-safe bağlantı havuzu
+
+    Okuma bağlantıları uzun ömürlüdür; iş bitince kapatılmaz, havuza geri
+    konur ve hazır sorgu önbelleğini korur. Yazma için tek bir bağlantı
+    vardır ve kilitle sırayla kullanılır (SQLite zaten tek yazıcıya izin verir).
+    """
+
+    def __init__(self, path: str = DB_PATH, max_readers: int = MAX_READERS, immutable: bool = False):
+        self.path = path
+        self.max_readers = max_readers
+        self.immutable = immutable
+        self._idle_readers = queue.LifoQueue()
+        self._reader_count = 0
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def acquire_reader(self) -> sqlite3.Connection:
+        """Boşta bir okuma bağlantısı döndürür; yoksa açar, sınıra ulaşıldıysa bekler"""
+        try:
+            return self._idle_readers.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Bağlantı havuzu kapatıldı")
+            create = self._reader_count < self.max_readers
+            if create:
+                self._reader_count += 1
+
+        if not create:
+            return self._idle_readers.get()
+
+        try:
+            conn = connect(self.path, read_only=True, immutable=self.immutable)
+        except Exception:
+            with self._lock:
+                self._reader_count -= 1
+            raise
+        _owners[id(conn)] = self
+        return conn
+
+    def acquire_writer(self) -> sqlite3.Connection:
+        """Yazma bağlantısını kilitleyerek döndürür; release() çağrılana kadar başka thread alamaz"""
+        self._writer_lock.acquire()
+        try:
+            if self._writer is None:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Bağlantı havuzu kapatıldı")
+                if self.immutable:
+                    raise sqlite3.ProgrammingError(f"{self.path} değişmez olarak açıldı, yazılamaz")
+                self._writer = connect(self.path)
+                self._writer.execute("PRAGMA foreign_keys = ON")
+                _owners[id(self._writer)] = self
+            return self._writer
+        except Exception:
+            self._writer_lock.release()
+            raise
+
+    def release(self, conn: sqlite3.Connection):
+        """Bağlantıyı havuza geri verir; commit edilmemiş değişiklikler geri alınır"""
+        if conn.in_transaction:
+            conn.rollback()
+
+        if conn is self._writer:
+            self._writer_lock.release()
+            return
+
+        if self._closed:
+            _close(conn)
+        else:
+            self._idle_readers.put(conn)
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        conn = self.acquire_reader()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """Blok hatasız biterse commit eder"""
+        conn = self.acquire_writer()
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """Boştaki bütün bağlantıları kapatır; kullanımdaki okuyucular iade edilince kapanır"""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                _close(self._idle_readers.get_nowait())
+            except queue.Empty:
+                break
+        with self._writer_lock:
+            if self._writer is not None:
+                _close(self._writer)
+                self._writer = None
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+# Havuzdan verilen her bağlantının ait olduğu havuz (id(conn) -> havuz); havuz
+# kapatılıp yenisi açılsa da bağlantı kendi havuzuna iade edilir
+_owners: Dict[int, ConnectionPool] = {}
+
+def _close(conn: sqlite3.Connection):
+    _owners.pop(id(conn), None)
+    conn.close()
+
+def get_pool(path: str = DB_PATH, immutable: bool = False) -> ConnectionPool:
+    """Dosya başına süreç genelinde paylaşılan havuzu döndürür"""
+    with _pools_lock:
+        pool = _pools.get(path)
+        if pool is None or pool._closed:
+            pool = _pools[path] = ConnectionPool(path, immutable=immutable)
+        return pool
+
+def acquire_reader(path: str = DB_PATH) -> sqlite3.Connection:
+    return get_pool(path).acquire_reader()
+
+def acquire_writer(path: str = DB_PATH) -> sqlite3.Connection:
+    return get_pool(path).acquire_writer()
+
+def release_connection(conn: sqlite3.Connection):
+    """Bağlantıyı alındığı havuza iade eder"""
+    pool = _owners.get(id(conn))
+    if pool is None:
+        raise sqlite3.ProgrammingError("Bağlantı bir havuza ait değil")
+    pool.release(conn)
+
+def read_connection(path: str = DB_PATH):
+    """with read_connection() as conn: ... şeklinde havuzdan okuma bağlantısı"""
+    return get_pool(path).reader()
+
+def write_connection(path: str = DB_PATH):
+    """with write_connection() as conn: ... şeklinde paylaşılan yazma bağlantısı"""
+    return get_pool(path).writer()
+
+def close_pools():
+    """Bütün havuzları kapatır (süreç kapanırken)"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+    logging.debug("Veritabanı bağlantı havuzları kapatıldı")
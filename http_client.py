@@ -0,0 +1,79 @@
+import os
+import threading
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any
+
+# brotli requirements.txt'te; bu kontrol sadece paket kurulamadığında br'yi ilan etmemek için
+try:
+    import brotli  # noqa: F401  (requests ve aiohttp br çözümü için kullanır)
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+# Zaman aşımları (saniye): bağlantı kurma ve yanıt okuma ayrı sınırlanır
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '10'))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '60'))
+
+# Bağlantı havuzu: host başına açık tutulacak bağlantı sayısı (eş zamanlılık üst sınırlarından büyük)
+HTTP_POOL_SIZE = 32
+
+# DNS çözümlemelerinin önbellekte tutulacağı süre (saniye)
+DNS_CACHE_TTL = 300
+
+# Sunucudan sıkıştırılmış yanıt iste; br sadece çözücü kuruluysa ilan edilir
+ACCEPT_ENCODING = 'gzip, deflate, br' if BROTLI_AVAILABLE else 'gzip, deflate'
+DEFAULT_HEADERS = {'Accept-Encoding': ACCEPT_ENCODING}
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session() -> requests.Session:
+    """Thread'ler arasında paylaşılan, keep-alive havuzlu requests oturumunu döndürür"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            # Yeniden denemeler retry.py'de yapılır, adaptör denemesin
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE, max_retries=0)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers.update(DEFAULT_HEADERS)
+            _session = session
+        return _session
+
+def post(url: str, payload: Dict[str, Any]) -> requests.Response:
+    """Paylaşılan oturumla JSON gövdeli POST isteği gönderir"""
+    return get_session().post(url, json=payload, timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT))
+
+def close_session():
+    """Paylaşılan oturumu ve havuzdaki bağlantıları kapatır"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+def create_async_session() -> aiohttp.ClientSession:
+    """Havuzlu ve DNS önbellekli aiohttp oturumu oluşturur
+
+    aiohttp oturumları event loop'a bağlı olduğu için paylaşılmaz; her
+    çalıştırma kendi oturumunu 'async with' ile açıp kapatır.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_POOL_SIZE * 2,
+        limit_per_host=HTTP_POOL_SIZE,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        keepalive_timeout=30
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=None,
+        connect=HTTP_CONNECT_TIMEOUT,
+        sock_read=HTTP_READ_TIMEOUT
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=timeout, headers=DEFAULT_HEADERS)
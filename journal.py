@@ -0,0 +1,141 @@
+import os
+import sqlite3
+import logging
+from typing import Dict, Iterable, List
+
+# Günlük çalıştırma günlüğünün dosyası
+JOURNAL_PATH = os.getenv('INGEST_JOURNAL_PATH', 'ingest_journal.db')
+
+# Maç durumları
+PENDING = 'pending'
+IN_FLIGHT = 'in_flight'
+DONE = 'done'
+FAILED = 'failed'
+SKIPPED = 'skipped'  # Çalıştırma başlamadan önce veritabanında zaten vardı
+
+STATES = (PENDING, IN_FLIGHT, DONE, FAILED, SKIPPED)
+
+class IngestJournal:
+    """Çökmeye dayanıklı çalıştırma günlüğü
+
+    Her çalıştırmada (run_id) her maçın durumunu ve deneme sayısını tutar;
+    yeniden başlatılan çalıştırma sadece bitmemiş işlere devam eder.
+    """
+
+    def __init__(self, path: str = JOURNAL_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        # Her durum değişikliği commit edilir; WAL + NORMAL ile commit fsync beklemez
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self._create_tables()
+
+    def _create_tables(self):
+        self.conn.execute('''
+        CREATE TABLE IF NOT EXISTS runs (
+            run_id TEXT PRIMARY KEY,
+            target_date TEXT,
+            started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            finished_at TIMESTAMP
+        )
+        ''')
+        self.conn.execute('''
+        CREATE TABLE IF NOT EXISTS run_matches (
+            run_id TEXT,
+            match_id INTEGER,
+            state TEXT,
+            attempts INTEGER DEFAULT 0,
+            last_error TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (run_id, match_id)
+        )
+        ''')
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_run_matches_state ON run_matches (run_id, state)")
+        self.conn.commit()
+
+    def start_run(self, run_id: str, target_date: str) -> bool:
+        """Çalıştırmayı başlatır; daha önce başlamışsa True döndürür (devam modu)"""
+        cursor = self.conn.cursor()
+        cursor.execute("INSERT OR IGNORE INTO runs (run_id, target_date) VALUES (?, ?)", (run_id, target_date))
+        resumed = cursor.rowcount == 0
+        if resumed:
+            cursor.execute("UPDATE runs SET finished_at = NULL WHERE run_id = ?", (run_id,))
+            logging.info(f"Önceki çalıştırmaya devam ediliyor (Run: {run_id})")
+        self.conn.commit()
+        return resumed
+
+    def finish_run(self, run_id: str):
+        self.conn.execute("UPDATE runs SET finished_at = CURRENT_TIMESTAMP WHERE run_id = ?", (run_id,))
+        self.conn.commit()
+
+    def is_complete(self, run_id: str) -> bool:
+        """Çalıştırma bitmiş ve bekleyen maçı kalmamışsa True döndürür"""
+        row = self.conn.execute("SELECT finished_at FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        if not row or row[0] is None:
+            return False
+        return not self.match_ids(run_id, [PENDING, IN_FLIGHT])
+
+    def register(self, run_id: str, match_ids: Iterable[int]):
+        """Yeni maçları beklemede olarak ekler, mevcut durumlara dokunmaz"""
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO run_matches (run_id, match_id, state) VALUES (?, ?, ?)",
+            ((run_id, match_id, PENDING) for match_id in match_ids)
+        )
+        self.conn.commit()
+
+    def mark_skipped(self, run_id: str, match_ids: Iterable[int]):
+        """Veritabanında zaten olan maçları (sadece beklemedeyse) atlandı olarak işaretler"""
+        self.conn.executemany(
+            "UPDATE run_matches SET state = ?, updated_at = CURRENT_TIMESTAMP "
+            "WHERE run_id = ? AND match_id = ? AND state = ?",
+            ((SKIPPED, run_id, match_id, PENDING) for match_id in match_ids)
+        )
+        self.conn.commit()
+
+    def mark_in_flight(self, run_id: str, match_id: int):
+        self.conn.execute(
+            "UPDATE run_matches SET state = ?, attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP "
+            "WHERE run_id = ? AND match_id = ?",
+            (IN_FLIGHT, run_id, match_id)
+        )
+        self.conn.commit()
+
+    def mark_done(self, run_id: str, match_id: int):
+        self.conn.execute(
+            "UPDATE run_matches SET state = ?, last_error = NULL, updated_at = CURRENT_TIMESTAMP "
+            "WHERE run_id = ? AND match_id = ?",
+            (DONE, run_id, match_id)
+        )
+        self.conn.commit()
+
+    def mark_failed(self, run_id: str, match_id: int, error: str = None):
+        self.conn.execute(
+            "UPDATE run_matches SET state = ?, last_error = ?, updated_at = CURRENT_TIMESTAMP "
+            "WHERE run_id = ? AND match_id = ?",
+            (FAILED, error, run_id, match_id)
+        )
+        self.conn.commit()
+
+    def match_ids(self, run_id: str, states: Iterable[str]) -> List[int]:
+        """Verilen durumlardaki maç ID'lerini döndürür"""
+        states = list(states)
+        placeholders = ','.join(['?' for _ in states])
+        cursor = self.conn.execute(
+            f"SELECT match_id FROM run_matches WHERE run_id = ? AND state IN ({placeholders}) ORDER BY match_id",
+            [run_id] + states
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+    def summary(self, run_id: str) -> Dict[str, int]:
+        """Her durumdaki maç sayısını döndürür"""
+        counts = {state: 0 for state in STATES}
+        cursor = self.conn.execute(
+            "SELECT state, COUNT(*) FROM run_matches WHERE run_id = ? GROUP BY state", (run_id,)
+        )
+        for state, count in cursor.fetchall():
+            counts[state] = count
+        counts['total'] = sum(counts[state] for state in STATES)
+        return counts
+
+    def close(self):
+        self.conn.close()
@@ -1,4 +1,6 @@
-import sqlite3
+from db_connection import release_connection
+from snapshot import acquire_snapshot_reader
+from queries import MAJOR_LEAGUE_PREDICTIONS_QUERY, HT_GOALS_PREDICTIONS_QUERY, DAILY_PREDICTIONS_QUERY
 from datetime import datetime
 import random
 import os
@@ -15,29 +17,6 @@ load_dotenv()
 # Türkiye saat dilimi
 TR_TIMEZONE = pytz.timezone('Europe/Istanbul')
 
-# Major ligler listesi
-MAJOR_LEAGUES = [
-    'Spanish La Liga',
-    'English Premier League',
-    'German Bundesliga',
-    'German Bundesliga 2',
-    'Italian Serie A',
-    'Italian Serie B',
-    'French Ligue 1',
-    'Turkey Super Lig',
-    'Uefa Champions League',
-    'Uefa Europa League',
-    'Uefa Europa Conference League',
-    'England Championship',
-    'Uefa Nations League'
-    'Spanish La Liga 2',
-    'Liga Portugal 1',
-    'Holland Eredivisie',
-    'Belgium Pro League',
-    'Switzerland Super League',
-    'Austrian Bundesliga',
-]
-
 # Reklam şablonları
 AD_TEMPLATES = [
     {
@@ -164,51 +143,17 @@ DEFAULT_COMMENTS = [
 # Global variable to keep track of current ad index
 _current_ad_index = 0
 
-def get_db_connection():
-    """Veritabanı bağlantısı oluşturur"""
-    return sqlite3.connect('soccer_analysis.db')
-
 def get_major_league_predictions() -> List[Dict[str, Any]]:
     """Major liglerden tahminleri alır"""
     try:
-        conn = get_db_connection()
+        conn = acquire_snapshot_reader()
         cursor = conn.cursor()
         
         # Bugünün tarihini Türkiye saatine göre al
         today = datetime.now(TR_TIMEZONE).strftime("%Y-%m-%d")
         logging.info(f"Aranan tarih: {today}")
         
-        # Major ligler için placeholder oluştur
-        placeholders = ','.join(['?' for _ in MAJOR_LEAGUES])
-        
-        query = f"""
-        SELECT m.match_id, m.league, m.home_team, m.away_team, m.match_time,
-               p.over_prediction, p.btts_prediction, p.match_result_prediction,
-               p.ht_goal_prediction, p.risky_prediction
-        FROM matches m
-        LEFT JOIN predictions p ON m.match_id = p.match_id
-        WHERE m.match_date = ?
-        AND m.league IN ({placeholders})
-        AND (
-            p.over_prediction IS NOT NULL OR 
-            p.btts_prediction IS NOT NULL OR 
-            p.match_result_prediction IS NOT NULL OR
-            p.risky_prediction IS NOT NULL OR
-            p.ht_goal_prediction IS NOT NULL
-        )
-        AND (
-            LENGTH(TRIM(COALESCE(p.over_prediction, ''))) > 0 OR
-            LENGTH(TRIM(COALESCE(p.btts_prediction, ''))) > 0 OR
-            LENGTH(TRIM(COALESCE(p.match_result_prediction, ''))) > 0 OR
-            LENGTH(TRIM(COALESCE(p.risky_prediction, ''))) > 0 OR
-            LENGTH(TRIM(COALESCE(p.ht_goal_prediction, ''))) > 0
-        )
-        ORDER BY m.match_time ASC
-        """
-        
-        # Parametreleri hazırla: önce tarih, sonra major ligler
-        params = [today] + MAJOR_LEAGUES
-        cursor.execute(query, params)
+        cursor.execute(MAJOR_LEAGUE_PREDICTIONS_QUERY, (today,))
         predictions = cursor.fetchall()
         
         if not predictions:
@@ -246,72 +191,41 @@ def get_major_league_predictions() -> List[Dict[str, Any]]:
         
     finally:
         if 'conn' in locals():
-            conn.close()
+            release_connection(conn)
 
 def get_ht_goals_predictions() -> List[Dict[str, Any]]:
     """İlk yarı gol tahminlerini alır"""
     try:
-        conn = get_db_connection()
+        conn = acquire_snapshot_reader()
         cursor = conn.cursor()
         
         # Bugünün tarihini Türkiye saatine göre al
         today = datetime.now(TR_TIMEZONE).strftime("%Y-%m-%d")
         
-        query = """
-        SELECT DISTINCT m.match_id, m.league, m.home_team, m.away_team, m.match_time,
-               p.ht_goal_prediction, 
-               COALESCE(pc.over_05_ht_percent, '0%') as over_05_ht_percent,
-               COALESCE(pc.over_15_ht_percent, '0%') as over_15_ht_percent,
-               o.opening_goalline, o.closing_goalline,
-               o.opening_goalline_ht, o.closing_goalline_ht
-        FROM matches m
-        LEFT JOIN predictions p ON m.match_id = p.match_id
-        LEFT JOIN percentages pc ON m.match_id = pc.match_id
-        LEFT JOIN odds o ON m.match_id = o.match_id AND o.bookmaker = 'Bet365'
-        WHERE m.match_date = ?
-        AND p.ht_goal_prediction IS NOT NULL
-        AND LENGTH(TRIM(p.ht_goal_prediction)) > 0
-        ORDER BY m.match_time ASC
-        """
-        
-        cursor.execute(query, (today,))
+        cursor.execute(HT_GOALS_PREDICTIONS_QUERY, (today,))
         predictions = cursor.fetchall()
         
-        # Benzersiz maçları tutmak için set kullanıyoruz
-        seen_match_ids = set()
+        # Alt tablolar maç (ve bahis şirketi) başına tek satır tuttuğu için
+        # JOIN her maç için tek satır döndürür
         result = []
         
         for pred in predictions:
             try:
-                match_id = pred[0]
-                
-                # Eğer bu maç daha önce eklenmediyse
-                if match_id not in seen_match_ids:
-                    # Yüzde işaretini kaldır ve integer'a çevir
-                    over_05_percent = pred[6].replace('%', '') if pred[6] else '0'
-                    over_15_percent = pred[7].replace('%', '') if pred[7] else '0'
-                    
-                    # İlk yarı kapanış goalline değeri 1'den küçük olan maçları filtrele
-                    closing_goalline_ht = pred[11]
-                    if closing_goalline_ht is not None and float(closing_goalline_ht) < 1:
-                        continue
-                    
-                    prediction = {
-                        'match_id': match_id,
-                        'league': pred[1],
-                        'home_team': pred[2],
-                        'away_team': pred[3],
-                        'match_time': pred[4],
-                        'ht_goal_prediction': pred[5],
-                        'over_05_ht_percent': int(over_05_percent),
-                        'over_15_ht_percent': int(over_15_percent),
-                        'opening_goalline': pred[8],
-                        'closing_goalline': pred[9],
-                        'opening_goalline_ht': pred[10],
-                        'closing_goalline_ht': pred[11]
-                    }
-                    result.append(prediction)
-                    seen_match_ids.add(match_id)
+                prediction = {
+                    'match_id': pred[0],
+                    'league': pred[1],
+                    'home_team': pred[2],
+                    'away_team': pred[3],
+                    'match_time': pred[4],
+                    'ht_goal_prediction': pred[5],
+                    'over_05_ht_percent': pred[6],
+                    'over_15_ht_percent': pred[7],
+                    'opening_goalline': pred[8],
+                    'closing_goalline': pred[9],
+                    'opening_goalline_ht': pred[10],
+                    'closing_goalline_ht': pred[11]
+                }
+                result.append(prediction)
             except Exception as e:
                 logging.error(f"Tahmin verisi işlenirken hata: {str(e)}")
                 continue
@@ -323,7 +237,7 @@ def get_ht_goals_predictions() -> List[Dict[str, Any]]:
         return []
     finally:
         if 'conn' in locals():
-            conn.close()
+            release_connection(conn)
 
 def create_ht_goals_table_image(predictions: List[Dict[str, Any]]) -> List[str]:
     """İlk yarı gol tahminlerini görsel tablo olarak oluşturur"""
@@ -586,18 +500,14 @@ def create_ht_goals_table_image(predictions: List[Dict[str, Any]]) -> List[str]:
             cell_color = text_color
             cell_bg_color = None
             
-            try:
-                if (pred.get('opening_goalline') is not None and 
-                    pred.get('closing_goalline') is not None):
-                    opening_val = float(pred['opening_goalline'])
-                    closing_val = float(pred['closing_goalline'])
-                    
-                    if closing_val > opening_val:
-                        cell_bg_color = increase_color
-                    elif closing_val < opening_val:
-                        cell_bg_color = decrease_color
-            except (ValueError, TypeError):
-                pass
+            # Goalline değerleri ingest sırasında sayıya çevrilir (eksikse NULL)
+            opening_val = pred.get('opening_goalline')
+            closing_val = pred.get('closing_goalline')
+            if opening_val is not None and closing_val is not None:
+                if closing_val > opening_val:
+                    cell_bg_color = increase_color
+                elif closing_val < opening_val:
+                    cell_bg_color = decrease_color
                 
             # Arka plan rengi varsa, önce onu çiz
             if cell_bg_color:
@@ -633,18 +543,14 @@ def create_ht_goals_table_image(predictions: List[Dict[str, Any]]) -> List[str]:
             cell_color = text_color
             cell_bg_color = None
             
-            try:
-                if (pred.get('opening_goalline_ht') is not None and 
-                    pred.get('closing_goalline_ht') is not None):
-                    opening_val = float(pred['opening_goalline_ht'])
-                    closing_val = float(pred['closing_goalline_ht'])
-                    
-                    if closing_val > opening_val:
-                        cell_bg_color = increase_color
-                    elif closing_val < opening_val:
-                        cell_bg_color = decrease_color
-            except (ValueError, TypeError):
-                pass
+            # Goalline değerleri ingest sırasında sayıya çevrilir (eksikse NULL)
+            opening_val = pred.get('opening_goalline_ht')
+            closing_val = pred.get('closing_goalline_ht')
+            if opening_val is not None and closing_val is not None:
+                if closing_val > opening_val:
+                    cell_bg_color = increase_color
+                elif closing_val < opening_val:
+                    cell_bg_color = decrease_color
                 
             # Arka plan rengi varsa, önce onu çiz
             if cell_bg_color:
@@ -872,42 +778,13 @@ def get_random_ad() -> Dict[str, Any]:
 def get_daily_predictions(count: int = 1) -> List[Dict[str, Any]]:
     """Günlük tahminleri alır"""
     try:
-        conn = get_db_connection()
+        conn = acquire_snapshot_reader()
         cursor = conn.cursor()
         
         # Bugünün tarihini Türkiye saatine göre al
         today = datetime.now(TR_TIMEZONE).strftime("%Y-%m-%d")
         
-        # Major ligler için placeholder oluştur
-        placeholders = ','.join(['?' for _ in MAJOR_LEAGUES])
-        
-        query = f"""
-        SELECT m.match_id, m.league, m.home_team, m.away_team, m.match_time,
-               p.over_prediction, p.btts_prediction, p.match_result_prediction,
-               p.ht_goal_prediction, p.risky_prediction
-        FROM matches m
-        LEFT JOIN predictions p ON m.match_id = p.match_id
-        WHERE m.match_date = ?
-        AND m.league IN ({placeholders})
-        AND (
-            p.over_prediction IS NOT NULL OR 
-            p.btts_prediction IS NOT NULL OR 
-            p.match_result_prediction IS NOT NULL OR
-            p.risky_prediction IS NOT NULL
-        )
-        AND (
-            LENGTH(TRIM(COALESCE(p.over_prediction, ''))) > 0 OR
-            LENGTH(TRIM(COALESCE(p.btts_prediction, ''))) > 0 OR
-            LENGTH(TRIM(COALESCE(p.match_result_prediction, ''))) > 0 OR
-            LENGTH(TRIM(COALESCE(p.risky_prediction, ''))) > 0
-        )
-        ORDER BY RANDOM()
-        LIMIT ?
-        """
-        
-        # Parametreleri hazırla: önce tarih, sonra major ligler, en son limit
-        params = [today] + MAJOR_LEAGUES + [count]
-        cursor.execute(query, params)
+        cursor.execute(DAILY_PREDICTIONS_QUERY, (today, count))
         predictions = cursor.fetchall()
         
         result = []
@@ -933,7 +810,7 @@ def get_daily_predictions(count: int = 1) -> List[Dict[str, Any]]:
         return []
     finally:
         if 'conn' in locals():
-            conn.close()
+            release_connection(conn)
 
 def get_good_morning_message() -> str:
     """Günün günaydın mesajını döndürür"""
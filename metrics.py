@@ -0,0 +1,71 @@
+import time
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Any, List
+from concurrency import percentile
+
+class StageMetrics:
+    """Boru hattı aşamalarının (fetch, analyze, decode, insert, commit) süre kayıtları
+
+    Varsayılan olarak kapalıdır; kapalıyken timer() ölçüm yapmaz. Benchmark
+    gibi ölçüm isteyen araçlar enable() ile açar.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._durations: Dict[str, List[float]] = defaultdict(list)
+        self._items: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def reset(self):
+        with self._lock:
+            self._durations.clear()
+            self._items.clear()
+
+    def record(self, stage: str, seconds: float, items: int = 1):
+        """Tek bir ölçümü kaydeder; items, işlemin kapsadığı maç sayısıdır (ör. maç listesi)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._durations[stage].append(seconds)
+            self._items[stage] += items
+
+    @contextmanager
+    def timer(self, stage: str, items: int = 1):
+        """Blok süresini aşamaya kaydeder (hata fırlatsa da); items, bloğun kapsadığı maç sayısıdır"""
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started, items)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Her aşama için sayı, toplam süre, saniyedeki maç ve p50/p95/p99 döndürür"""
+        with self._lock:
+            durations = {stage: list(values) for stage, values in self._durations.items()}
+            items = dict(self._items)
+
+        result = {}
+        for stage, values in durations.items():
+            total = sum(values)
+            result[stage] = {
+                'count': len(values),
+                'matches': items[stage],
+                'total_seconds': total,
+                # Aşama tek başına, sırayla çalışsaydı ulaşacağı hız
+                'matches_per_sec': items[stage] / total if total > 0 else None,
+                'p50': percentile(values, 50),
+                'p95': percentile(values, 95),
+                'p99': percentile(values, 99)
+            }
+        return result
+
+# Süreç genelinde paylaşılan ölçüm kaydı
+STAGE_METRICS = StageMetrics()
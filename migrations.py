@@ -0,0 +1,593 @@
+import logging
+import argparse
+from typing import Callable, Dict, List, Tuple
+from database import (
+    create_connection, create_tables, pack_floats, to_float, parse_percent, LABEL_SEPARATOR, MAJOR_LEAGUES
+)
+from odds_history import seed_history
+
+# Şema sürümü veritabanı dosyasının başlığındaki PRAGMA user_version'da tutulur.
+# Her migration bir kez, kendi transaction'ı içinde uygulanır ve sürümü artırır.
+#
+# 1-4 arası migration'lar sürümlemeden önce oluşturulmuş veritabanlarında da
+# (user_version = 0) güvenle çalışacak şekilde yazılmıştır. Yeni migration'lar
+# sadece bir önceki sürümün şemasını varsaymalıdır; mevcut bir migration
+# değiştirilmez, yeni değişiklik için listeye yeni sürüm eklenir.
+
+def _add_odds_line_columns(conn):
+    """odds tablosuna goalline/side sütunlarını ekler (eski veritabanlarında yoktu)"""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(odds)")}
+    for column_name in (
+        "opening_odds", "opening_goalline", "opening_side",
+        "opening_odds_ht", "opening_goalline_ht", "opening_side_ht",
+        "closing_odds", "closing_goalline", "closing_side",
+        "closing_odds_ht", "closing_goalline_ht", "closing_side_ht"
+    ):
+        if column_name not in columns:
+            conn.execute(f"ALTER TABLE odds ADD COLUMN {column_name} REAL")
+            logging.info(f"Yeni sütun eklendi: {column_name}")
+
+# Migration 3'teki doğal anahtarlar (sonraki şema değişiklikleri bunları değiştirmez)
+NATURAL_KEYS_V3 = {
+    'predictions': ('match_id',),
+    'goal_stats': ('match_id',),
+    'percentages': ('match_id',),
+    'last_10_matches': ('match_id',),
+    'odds': ('match_id', 'bookmaker'),
+    'corner_odds': ('match_id', 'bookmaker', 'is_live'),
+    'double_chance_odds': ('match_id', 'bookmaker'),
+    'score_odds': ('match_id', 'bookmaker', 'score_type'),
+    'match_statistics': ('match_id', 'team_type'),
+    'h2h_matches': ('match_id', 'game_date', 'home_team', 'away_team'),
+    'h2h_statistics': ('match_id',),
+    'poisson_distribution': ('match_id', 'distribution_type'),
+    'match_scores': ('match_id',)
+}
+
+def _add_natural_keys(conn):
+    """Alt tablolara doğal anahtar (UNIQUE index) ekler
+
+    Aynı anahtara sahip tekrar eden satırlar önce silinir; her anahtar için
+    en yeni (en büyük id'li) satır kalır.
+    """
+    existing_indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    for table, key in NATURAL_KEYS_V3.items():
+        index_name = f"uq_{table}_natural_key"
+        if index_name in existing_indexes:
+            continue
+
+        key_columns = ', '.join(key)
+        cursor = conn.execute(f"""
+            DELETE FROM {table}
+            WHERE id NOT IN (SELECT MAX(id) FROM {table} GROUP BY {key_columns})
+        """)
+        if cursor.rowcount > 0:
+            logging.info(f"{table}: {cursor.rowcount} tekrar eden satır silindi")
+        conn.execute(f"CREATE UNIQUE INDEX {index_name} ON {table} ({key_columns})")
+        logging.info(f"Doğal anahtar eklendi: {table} ({key_columns})")
+
+def _add_read_path_indexes(conn):
+    """Günlük okuma sorguları için index'ler
+
+    Alt tabloların match_id (ve bookmaker) aramaları doğal anahtarların
+    UNIQUE index'leriyle zaten karşılanır.
+    """
+    # Günlük paylaşım sorguları: tarih + lig filtresi, saate göre sıralama
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_matches_date_league_time "
+                 "ON matches (match_date, league, match_time)")
+    # result.get_completed_matches: sadece skoru 0-0 olan (az sayıda) maçlar
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_match_scores_goalless ON match_scores (match_id)
+        WHERE home_score = 0 AND away_score = 0 AND ht_home_score = 0 AND ht_away_score = 0
+    """)
+
+def rebuild_table(conn, table: str, create_sql: str, select_sql: str, indexes: List[str] = ()):
+    """Tabloyu yeni tanımıyla yeniden oluşturur (sütun tipi değişiklikleri için)
+
+    SQLite ALTER TABLE ile sütun tipini değiştiremez; yeni tablo oluşturulur,
+    veri select_sql ile (dönüştürülerek) kopyalanır, eski tablo silinir ve
+    yenisi eski adı alır. Tablonun index'leri silindiği için indexes ile
+    yeniden oluşturulmalıdır. create_sql'deki tablo adı '{table}' olmalıdır.
+    """
+    new_table = f"{table}__new"
+    conn.execute(create_sql.format(table=new_table))
+    conn.execute(f"INSERT INTO {new_table} {select_sql}")
+    conn.execute(f"DROP TABLE {table}")
+    conn.execute(f"ALTER TABLE {new_table} RENAME TO {table}")
+    for index_sql in indexes:
+        conn.execute(index_sql)
+
+    violations = conn.execute(f"PRAGMA foreign_key_check({table})").fetchall()
+    if violations:
+        raise RuntimeError(f"{table}: yeniden oluşturma sonrası {len(violations)} foreign key ihlali")
+
+class _PackFloats:
+    """Grup içindeki satırların değerlerini (okunma sırasıyla) tek BLOB'a paketleyen SQL aggregate'i"""
+
+    def __init__(self):
+        self.values = []
+
+    def step(self, *values):
+        self.values.extend(0.0 if value is None else float(value) for value in values)
+
+    def finalize(self):
+        return pack_floats(self.values)
+
+def _pack_score_odds_and_poisson(conn):
+    """score_odds'u bahis şirketi başına, poisson_distribution'ı maç başına tek satıra paketler
+
+    Etiketler (group_concat) ve değerler (pack_floats) aynı alt sorgu
+    sırasıyla toplandığı için i. etiket i. değere karşılık gelir.
+    """
+    conn.create_aggregate('pack_floats', -1, _PackFloats)
+    try:
+        rebuild_table(conn, 'score_odds', '''
+            CREATE TABLE {table} (
+                id INTEGER PRIMARY KEY,
+                match_id INTEGER,
+                bookmaker TEXT,
+                score_types TEXT,  -- virgülle ayrılmış skor tipleri: h1, h2, d1 ... veya 1-0, 2-1 ...
+                odds BLOB,  -- score_types sırasıyla little-endian float64 oranlar
+                FOREIGN KEY (match_id) REFERENCES matches (match_id)
+            )
+        ''', f'''
+            (match_id, bookmaker, score_types, odds)
+            SELECT match_id, bookmaker, group_concat(score_type, '{LABEL_SEPARATOR}'), pack_floats(odds_value)
+            FROM (SELECT * FROM score_odds ORDER BY match_id, bookmaker, id)
+            GROUP BY match_id, bookmaker
+        ''', [
+            "CREATE UNIQUE INDEX uq_score_odds_natural_key ON score_odds (match_id, bookmaker)"
+        ])
+
+        rebuild_table(conn, 'poisson_distribution', '''
+            CREATE TABLE {table} (
+                id INTEGER PRIMARY KEY,
+                match_id INTEGER,
+                distribution_types TEXT,  -- virgülle ayrılmış: total, home, away, total_ht ...
+                goals BLOB,  -- dağılım başına 0-5 gol olasılıkları art arda, little-endian float64
+                FOREIGN KEY (match_id) REFERENCES matches (match_id)
+            )
+        ''', f'''
+            (match_id, distribution_types, goals)
+            SELECT match_id, group_concat(distribution_type, '{LABEL_SEPARATOR}'),
+                   pack_floats(goals_0, goals_1, goals_2, goals_3, goals_4, goals_5)
+            FROM (SELECT * FROM poisson_distribution ORDER BY match_id, id)
+            GROUP BY match_id
+        ''', [
+            "CREATE UNIQUE INDEX uq_poisson_distribution_natural_key ON poisson_distribution (match_id)"
+        ])
+    finally:
+        conn.create_aggregate('pack_floats', -1, None)
+
+# Sayısal olması gerektiği halde eski kayıtlarda '' veya metin olarak tutulabilen REAL sütunlar
+NUMERIC_ODDS_COLUMNS_V6 = {
+    'odds': (
+        'ms1_opening', 'msx_opening', 'ms2_opening', 'ms1_closing', 'msx_closing', 'ms2_closing',
+        'ht1_opening', 'htx_opening', 'ht2_opening', 'ht1_closing', 'htx_closing', 'ht2_closing',
+        'opening_odds', 'opening_goalline', 'opening_side', 'opening_odds_ht', 'opening_goalline_ht',
+        'opening_side_ht', 'closing_odds', 'closing_goalline', 'closing_side', 'closing_odds_ht',
+        'closing_goalline_ht', 'closing_side_ht'
+    ),
+    'corner_odds': ('over_value', 'over_line', 'under_value'),
+    'double_chance_odds': ('home_draw_value', 'home_away_value', 'away_draw_value'),
+    'goal_stats': ('home_goal_exp', 'away_goal_exp', 'home_goal_ht_exp', 'away_goal_ht_exp')
+}
+
+# '65%' olarak tutulan tek değerli yüzde sütunları (MS ve İY yüzdeleri metin kalır)
+PERCENT_COLUMNS_V6 = (
+    'home_goal_percent', 'away_goal_percent', 'over_percent_1', 'over_percent_2', 'over_percent_3',
+    'home_goal_ht_percent', 'away_goal_ht_percent', 'over_05_ht_percent', 'over_15_ht_percent',
+    'over_25_ht_percent'
+)
+
+def _normalize_numeric_columns(conn):
+    """Yüzdeleri INTEGER sütunlara, metin olarak kalmış oranları REAL'e çevirir; boş değerler NULL olur"""
+    conn.create_function('to_float', 1, to_float, deterministic=True)
+    conn.create_function('parse_percent', 1, parse_percent, deterministic=True)
+    try:
+        for table, columns in NUMERIC_ODDS_COLUMNS_V6.items():
+            for column in columns:
+                conn.execute(f"UPDATE {table} SET {column} = to_float({column}) WHERE typeof({column}) = 'text'")
+
+        percent_columns = ', '.join(f"parse_percent({column})" for column in PERCENT_COLUMNS_V6)
+        rebuild_table(conn, 'percentages', '''
+            CREATE TABLE {table} (
+                id INTEGER PRIMARY KEY,
+                match_id INTEGER,
+                home_goal_percent INTEGER,
+                away_goal_percent INTEGER,
+                over_percent_1 INTEGER,
+                over_percent_2 INTEGER,
+                over_percent_3 INTEGER,
+                match_result_percents TEXT,
+                home_goal_ht_percent INTEGER,
+                away_goal_ht_percent INTEGER,
+                over_05_ht_percent INTEGER,
+                over_15_ht_percent INTEGER,
+                over_25_ht_percent INTEGER,
+                ht_result_percents TEXT,
+                FOREIGN KEY (match_id) REFERENCES matches (match_id)
+            )
+        ''', f'''
+            (id, match_id, {', '.join(PERCENT_COLUMNS_V6)}, match_result_percents, ht_result_percents)
+            SELECT id, match_id, {percent_columns}, match_result_percents, ht_result_percents
+            FROM percentages
+        ''', [
+            "CREATE UNIQUE INDEX uq_percentages_natural_key ON percentages (match_id)"
+        ])
+    finally:
+        conn.create_function('to_float', 1, None)
+        conn.create_function('parse_percent', 1, None)
+
+# Migration 7'deki ilk doldurma sorgusu (sürüm 7 şemasına göre; lig ve
+# takım adları henüz matches'te, Bet365 satırı bookmaker adıyla bulunur)
+_NON_BLANK_V7 = "LENGTH(TRIM(COALESCE({}, ''))) > 0"
+_HAS_MAIN_PREDICTION_V7 = ' OR '.join(
+    _NON_BLANK_V7.format(f"p.{column}")
+    for column in ('over_prediction', 'btts_prediction', 'match_result_prediction', 'risky_prediction')
+)
+DAILY_PREDICTIONS_V7_SQL = f"""
+    INSERT OR REPLACE INTO daily_predictions (
+        match_id, match_date, match_time, league, home_team, away_team,
+        over_prediction, btts_prediction, match_result_prediction, ht_goal_prediction, risky_prediction,
+        over_05_ht_percent, over_15_ht_percent,
+        opening_goalline, closing_goalline, opening_goalline_ht, closing_goalline_ht,
+        has_any_prediction, has_main_prediction, is_major_league, ht_eligible
+    )
+    SELECT m.match_id, m.match_date, m.match_time, m.league, m.home_team, m.away_team,
+           p.over_prediction, p.btts_prediction, p.match_result_prediction, p.ht_goal_prediction, p.risky_prediction,
+           pc.over_05_ht_percent, pc.over_15_ht_percent,
+           o.opening_goalline, o.closing_goalline, o.opening_goalline_ht, o.closing_goalline_ht,
+           ({_HAS_MAIN_PREDICTION_V7}) OR {_NON_BLANK_V7.format('p.ht_goal_prediction')},
+           {_HAS_MAIN_PREDICTION_V7},
+           m.league IN ({', '.join('?' for _ in MAJOR_LEAGUES)}),
+           {_NON_BLANK_V7.format('p.ht_goal_prediction')}
+               AND (o.closing_goalline_ht IS NULL OR o.closing_goalline_ht >= 1)
+    FROM matches m
+    LEFT JOIN predictions p ON m.match_id = p.match_id
+    LEFT JOIN percentages pc ON m.match_id = pc.match_id
+    LEFT JOIN odds o ON m.match_id = o.match_id AND o.bookmaker = 'Bet365'
+"""
+
+def _create_daily_predictions(conn):
+    """Paylaşım sorguları için günlük tahmin tablosunu oluşturur ve mevcut maçlarla doldurur
+
+    Tablo her yazımda database.refresh_daily_predictions ile güncellenir.
+    Kısmi index'ler her paylaşım sorgusunu tek bir tarih aralığı okumasına indirir.
+    """
+    conn.execute("""
+        CREATE TABLE daily_predictions (
+            match_id INTEGER PRIMARY KEY,
+            match_date TEXT NOT NULL,
+            match_time TEXT,
+            league TEXT,
+            home_team TEXT,
+            away_team TEXT,
+            over_prediction TEXT,
+            btts_prediction TEXT,
+            match_result_prediction TEXT,
+            ht_goal_prediction TEXT,
+            risky_prediction TEXT,
+            over_05_ht_percent INTEGER,
+            over_15_ht_percent INTEGER,
+            opening_goalline REAL,
+            closing_goalline REAL,
+            opening_goalline_ht REAL,
+            closing_goalline_ht REAL,
+            has_any_prediction INTEGER NOT NULL,
+            has_main_prediction INTEGER NOT NULL,
+            is_major_league INTEGER NOT NULL,
+            ht_eligible INTEGER NOT NULL,
+            FOREIGN KEY (match_id) REFERENCES matches (match_id)
+        )
+    """)
+    conn.execute("""
+        CREATE INDEX idx_daily_predictions_major ON daily_predictions (match_date, match_time)
+        WHERE is_major_league = 1 AND has_any_prediction = 1
+    """)
+    conn.execute("""
+        CREATE INDEX idx_daily_predictions_ht ON daily_predictions (match_date, match_time)
+        WHERE ht_eligible = 1
+    """)
+    conn.execute(DAILY_PREDICTIONS_V7_SQL, MAJOR_LEAGUES)
+    count = conn.execute("SELECT COUNT(*) FROM daily_predictions").fetchone()[0]
+    logging.info(f"daily_predictions: {count} maç eklendi")
+
+# Migration 8'de bahis şirketi adı yerine bookmaker_id tutan tablolar: (sütun, tip) ve doğal anahtar
+BOOKMAKER_TABLES_V8 = {
+    'odds': ([(column, 'REAL') for column in NUMERIC_ODDS_COLUMNS_V6['odds']], ('match_id', 'bookmaker_id')),
+    'corner_odds': ([('over_value', 'REAL'), ('over_line', 'REAL'), ('under_value', 'REAL'), ('is_live', 'BOOLEAN')],
+                    ('match_id', 'bookmaker_id', 'is_live')),
+    'double_chance_odds': ([('home_draw_value', 'REAL'), ('home_away_value', 'REAL'), ('away_draw_value', 'REAL')],
+                           ('match_id', 'bookmaker_id')),
+    'score_odds': ([('score_types', 'TEXT'), ('odds', 'BLOB')], ('match_id', 'bookmaker_id'))
+}
+
+def _rebuild_with_bookmaker_ids(conn, table: str, value_columns: List[Tuple[str, str]], key: Tuple[str, ...]):
+    """Tablonun bookmaker metin sütununu bookmakers tablosuna bağlı bookmaker_id ile değiştirir
+
+    Sadece büyük/küçük harfle ayrışan adlar artık aynı ID'ye düştüğü için
+    anahtar başına en yeni satır tutulur (SQLite'ta MAX(id) ile seçilen
+    gruptaki diğer sütunlar da o satırdan gelir).
+    """
+    columns = ', '.join(column for column, _ in value_columns)
+    definitions = ''.join(f"{column} {column_type},\n" for column, column_type in value_columns)
+    group_by = ', '.join('b.bookmaker_id' if column == 'bookmaker_id' else f"t.{column}" for column in key)
+    rebuild_table(conn, table, f'''
+        CREATE TABLE {{table}} (
+            id INTEGER PRIMARY KEY,
+            match_id INTEGER,
+            bookmaker_id INTEGER REFERENCES bookmakers (bookmaker_id),
+            {definitions}
+            FOREIGN KEY (match_id) REFERENCES matches (match_id)
+        )
+    ''', f'''
+        (id, match_id, bookmaker_id, {columns})
+        SELECT MAX(t.id), t.match_id, b.bookmaker_id, {', '.join(f"t.{column}" for column, _ in value_columns)}
+        FROM {table} t
+        LEFT JOIN bookmakers b ON b.name = t.bookmaker
+        GROUP BY {group_by}
+    ''', [
+        f"CREATE UNIQUE INDEX uq_{table}_natural_key ON {table} ({', '.join(key)})"
+    ])
+
+def _add_dimension_tables(conn):
+    """Lig, takım ve bahis şirketi adlarını tamsayı anahtarlı sözlük tablolarına taşır
+
+    matches, h2h_matches ve oran tabloları adı tekrar tekrar saklamak yerine
+    sözlük ID'si tutar. Adlar büyük/küçük harf duyarsızdır; API'nin farklı
+    yazımları name_aliases ile aynı kayda bağlanır. Major ligler artık
+    leagues.is_major bayrağıyla işaretlenir.
+    """
+    conn.execute("""
+        CREATE TABLE leagues (
+            league_id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+            is_major INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE teams (
+            team_id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE COLLATE NOCASE
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE bookmakers (
+            bookmaker_id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE COLLATE NOCASE
+        )
+    """)
+    # dimension: sözlük tablosunun adı (leagues, teams, bookmakers)
+    conn.execute("""
+        CREATE TABLE name_aliases (
+            dimension TEXT NOT NULL,
+            alias TEXT NOT NULL COLLATE NOCASE,
+            canonical_id INTEGER NOT NULL,
+            PRIMARY KEY (dimension, alias)
+        ) WITHOUT ROWID
+    """)
+
+    conn.execute("""
+        INSERT OR IGNORE INTO leagues (name)
+        SELECT league FROM matches WHERE TRIM(league) != ''
+        UNION SELECT league FROM h2h_matches WHERE TRIM(league) != ''
+    """)
+    conn.execute(f"UPDATE leagues SET is_major = 1 WHERE name IN ({', '.join('?' for _ in MAJOR_LEAGUES)})",
+                 MAJOR_LEAGUES)
+    conn.execute("""
+        INSERT OR IGNORE INTO teams (name)
+        SELECT home_team FROM matches WHERE TRIM(home_team) != ''
+        UNION SELECT away_team FROM matches WHERE TRIM(away_team) != ''
+        UNION SELECT home_team FROM h2h_matches WHERE TRIM(home_team) != ''
+        UNION SELECT away_team FROM h2h_matches WHERE TRIM(away_team) != ''
+    """)
+    conn.execute("INSERT OR IGNORE INTO bookmakers (name) " + ' UNION '.join(
+        f"SELECT bookmaker FROM {table} WHERE TRIM(bookmaker) != ''" for table in BOOKMAKER_TABLES_V8
+    ))
+
+    rebuild_table(conn, 'matches', '''
+        CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY,
+            match_id INTEGER UNIQUE,
+            match_date TEXT,
+            match_time TEXT,
+            league_id INTEGER REFERENCES leagues (league_id),
+            home_team_id INTEGER REFERENCES teams (team_id),
+            away_team_id INTEGER REFERENCES teams (team_id),
+            stadium TEXT,
+            weather TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''', '''
+        (id, match_id, match_date, match_time, league_id, home_team_id, away_team_id,
+         stadium, weather, created_at, updated_at)
+        SELECT m.id, m.match_id, m.match_date, m.match_time, l.league_id, ht.team_id, at.team_id,
+               m.stadium, m.weather, m.created_at, m.updated_at
+        FROM matches m
+        LEFT JOIN leagues l ON l.name = m.league
+        LEFT JOIN teams ht ON ht.name = m.home_team
+        LEFT JOIN teams at ON at.name = m.away_team
+    ''', [
+        "CREATE INDEX idx_matches_date_league_time ON matches (match_date, league_id, match_time)"
+    ])
+
+    rebuild_table(conn, 'h2h_matches', '''
+        CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY,
+            match_id INTEGER,
+            game_date TEXT,
+            league_id INTEGER REFERENCES leagues (league_id),
+            home_team_id INTEGER REFERENCES teams (team_id),
+            away_team_id INTEGER REFERENCES teams (team_id),
+            score TEXT,
+            ht_score TEXT,
+            corners TEXT,
+            ht_corners TEXT,
+            FOREIGN KEY (match_id) REFERENCES matches (match_id)
+        )
+    ''', '''
+        (id, match_id, game_date, league_id, home_team_id, away_team_id, score, ht_score, corners, ht_corners)
+        SELECT MAX(h.id), h.match_id, h.game_date, l.league_id, ht.team_id, at.team_id,
+               h.score, h.ht_score, h.corners, h.ht_corners
+        FROM h2h_matches h
+        LEFT JOIN leagues l ON l.name = h.league
+        LEFT JOIN teams ht ON ht.name = h.home_team
+        LEFT JOIN teams at ON at.name = h.away_team
+        GROUP BY h.match_id, h.game_date, ht.team_id, at.team_id
+    ''', [
+        "CREATE UNIQUE INDEX uq_h2h_matches_natural_key ON h2h_matches "
+        "(match_id, game_date, home_team_id, away_team_id)"
+    ])
+
+    for table, (value_columns, key) in BOOKMAKER_TABLES_V8.items():
+        _rebuild_with_bookmaker_ids(conn, table, value_columns, key)
+
+    # Eksik virgül yüzünden iki ayrı lig olarak eşleşmeyen ligler artık major sayılır
+    conn.execute("""
+        UPDATE daily_predictions SET is_major_league = COALESCE(
+            (SELECT l.is_major FROM leagues l WHERE l.name = daily_predictions.league), 0
+        )
+    """)
+
+    counts = {
+        table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        for table in ('leagues', 'teams', 'bookmakers')
+    }
+    logging.info(f"Sözlük tabloları: {counts['leagues']} lig, {counts['teams']} takım, "
+                 f"{counts['bookmakers']} bahis şirketi")
+
+def _create_odds_history(conn):
+    """Oran hareketlerini tutan odds_history tablosunu oluşturur ve mevcut oranlarla başlatır
+
+    Her satır bir (maç, bahis şirketi, market) için bir gözlemdir ve bir önceki
+    gözleme göre sadece değişen değerlerin farkını tutar (odds_history.encode_deltas).
+    Anahtar sırası bir serinin satırlarını diskte yan yana tutar; WITHOUT ROWID
+    ile ayrı bir rowid index'i de olmaz.
+    """
+    conn.execute("""
+        CREATE TABLE odds_history (
+            match_id INTEGER NOT NULL,
+            bookmaker_id INTEGER NOT NULL,
+            market_id INTEGER NOT NULL,
+            observed_at INTEGER NOT NULL,
+            deltas BLOB NOT NULL,
+            PRIMARY KEY (match_id, bookmaker_id, market_id, observed_at),
+            FOREIGN KEY (match_id) REFERENCES matches (match_id),
+            FOREIGN KEY (bookmaker_id) REFERENCES bookmakers (bookmaker_id)
+        ) WITHOUT ROWID
+    """)
+    count = seed_history(conn.cursor())
+    logging.info(f"odds_history: {count} başlangıç gözlemi eklendi")
+
+# Migration 10'da doğal anahtarında sözlük ID'si olan tablolar ve bu sütunlar
+NULLABLE_KEY_COLUMNS_V10 = {
+    'odds': ('bookmaker_id',),
+    'corner_odds': ('bookmaker_id',),
+    'double_chance_odds': ('bookmaker_id',),
+    'score_odds': ('bookmaker_id',),
+    'h2h_matches': ('home_team_id', 'away_team_id')
+}
+
+def _delete_null_key_rows(conn):
+    """Doğal anahtarında NULL sözlük ID'si olan satırları siler
+
+    Adı boş gelen bahis şirketi/takım NULL ID'ye çözülüyordu; NULL anahtar
+    UNIQUE index'te eşleşmediği için her yeniden analiz yeni bir satır
+    ekliyordu. Yazım artık bu satırları atlıyor; birikmiş olanlar temizlenir.
+    """
+    for table, columns in NULLABLE_KEY_COLUMNS_V10.items():
+        condition = ' OR '.join(f"{column} IS NULL" for column in columns)
+        cursor = conn.execute(f"DELETE FROM {table} WHERE {condition}")
+        if cursor.rowcount > 0:
+            logging.info(f"{table}: anahtarı boş {cursor.rowcount} satır silindi")
+
+# (sürüm, açıklama, uygulama fonksiyonu); sürümler 1'den başlar ve artarak sıralanır
+MIGRATIONS: List[Tuple[int, str, Callable]] = [
+    (1, "Temel tablolar", create_tables),
+    (2, "odds goalline/side sütunları", _add_odds_line_columns),
+    (3, "Alt tablolarda doğal anahtarlar", _add_natural_keys),
+    (4, "Günlük okuma index'leri", _add_read_path_indexes),
+    (5, "score_odds ve poisson_distribution paketlenmiş biçime", _pack_score_odds_and_poisson),
+    (6, "Yüzde ve oranlar sayısal sütunlara", _normalize_numeric_columns),
+    (7, "Günlük tahmin tablosu", _create_daily_predictions),
+    (8, "Lig, takım ve bahis şirketi sözlük tabloları", _add_dimension_tables),
+    (9, "Oran geçmişi (fark kodlamalı)", _create_odds_history),
+    (10, "Anahtarı boş sözlük ID'li satırların temizlenmesi", _delete_null_key_rows),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+def get_schema_version(conn) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(conn, target_version: int = LATEST_VERSION) -> int:
+    """Bekleyen migration'ları sırayla uygular ve şema sürümünü döndürür
+
+    Şema güncelse tek bir PRAGMA okumasıyla döner. Her migration ayrı bir
+    transaction'dır: hata verirse geri alınır ve sürüm artırılmaz.
+    """
+    version = get_schema_version(conn)
+    if version >= target_version:
+        return version
+
+    # Tablo yeniden oluşturma sırasında foreign key'ler geçici olarak kapatılır
+    # (transaction içinde değiştirilemez); tutarlılık rebuild_table'da denetlenir
+    foreign_keys = conn.execute("PRAGMA foreign_keys").fetchone()[0]
+    conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        for migration_version, description, apply in MIGRATIONS:
+            if migration_version > target_version:
+                break
+
+            # Yazma kilidini baştan al; aynı anda başlayan başka bir süreç
+            # migration'ı uyguladıysa sürüm tekrar okunduğunda atlanır
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                version = get_schema_version(conn)
+                if migration_version <= version:
+                    conn.rollback()
+                    continue
+                apply(conn)
+                conn.execute(f"PRAGMA user_version = {migration_version}")
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                logging.error(f"Migration {migration_version} ({description}) başarısız: "
+                              f"{type(e).__name__}: {str(e)}")
+                raise
+
+            version = migration_version
+            logging.info(f"Migration {migration_version} uygulandı: {description}")
+    finally:
+        conn.execute(f"PRAGMA foreign_keys = {'ON' if foreign_keys else 'OFF'}")
+
+    return version
+
+def migration_status(conn) -> Dict[str, object]:
+    version = get_schema_version(conn)
+    return {
+        'version': version,
+        'latest': LATEST_VERSION,
+        'pending': [(v, description) for v, description, _ in MIGRATIONS if v > version]
+    }
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Veritabanı şema migration'ları")
+    parser.add_argument('--status', action='store_true', help="Sadece bekleyen migration'ları listele")
+    args = parser.parse_args()
+
+    conn = create_connection()
+    try:
+        if args.status:
+            status = migration_status(conn)
+            print(f"Şema sürümü: {status['version']} / {status['latest']}")
+            for version, description in status['pending']:
+                print(f"  bekliyor: {version} - {description}")
+        else:
+            print(f"Şema sürümü: {migrate(conn)}")
+    finally:
+        conn.close()
@@ -0,0 +1,247 @@
+import time
+from collections import defaultdict
+from typing import Dict, Any, List, Optional, Tuple, Union
+import numpy as np
+
+# Geçmişi tutulan oran grupları: (ad, tablo, sütunlar, is_live filtresi).
+# market_id bu listedeki sıradır; yeni market'ler sadece sona eklenir.
+ODDS_MARKETS = (
+    ('ms', 'odds', ('ms1_closing', 'msx_closing', 'ms2_closing'), None),
+    ('ht', 'odds', ('ht1_closing', 'htx_closing', 'ht2_closing'), None),
+    ('goalline', 'odds', ('closing_odds', 'closing_goalline', 'closing_side'), None),
+    ('goalline_ht', 'odds', ('closing_odds_ht', 'closing_goalline_ht', 'closing_side_ht'), None),
+    ('corner', 'corner_odds', ('over_value', 'over_line', 'under_value'), 0),
+    ('corner_live', 'corner_odds', ('over_value', 'over_line', 'under_value'), 1),
+    ('double_chance', 'double_chance_odds', ('home_draw_value', 'home_away_value', 'away_draw_value'), None)
+)
+
+MARKET_IDS = {name: market_id for market_id, (name, _, _, _) in enumerate(ODDS_MARKETS)}
+
+HISTORY_TABLES = tuple(sorted({table for _, table, _, _ in ODDS_MARKETS}))
+
+# Değerler bu çarpanla tamsayıya çevrilip saklanır (3 ondalığa kadar kayıpsız: 1.825, 2.25)
+ODDS_SCALE = 1000
+
+# Tek sorguda bağlanan en fazla maç ID'si
+HISTORY_CHUNK_SIZE = 500
+
+INSERT_HISTORY_SQL = """
+    INSERT OR REPLACE INTO odds_history (match_id, bookmaker_id, market_id, observed_at, deltas)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+def _scaled(value: Any) -> Optional[int]:
+    return None if value is None else round(float(value) * ODDS_SCALE)
+
+def _write_varint(out: bytearray, value: int):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_varint(blob: bytes, pos: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = blob[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+def encode_deltas(previous: Tuple[Optional[int], ...], current: Tuple[Optional[int], ...]) -> Optional[bytes]:
+    """İki ölçeklenmiş değer grubu arasındaki farkı kodlar; değişiklik yoksa None döner
+
+    Biçim: değişen konumların bit maskesi, ardından her değişen konum için
+    0 (değer NULL oldu) ya da zigzag(fark) + 1; hepsi varint. Fark önceki
+    değere göredir (önceki NULL ise 0'a göre). Tek oranın hareketi 2-3 byte tutar.
+    """
+    mask = 0
+    out = bytearray()
+    for position, (before, after) in enumerate(zip(previous, current)):
+        if before == after:
+            continue
+        mask |= 1 << position
+        if after is None:
+            _write_varint(out, 0)
+        else:
+            delta = after - (before or 0)
+            _write_varint(out, (delta * 2 if delta >= 0 else -delta * 2 - 1) + 1)
+    if not mask:
+        return None
+
+    header = bytearray()
+    _write_varint(header, mask)
+    return bytes(header + out)
+
+def apply_deltas(state: List[Optional[int]], blob: bytes) -> List[Optional[int]]:
+    """encode_deltas çıktısını değer grubuna yerinde uygular ve döndürür"""
+    mask, pos = _read_varint(blob, 0)
+    position = 0
+    while mask:
+        if mask & 1:
+            token, pos = _read_varint(blob, pos)
+            if token == 0:
+                state[position] = None
+            else:
+                token -= 1
+                delta = token // 2 if token % 2 == 0 else -(token + 1) // 2
+                state[position] = (state[position] or 0) + delta
+        mask >>= 1
+        position += 1
+    return state
+
+def _market_rows(table: str, columns: Tuple[str, ...], rows: List[tuple]):
+    """Oran tablosu satırlarını ((match_id, bookmaker_id, market_id), ölçeklenmiş değerler) çiftlerine ayırır"""
+    markets = [(market_id, market_columns, is_live)
+               for market_id, (_, market_table, market_columns, is_live) in enumerate(ODDS_MARKETS)
+               if market_table == table]
+    for row in rows:
+        row = dict(zip(columns, row))
+        if row['bookmaker_id'] is None:
+            continue
+        for market_id, market_columns, is_live in markets:
+            if is_live is not None and bool(row['is_live']) != bool(is_live):
+                continue
+            yield ((row['match_id'], row['bookmaker_id'], market_id),
+                   tuple(_scaled(row[column]) for column in market_columns))
+
+def _diff_rows(market_rows, previous: Dict[tuple, tuple], last_observed: Dict[tuple, int],
+               observed_at) -> List[tuple]:
+    """Değişen market'ler için odds_history satırları üretir; previous ve last_observed güncellenir
+
+    observed_at sabit bir zaman damgası ya da match_id alan bir fonksiyondur.
+    Aynı anahtarın zaman damgası her zaman bir öncekinden büyük tutulur.
+    """
+    history = []
+    for key, current in market_rows:
+        deltas = encode_deltas(previous.get(key, (None,) * len(current)), current)
+        if deltas is None:
+            continue
+        timestamp = observed_at(key[0]) if callable(observed_at) else observed_at
+        timestamp = max(timestamp, last_observed.get(key, 0) + 1)
+        history.append(key + (timestamp, deltas))
+        previous[key] = current
+        last_observed[key] = timestamp
+    return history
+
+def _last_observed(cursor, match_ids: List[int]) -> Dict[tuple, int]:
+    placeholders = ','.join('?' for _ in match_ids)
+    cursor.execute(f"""
+        SELECT match_id, bookmaker_id, market_id, MAX(observed_at) FROM odds_history
+        WHERE match_id IN ({placeholders}) GROUP BY match_id, bookmaker_id, market_id
+    """, match_ids)
+    return {(match_id, bookmaker_id, market_id): last
+            for match_id, bookmaker_id, market_id, last in cursor.fetchall()}
+
+def history_rows(cursor, rows: Dict[str, List[tuple]], table_columns: Dict[str, Tuple[str, ...]],
+                 observed_at: Union[int, Dict[int, int]] = None) -> List[tuple]:
+    """Yazılmak üzere olan oran satırlarından odds_history satırlarını üretir
+
+    Upsert'ten önce, aynı transaction'da çağrılır: önceki değerler oran
+    tablolarındaki mevcut satırlardan okunur ve sadece değeri değişen
+    market'ler için bir fark satırı üretilir; aynı oranlarla yapılan
+    yenilemeler geçmişe hiçbir şey eklemez. observed_at milisaniye cinsinden
+    Unix zamanı ya da maç başına (match_id -> ms) zamanlardır, ör. arşivden
+    yeniden yüklemede yanıtın alındığı zaman (varsayılan ve eksik maçlar: şimdi).
+    """
+    now = int(time.time() * 1000)
+    if isinstance(observed_at, dict):
+        timestamps = observed_at
+        observed_at = lambda match_id: timestamps.get(match_id) or now
+    else:
+        observed_at = observed_at or now
+    history = []
+    for table in HISTORY_TABLES:
+        table_rows = rows.get(table)
+        if not table_rows:
+            continue
+        columns = table_columns[table]
+        match_ids = sorted({row[0] for row in table_rows})
+        for i in range(0, len(match_ids), HISTORY_CHUNK_SIZE):
+            chunk = match_ids[i:i + HISTORY_CHUNK_SIZE]
+            chunk_ids = set(chunk)
+            placeholders = ','.join('?' for _ in chunk)
+            cursor.execute(f"SELECT {', '.join(columns)} FROM {table} WHERE match_id IN ({placeholders})", chunk)
+            previous = dict(_market_rows(table, columns, cursor.fetchall()))
+            chunk_rows = [row for row in table_rows if row[0] in chunk_ids]
+            history.extend(_diff_rows(_market_rows(table, columns, chunk_rows), previous,
+                                      _last_observed(cursor, chunk), observed_at))
+    return history
+
+def seed_history(cursor) -> int:
+    """Oran tablolarındaki mevcut değerleri ilk gözlem olarak geçmişe yazar, eklenen satır sayısını döndürür
+
+    Zaman damgası maçın son güncellenme zamanıdır (matches.updated_at).
+    """
+    cursor.execute("SELECT match_id, CAST(strftime('%s', updated_at) AS INTEGER) * 1000 FROM matches")
+    updated_at = dict(cursor.fetchall())
+    now = int(time.time() * 1000)
+
+    total = 0
+    for table in HISTORY_TABLES:
+        columns = ('match_id', 'bookmaker_id') + tuple(dict.fromkeys(
+            column for _, market_table, market_columns, _ in ODDS_MARKETS if market_table == table
+            for column in market_columns
+        ))
+        if table == 'corner_odds':
+            columns += ('is_live',)
+        cursor.execute(f"SELECT {', '.join(columns)} FROM {table}")
+        history = _diff_rows(_market_rows(table, columns, cursor.fetchall()), {}, {},
+                             lambda match_id: updated_at.get(match_id) or now)
+        cursor.executemany(INSERT_HISTORY_SQL, history)
+        total += len(history)
+    return total
+
+# Bir maçın gözlemleri; birincil anahtar sırasıyla okunur, ayrıca sıralama gerekmez
+ODDS_SERIES_QUERY = """
+    SELECT b.name, h.market_id, h.observed_at, h.deltas
+    FROM odds_history h
+    JOIN bookmakers b ON b.bookmaker_id = h.bookmaker_id
+    WHERE h.match_id = ?
+"""
+
+SERIES_ORDER = " ORDER BY h.bookmaker_id, h.market_id, h.observed_at"
+
+def _float_array(values: List[Optional[int]]) -> np.ndarray:
+    return np.array([float('nan') if value is None else value / ODDS_SCALE for value in values],
+                    dtype=np.float64)
+
+def _int_array(values: List[int]) -> np.ndarray:
+    return np.array(values, dtype=np.int64)
+
+def get_odds_series(conn, match_id: int, bookmaker: str = None,
+                    market: str = None) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """Maçın oran hareketlerini (bahis şirketi, market) başına diziler olarak döndürür
+
+    Her seri {'observed_at': ms zaman damgaları, <sütun>: değerler, ...}
+    biçimindedir; zaman damgaları int64, değerler float64 np.ndarray'dir. NULL
+    değerler NaN olur. bookmaker ve market ile tek seriye daraltılabilir.
+    """
+    query = ODDS_SERIES_QUERY
+    params = [match_id]
+    if bookmaker is not None:
+        query += " AND b.name = ?"
+        params.append(bookmaker)
+    if market is not None:
+        query += " AND h.market_id = ?"
+        params.append(MARKET_IDS[market])
+    query += SERIES_ORDER
+
+    points = defaultdict(lambda: ([], []))
+    states = {}
+    for bookmaker_name, market_id, observed_at, deltas in conn.execute(query, params):
+        key = (bookmaker_name, market_id)
+        state = states.setdefault(key, [None] * len(ODDS_MARKETS[market_id][2]))
+        apply_deltas(state, deltas)
+        timestamps, values = points[key]
+        timestamps.append(observed_at)
+        values.append(tuple(state))
+
+    series = {}
+    for (bookmaker_name, market_id), (timestamps, values) in points.items():
+        market_name, _, columns, _ = ODDS_MARKETS[market_id]
+        series[(bookmaker_name, market_name)] = {'observed_at': _int_array(timestamps)}
+        for position, column in enumerate(columns):
+            series[(bookmaker_name, market_name)][column] = _float_array([value[position] for value in values])
+    return series
@@ -0,0 +1,302 @@
+import os
+import sys
+import gzip
+import json
+import time
+import sqlite3
+import hashlib
+import tempfile
+import logging
+import argparse
+import threading
+import concurrent.futures
+from typing import Dict, Any, Optional, List, Tuple
+import zstandard
+from schemas import loads
+
+# Arşiv dizini ve varsayılan saklama politikası
+PAYLOAD_ARCHIVE_DIR = os.getenv('PAYLOAD_ARCHIVE_DIR', 'payload_archive')
+PAYLOAD_TTL_DAYS = int(os.getenv('PAYLOAD_TTL_DAYS', '180'))
+PAYLOAD_MAX_BYTES = int(os.getenv('PAYLOAD_MAX_BYTES', str(2 * 1024 ** 3)))
+
+# Bu süreden yeni sahipsiz nesne dosyaları silinmez, bir sonraki temizliğe kalır (saniye)
+EVICT_GRACE_SECONDS = 3600
+
+def _compress(raw: bytes) -> Tuple[bytes, str]:
+    return zstandard.ZstdCompressor(level=10).compress(raw), 'zstd'
+
+def _decompress(blob: bytes, codec: str) -> bytes:
+    if codec == 'zstd':
+        return zstandard.ZstdDecompressor().decompress(blob)
+    # zstandard kurulu olmadan yazılmış eski kayıtlar
+    return gzip.decompress(blob)
+
+def _serialize(payload: Dict[str, Any]) -> bytes:
+    """Aynı içerik her zaman aynı özeti üretsin diye kararlı JSON üretir"""
+    return json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+class PayloadStore:
+    """analyze-match yanıtlarının sıkıştırılmış, içerik adresli arşivi
+
+    Ham yanıtlar objects/ altında sha256 özetiyle saklanır; index.db
+    (match_id, fetched_at) -> özet eşlemesini tutar. index.db bağlantısı thread
+    başına bir kez açılır ve sonraki çağrılarda yeniden kullanılır.
+    """
+
+    def __init__(self, root: str = PAYLOAD_ARCHIVE_DIR):
+        self.root = root
+        self.objects_dir = os.path.join(root, 'objects')
+        self.index_path = os.path.join(root, 'index.db')
+        self._initialized = False
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+        if not self._initialized:
+            os.makedirs(self.objects_dir, exist_ok=True)
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        if not self._initialized:
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS payloads (
+                match_id INTEGER,
+                fetched_at REAL,
+                digest TEXT,
+                codec TEXT,
+                size INTEGER,
+                PRIMARY KEY (match_id, fetched_at)
+            )
+            ''')
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_payloads_digest ON payloads (digest)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_payloads_fetched_at ON payloads (fetched_at)")
+            conn.commit()
+            self._initialized = True
+        self._local.conn = conn
+        return conn
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def put(self, match_id: int, payload: Dict[str, Any], fetched_at: float = None) -> str:
+        """Yanıtı arşive ekler ve içerik özetini döndürür"""
+        raw = _serialize(payload)
+        digest = hashlib.sha256(raw).hexdigest()
+        path = self._object_path(digest)
+        fetched_at = fetched_at if fetched_at is not None else time.time()
+
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT codec, size FROM payloads WHERE digest = ? LIMIT 1", (digest,)).fetchone()
+            if row and os.path.exists(path):
+                # Aynı içerik zaten arşivde, sadece yeni bir index kaydı ekle; dosya
+                # zamanı yenilenir ki eş zamanlı bir evict onu sahipsiz sanıp silmesin
+                codec, size = row
+                os.utime(path)
+            else:
+                blob, codec = _compress(raw)
+                size = len(blob)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # Geçici dosya her yazıcıya özgüdür; aynı yanıtı yazan iki thread birbirinin dosyasını bozamaz
+                fd, tmp_path = tempfile.mkstemp(prefix=f"{digest}.", suffix='.tmp', dir=os.path.dirname(path))
+                try:
+                    with os.fdopen(fd, 'wb') as f:
+                        f.write(blob)
+                    os.replace(tmp_path, path)
+                except Exception:
+                    os.remove(tmp_path)
+                    raise
+
+            conn.execute(
+                "INSERT OR REPLACE INTO payloads (match_id, fetched_at, digest, codec, size) VALUES (?, ?, ?, ?, ?)",
+                (match_id, fetched_at, digest, codec, size)
+            )
+            conn.commit()
+            return digest
+        except Exception:
+            conn.rollback()
+            raise
+
+    def try_put(self, match_id: int, payload: Dict[str, Any]) -> Optional[str]:
+        """put gibi, ama arşiv hatası (dolu disk, kilitli index) yanıtı kaybettirmez: loglanır ve None döner"""
+        try:
+            return self.put(match_id, payload)
+        except Exception as e:
+            logging.warning(f"Yanıt arşive yazılamadı (ID: {match_id}): {type(e).__name__}: {str(e)}")
+            return None
+
+    def latest_entry(self, match_id: int, max_age: float = None, fetched_after: float = None) -> Optional[Tuple[float, str, str]]:
+        """Maçın en yeni (fetched_at, digest, codec) kaydını döndürür"""
+        query = "SELECT fetched_at, digest, codec FROM payloads WHERE match_id = ?"
+        params = [match_id]
+        if max_age is not None:
+            query += " AND fetched_at >= ?"
+            params.append(time.time() - max_age)
+        if fetched_after is not None:
+            query += " AND fetched_at >= ?"
+            params.append(fetched_after)
+        query += " ORDER BY fetched_at DESC LIMIT 1"
+
+        return self._connect().execute(query, params).fetchone()
+
+    def load(self, digest: str, codec: str) -> Dict[str, Any]:
+        """Özeti verilen yanıtı açar"""
+        with open(self._object_path(digest), 'rb') as f:
+            return loads(_decompress(f.read(), codec))
+
+    def get(self, match_id: int, max_age: float = None, fetched_after: float = None) -> Optional[Dict[str, Any]]:
+        """Maçın en yeni yanıtını döndürür; yoksa veya süresi geçmişse None"""
+        try:
+            entry = self.latest_entry(match_id, max_age=max_age, fetched_after=fetched_after)
+            if not entry:
+                return None
+            _, digest, codec = entry
+            return self.load(digest, codec)
+        except Exception as e:
+            logging.warning(f"Arşivden yanıt okunamadı (ID: {match_id}): {type(e).__name__}: {str(e)}")
+            return None
+
+    def latest_entries(self, since: float = None) -> List[Tuple[int, float, str, str]]:
+        """Her maç için en yeni (match_id, fetched_at, digest, codec) kaydını döndürür"""
+        query = """
+        SELECT match_id, MAX(fetched_at), digest, codec FROM payloads
+        WHERE fetched_at >= ?
+        GROUP BY match_id
+        ORDER BY match_id
+        """
+        return self._connect().execute(query, (since or 0,)).fetchall()
+
+    def evict(self, ttl_days: int = PAYLOAD_TTL_DAYS, max_bytes: int = PAYLOAD_MAX_BYTES) -> Dict[str, int]:
+        """TTL'i geçen kayıtları ve boyut sınırını aşan en eski kayıtları siler
+
+        Temizlik başlamadan EVICT_GRACE_SECONDS öncesinden daha yeni nesne
+        dosyalarına dokunulmaz: eş zamanlı bir put dosyayı yazmış ama index
+        kaydını (belki bu temizliğin yazma kilidini beklerken) henüz eklememiş olabilir.
+        """
+        cutoff = time.time() - EVICT_GRACE_SECONDS
+        conn = self._connect()
+        removed_entries = 0
+        try:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM payloads WHERE fetched_at < ?", (time.time() - ttl_days * 86400,))
+            removed_entries += cursor.rowcount
+
+            # Boyut sınırı: benzersiz nesnelerin toplamı sınırın altına inene kadar en eskileri sil
+            cursor.execute("""
+                SELECT digest, MAX(fetched_at) AS last_used, MAX(size) FROM payloads
+                GROUP BY digest ORDER BY last_used ASC
+            """)
+            objects = cursor.fetchall()
+            total_bytes = sum(row[2] for row in objects)
+            for digest, _, size in objects:
+                if total_bytes <= max_bytes:
+                    break
+                cursor.execute("DELETE FROM payloads WHERE digest = ?", (digest,))
+                removed_entries += cursor.rowcount
+                total_bytes -= size
+            conn.commit()
+
+            # Artık hiçbir kayıt tarafından kullanılmayan nesne dosyalarını sil
+            referenced = {row[0] for row in cursor.execute("SELECT DISTINCT digest FROM payloads")}
+            removed_objects = 0
+            for prefix in os.listdir(self.objects_dir):
+                prefix_dir = os.path.join(self.objects_dir, prefix)
+                for name in os.listdir(prefix_dir):
+                    if name in referenced or name.endswith('.tmp'):
+                        continue
+                    object_path = os.path.join(prefix_dir, name)
+                    try:
+                        if os.path.getmtime(object_path) >= cutoff:
+                            continue
+                        os.remove(object_path)
+                    except FileNotFoundError:
+                        continue
+                    removed_objects += 1
+
+            logging.info(f"Arşiv temizlendi: {removed_entries} kayıt, {removed_objects} nesne silindi "
+                         f"(kalan boyut: {total_bytes / 1024 ** 2:.1f} MB)")
+            return {'entries': removed_entries, 'objects': removed_objects, 'bytes': total_bytes}
+        except Exception:
+            conn.rollback()
+            raise
+
+# Varsayılan arşiv (bot.py ve result.py bunu kullanır)
+DEFAULT_STORE = PayloadStore()
+
+# Yeniden yüklemede tek transaction'da yazılacak maç sayısı
+REBUILD_BATCH_SIZE = 200
+
+def _load_entry(args: Tuple[str, str, str]) -> Dict[str, Any]:
+    root, digest, codec = args
+    return PayloadStore(root).load(digest, codec)
+
+def rebuild_database(store: PayloadStore = DEFAULT_STORE, since: float = None, workers: int = None) -> Dict[str, int]:
+    """soccer_analysis.db'yi ağa çıkmadan arşivdeki en yeni yanıtlardan yeniden doldurur"""
+    from database import create_connection, insert_matches_batch
+    from migrations import migrate
+
+    entries = store.latest_entries(since)
+    logging.info(f"Arşivden {len(entries)} maç yeniden yüklenecek")
+
+    conn = create_connection()
+    stats = {'successful': 0, 'failed': 0}
+
+    def write_batch(batch, fetched):
+        # Oran geçmişi yeniden yükleme anıyla değil, yanıtın alındığı zamanla yazılır
+        result = insert_matches_batch(conn, batch, observed_at=fetched)
+        stats['successful'] += len(result['written'])
+        stats['failed'] += len(result['failed'])
+        for match_id, error_msg in result['failed'].items():
+            logging.error(f"Arşivden yüklenemedi (ID: {match_id}): {error_msg}")
+
+    try:
+        migrate(conn)
+
+        # Açma ve JSON çözme paralel, veritabanı yazımı tek bağlantıdan gruplar halinde
+        jobs = [(store.root, digest, codec) for _, _, digest, codec in entries]
+        batch, fetched = [], {}
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            payloads = executor.map(_load_entry, jobs, chunksize=32)
+            for (match_id, fetched_at, _, _), payload in zip(entries, payloads):
+                batch.append(payload)
+                fetched[match_id] = int(fetched_at * 1000)
+                if len(batch) >= REBUILD_BATCH_SIZE:
+                    write_batch(batch, fetched)
+                    batch, fetched = [], {}
+        if batch:
+            write_batch(batch, fetched)
+    finally:
+        conn.close()
+
+    logging.info(f"Yeniden yükleme tamamlandı: {stats['successful']} başarılı, {stats['failed']} başarısız")
+    return stats
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('payload_store.log'),
+            logging.StreamHandler()
+        ]
+    )
+
+    parser = argparse.ArgumentParser(description="analyze-match yanıt arşivi")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    rebuild_parser = subparsers.add_parser('rebuild', help="Veritabanını arşivden yeniden doldurur")
+    rebuild_parser.add_argument('--since', help="Bu tarihten (YYYY-MM-DD) sonra alınan yanıtlar")
+    rebuild_parser.add_argument('--workers', type=int, default=None, help="Paralel işlem sayısı")
+
+    evict_parser = subparsers.add_parser('evict', help="TTL ve boyut sınırına göre arşivi temizler")
+    evict_parser.add_argument('--ttl-days', type=int, default=PAYLOAD_TTL_DAYS)
+    evict_parser.add_argument('--max-bytes', type=int, default=PAYLOAD_MAX_BYTES)
+
+    args = parser.parse_args()
+
+    if args.command == 'rebuild':
+        since = time.mktime(time.strptime(args.since, "%Y-%m-%d")) if args.since else None
+        stats = rebuild_database(since=since, workers=args.workers)
+        sys.exit(0 if stats['failed'] == 0 else 1)
+    elif args.command == 'evict':
+        DEFAULT_STORE.evict(ttl_days=args.ttl_days, max_bytes=args.max_bytes)
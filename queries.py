@@ -0,0 +1,96 @@
+from typing import List, Tuple
+
+# Günlük okuma yollarının SQL sorguları. query_plans.py ve testler planları
+# ağır bağımlılıkları (PIL, genai, pandas) yüklemeden denetleyebilsin diye burada durur.
+
+# Günlük paylaşım sorguları: daily_predictions yazım sırasında doldurulur, her
+# sorgu kısmi bir index üzerinde tek tarih aralığı okumasıdır (query_plans.py denetler)
+MAJOR_LEAGUE_PREDICTIONS_QUERY = """
+    SELECT match_id, league, home_team, away_team, match_time,
+           over_prediction, btts_prediction, match_result_prediction,
+           ht_goal_prediction, risky_prediction
+    FROM daily_predictions
+    WHERE match_date = ? AND is_major_league = 1 AND has_any_prediction = 1
+    ORDER BY match_time ASC
+"""
+
+# İlk yarı kapanış goalline değeri 1'den küçük olan maçlar ht_eligible değildir
+HT_GOALS_PREDICTIONS_QUERY = """
+    SELECT match_id, league, home_team, away_team, match_time,
+           ht_goal_prediction,
+           COALESCE(over_05_ht_percent, 0) as over_05_ht_percent,
+           COALESCE(over_15_ht_percent, 0) as over_15_ht_percent,
+           opening_goalline, closing_goalline,
+           opening_goalline_ht, closing_goalline_ht
+    FROM daily_predictions
+    WHERE match_date = ? AND ht_eligible = 1
+    ORDER BY match_time ASC
+"""
+
+# İlk yarı gol tahmini tek başına yetmez; has_main_prediction zaten
+# has_any_prediction'ı gerektirir, koşul major lig index'ini kullanmak için eklenir
+DAILY_PREDICTIONS_QUERY = """
+    SELECT match_id, league, home_team, away_team, match_time,
+           over_prediction, btts_prediction, match_result_prediction,
+           ht_goal_prediction, risky_prediction
+    FROM daily_predictions
+    WHERE match_date = ? AND is_major_league = 1 AND has_any_prediction = 1
+    AND has_main_prediction = 1
+    ORDER BY RANDOM()
+    LIMIT ?
+"""
+
+# Skoru 0-0 görünen (henüz kesinleşmemiş olabilecek) maçlar
+COMPLETED_MATCHES_QUERY = """
+    SELECT m.match_id, m.match_date, m.match_time, l.name, 
+           ht.name, at.name, 
+           ms.home_score, ms.away_score, 
+           ms.ht_home_score, ms.ht_away_score
+    FROM matches m
+    INNER JOIN match_scores ms ON m.match_id = ms.match_id
+    LEFT JOIN leagues l ON l.league_id = m.league_id
+    LEFT JOIN teams ht ON ht.team_id = m.home_team_id
+    LEFT JOIN teams at ON at.team_id = m.away_team_id
+    WHERE (m.match_date < ? OR (m.match_date = ? AND m.match_time <= ?))
+    AND ms.home_score = 0 AND ms.away_score = 0
+    AND ms.ht_home_score = 0 AND ms.ht_away_score = 0
+    ORDER BY m.match_date DESC, m.match_time ASC
+"""
+
+MATCH_DATA_QUERY = """
+    SELECT 
+        m.match_date,
+        l.name,
+        ht.name,
+        at.name,
+        p.over_prediction,
+        p.btts_prediction,
+        p.match_result_prediction,
+        p.ht_goal_prediction,
+        p.risky_prediction,
+        ms.ht_home_score,
+        ms.ht_away_score,
+        ms.home_score,
+        ms.away_score
+    FROM matches m
+    LEFT JOIN leagues l ON l.league_id = m.league_id
+    LEFT JOIN teams ht ON ht.team_id = m.home_team_id
+    LEFT JOIN teams at ON at.team_id = m.away_team_id
+    LEFT JOIN predictions p ON m.match_id = p.match_id
+    LEFT JOIN match_scores ms ON m.match_id = ms.match_id
+    WHERE ms.home_score IS NOT NULL
+"""
+
+def build_match_data_query(start_date: str = None, end_date: str = None) -> Tuple[str, List[str]]:
+    """Tarih aralığına göre maç verisi sorgusunu ve parametrelerini oluşturur"""
+    query = MATCH_DATA_QUERY
+    params = []
+    if start_date:
+        query += " AND m.match_date >= ?"
+        params.append(start_date)
+    if end_date:
+        query += " AND m.match_date <= ?"
+        params.append(end_date)
+        
+    query += " ORDER BY m.match_date DESC, m.match_time ASC"
+    return query, params
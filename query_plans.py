@@ -0,0 +1,72 @@
+import sys
+import logging
+import argparse
+from datetime import datetime
+from typing import List, Dict, Tuple, Any
+from queries import (
+    MAJOR_LEAGUE_PREDICTIONS_QUERY, HT_GOALS_PREDICTIONS_QUERY, DAILY_PREDICTIONS_QUERY,
+    COMPLETED_MATCHES_QUERY, build_match_data_query
+)
+from odds_history import ODDS_SERIES_QUERY, SERIES_ORDER
+
+def explain(conn, query: str, params: List[Any]) -> List[str]:
+    """Sorgunun EXPLAIN QUERY PLAN çıktısını satır satır döndürür"""
+    cursor = conn.execute(f"EXPLAIN QUERY PLAN {query}", params)
+    return [row[3] for row in cursor.fetchall()]
+
+def table_scans(plan: List[str]) -> List[str]:
+    """Plan içindeki tam tablo taramalarını döndürür (index ile arama ve taramalar hariç)"""
+    return [
+        step for step in plan
+        if step.startswith('SCAN ') and ' USING ' not in step and 'CONSTANT ROW' not in step
+    ]
+
+def get_hot_queries(today: str = None) -> List[Tuple[str, str, List[Any]]]:
+    """Günlük çalışan sorguları (ad, sorgu, örnek parametreler) olarak döndürür"""
+    today = today or datetime.now().strftime("%Y-%m-%d")
+    match_data_query, match_data_params = build_match_data_query(today, today)
+    return [
+        ('major_league_predictions', MAJOR_LEAGUE_PREDICTIONS_QUERY, [today]),
+        ('ht_goals_predictions', HT_GOALS_PREDICTIONS_QUERY, [today]),
+        ('daily_predictions', DAILY_PREDICTIONS_QUERY, [today, 1]),
+        ('completed_matches', COMPLETED_MATCHES_QUERY, [today, today, '12:00']),
+        ('match_data', match_data_query, match_data_params),
+        ('match_scores_lookup', "SELECT home_score, away_score, ht_home_score, ht_away_score "
+                                "FROM match_scores WHERE match_id = ?", [1]),
+        ('odds_series', ODDS_SERIES_QUERY + SERIES_ORDER, [1])
+    ]
+
+def check_query_plans(conn) -> Dict[str, Dict[str, List[str]]]:
+    """Her günlük sorgunun planını ve içindeki tablo taramalarını döndürür"""
+    report = {}
+    for name, query, params in get_hot_queries():
+        plan = explain(conn, query, params)
+        report[name] = {'plan': plan, 'scans': table_scans(plan)}
+    return report
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Günlük sorguların index kullandığını denetler")
+    parser.add_argument('--db', default='soccer_analysis.db', help="Denetlenecek veritabanı")
+    args = parser.parse_args()
+
+    from migrations import migrate
+    from db_connection import connect
+
+    conn = connect(args.db)
+    try:
+        # Index'ler henüz oluşturulmadıysa ekle
+        migrate(conn)
+
+        failed = False
+        for name, result in check_query_plans(conn).items():
+            status = "❌ TABLO TARAMASI" if result['scans'] else "✅"
+            print(f"{status} {name}")
+            for step in result['plan']:
+                print(f"    {step}")
+            failed = failed or bool(result['scans'])
+    finally:
+        conn.close()
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,130 @@
+import os
+import heapq
+import logging
+import asyncio
+import aiohttp
+import pytz
+from datetime import datetime, timedelta
+from typing import List, Dict, Iterable, Tuple
+from bot import analyze_match_async
+from database import insert_match_info
+from async_db import AsyncDatabase
+from migrations import migrate
+from http_client import create_async_session
+from concurrency import AdaptiveLimiter, RateLimiter
+from payload_store import DEFAULT_STORE as PAYLOAD_STORE
+
+# Türkiye saat dilimi (maç saatleri bu dilimde tutuluyor)
+TR_TIMEZONE = pytz.timezone('Europe/Istanbul')
+
+# Başlamasına bu kadar saat kalan maçlar yenilenir
+REFRESH_WINDOW_HOURS = float(os.getenv('REFRESH_WINDOW_HOURS', '3'))
+
+# Yenileme işinin API'ye yükü: saniyedeki istek ve eş zamanlı istek üst sınırı
+REFRESH_RATE_PER_SECOND = float(os.getenv('REFRESH_RATE_PER_SECOND', '2'))
+REFRESH_MAX_CONCURRENT = 3
+
+REFRESH_LIMITER = AdaptiveLimiter(
+    'analyze-match-refresh',
+    initial_limit=2,
+    max_limit=REFRESH_MAX_CONCURRENT,
+    latency_target=15.0
+)
+REFRESH_RATE = RateLimiter(REFRESH_RATE_PER_SECOND, burst=REFRESH_MAX_CONCURRENT)
+
+def get_kickoff(match_date: str, match_time: str) -> datetime:
+    """Maçın başlama zamanını Türkiye saatiyle döndürür"""
+    return TR_TIMEZONE.localize(datetime.strptime(f"{match_date} {match_time}", "%Y-%m-%d %H:%M"))
+
+def get_refresh_queue(conn, window_hours: float = REFRESH_WINDOW_HOURS, extra_ids: Iterable[int] = None,
+                      now: datetime = None) -> List[Tuple[float, int]]:
+    """Yenilenecek maçları başlama saatine göre öncelik kuyruğu (heap) olarak döndürür
+
+    Henüz başlamamış ve başlamasına window_hours kalmış maçlar ile extra_ids
+    içindeki (yakında paylaşılacak) maçlar kuyruğa alınır.
+    """
+    now = now or datetime.now(TR_TIMEZONE)
+    window_end = now + timedelta(hours=window_hours)
+    extra_ids = set(extra_ids or [])
+
+    # Pencere gece yarısını aşabilir
+    dates = sorted({now.strftime("%Y-%m-%d"), window_end.strftime("%Y-%m-%d")})
+    placeholders = ','.join(['?' for _ in dates])
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT match_id, match_date, match_time FROM matches
+        WHERE match_date IN ({placeholders})
+    """, dates)
+
+    queue = []
+    for match_id, match_date, match_time in cursor.fetchall():
+        try:
+            kickoff = get_kickoff(match_date, match_time)
+        except (TypeError, ValueError):
+            continue
+
+        if kickoff < now:
+            continue
+        if kickoff <= window_end or match_id in extra_ids:
+            queue.append((kickoff.timestamp(), match_id))
+
+    heapq.heapify(queue)
+    return queue
+
+async def _refresh_worker(session: aiohttp.ClientSession, db: AsyncDatabase, queue: List[Tuple[float, int]], stats: Dict[str, int]):
+    """Kuyruktan en erken başlayacak maçı alıp yeniler, değiştiyse veritabanına yazar"""
+    while queue:
+        _, match_id = heapq.heappop(queue)
+        await REFRESH_RATE.acquire_async()
+
+        previous = await asyncio.to_thread(PAYLOAD_STORE.latest_entry, match_id)
+        match_analysis = await analyze_match_async(session, match_id, REFRESH_LIMITER, use_cache=False)
+        stats['checked'] += 1
+
+        if match_analysis is None:
+            stats['failed'] += 1
+            continue
+
+        # Yanıt arşive içerik özetiyle yazıldı; özet aynıysa veri değişmemiştir.
+        # Arşive yazılamadıysa en yeni kayıt öncekiyle aynıdır, veri yine yazılır.
+        latest = await asyncio.to_thread(PAYLOAD_STORE.latest_entry, match_id)
+        if previous and latest and latest[0] != previous[0] and previous[1] == latest[1]:
+            stats['unchanged'] += 1
+            continue
+
+        try:
+            await db.run(insert_match_info, match_analysis)
+            stats['changed'] += 1
+            logging.info(f"Maç verisi değişti ve güncellendi (ID: {match_id})")
+        except Exception as e:
+            logging.error(f"Yenilenen maç kaydedilemedi (ID: {match_id}): {type(e).__name__}: {str(e)}")
+            stats['failed'] += 1
+
+async def refresh_matches_async(window_hours: float = REFRESH_WINDOW_HOURS, extra_ids: Iterable[int] = None) -> Dict[str, int]:
+    """Yaklaşan maçların oran ve tahminlerini yeniden analiz eder"""
+    stats = {'checked': 0, 'changed': 0, 'unchanged': 0, 'failed': 0}
+    async with AsyncDatabase(name='refresh-db') as db:
+        # Tek başına çalıştırıldığında da şema güncel olmalı (güncelse hemen döner)
+        await db.run(migrate)
+        queue = await db.run(get_refresh_queue, window_hours, extra_ids)
+        logging.info(f"🔄 {len(queue)} maç yenilenecek (pencere: {window_hours} saat)")
+        if not queue:
+            return stats
+
+        async with create_async_session() as session:
+            workers = [
+                asyncio.create_task(_refresh_worker(session, db, queue, stats))
+                for _ in range(min(REFRESH_MAX_CONCURRENT, len(queue)))
+            ]
+            await asyncio.gather(*workers)
+
+        logging.info(f"✅ Yenileme tamamlandı: {stats['changed']} değişti, {stats['unchanged']} aynı, "
+                     f"{stats['failed']} başarısız")
+        return stats
+
+def refresh_matches(window_hours: float = REFRESH_WINDOW_HOURS, extra_ids: Iterable[int] = None) -> Dict[str, int]:
+    """Senkron wrapper fonksiyonu"""
+    return asyncio.run(refresh_matches_async(window_hours, extra_ids))
+
+if __name__ == "__main__":
+    refresh_matches()
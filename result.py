@@ -1,13 +1,18 @@
-import sqlite3
 import logging
 from datetime import datetime, timedelta
 import pytz
 from typing import List, Dict, Any, Tuple
-import requests
 import os
 from dotenv import load_dotenv
 import concurrent.futures
 from itertools import islice
+from concurrency import AdaptiveLimiter
+from retry import retry_call
+from http_client import post
+from schemas import loads
+from payload_store import DEFAULT_STORE as PAYLOAD_STORE
+from db_connection import acquire_reader, acquire_writer, release_connection
+from queries import COMPLETED_MATCHES_QUERY
 
 # .env dosyasını yükle
 load_dotenv()
@@ -18,38 +23,71 @@ TR_TIMEZONE = pytz.timezone('Europe/Istanbul')
 # API URL'sini al
 API_URL = os.getenv('API_URL')
 
+# Başlama saatinden bu kadar sonra alınan yanıtlar kesin skor içerir kabul edilir
+FINAL_SCORE_DELAY = timedelta(hours=2, minutes=30)
+
 # Batch size for parallel processing
-BATCH_SIZE = 10
+BATCH_SIZE = 30
+
+# analyze-match uç noktası için adaptif eş zamanlılık sınırlayıcısı (thread havuzu üst sınırdır)
+RESULT_LIMITER = AdaptiveLimiter(
+    'result-analyze-match',
+    initial_limit=10,
+    max_limit=BATCH_SIZE,
+    latency_target=15.0
+)
+
+def _post_analyze_match(url: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """analyze-match uç noktasına tek bir istek gönderir"""
+    # Eş zamanlılık adaptif sınırlayıcıyla kısıtlanır
+    with RESULT_LIMITER.slot():
+        response = post(url, payload)
+        response.raise_for_status()
+    return loads(response.content)
+
+def get_final_fetch_time(match_date: str, match_time: str) -> float:
+    """Maç bittikten sonra alınmış sayılacak en erken yanıt zamanını (epoch) döndürür"""
+    kickoff = TR_TIMEZONE.localize(datetime.strptime(f"{match_date} {match_time}", "%Y-%m-%d %H:%M"))
+    return (kickoff + FINAL_SCORE_DELAY).timestamp()
+
+def get_match_result(match_id: int, fetched_after: float = None) -> Dict[str, Any]:
+    """API'den maç sonucunu alır
 
-def get_match_result(match_id: int) -> Dict[str, Any]:
-    """API'den maç sonucunu alır"""
+    fetched_after verilirse, bu zamandan sonra arşivlenmiş bir yanıt varsa
+    API'ye gitmeden skor arşivden okunur.
+    """
     logging.info(f"🔄 Maç sonucu alınıyor (ID: {match_id})")
     try:
-        url = f"{API_URL}/analyze-match"
-        
-        # İstek verisi
-        payload = {
-            "match_id": match_id
-        }
-        
-        logging.debug(f"API isteği gönderiliyor: {url}")
-        logging.debug(f"Payload: {payload}")
-        
-        # POST isteği gönder
-        response = requests.post(url, json=payload)
-        response.raise_for_status()
-        
-        data = response.json()
-        logging.debug(f"API yanıtı alındı: {data}")
+        match_data = PAYLOAD_STORE.get(match_id, fetched_after=fetched_after) if fetched_after else None
         
-        if not data or 'data' not in data:
-            raise ValueError(f"Maç sonucu bulunamadı (ID: {match_id})")
+        if match_data is not None and 'score' in match_data:
+            logging.debug(f"Maç sonucu arşivden okundu (ID: {match_id})")
+        else:
+            url = f"{API_URL}/analyze-match"
+            
+            # İstek verisi
+            payload = {
+                "match_id": match_id
+            }
+            
+            logging.debug(f"API isteği gönderiliyor: {url}")
+            logging.debug(f"Payload: {payload}")
+            
+            # POST isteği gönder (geri çekilme ve devre kesici ile)
+            data = retry_call('analyze-match', _post_analyze_match, url, payload)
+            logging.debug(f"API yanıtı alındı: {data}")
+            
+            if not data or 'data' not in data:
+                raise ValueError(f"Maç sonucu bulunamadı (ID: {match_id})")
+            
+            match_data = data['data']
+            PAYLOAD_STORE.try_put(match_id, match_data)
             
         # API'den gelen veriyi kontrol et
-        if 'score' not in data['data']:
+        if 'score' not in match_data:
             raise ValueError(f"Maç skoru verisi eksik (ID: {match_id})")
             
-        score_data = data['data']['score']
+        score_data = match_data['score']
         logging.debug(f"Skor verisi: {score_data}")
         
         # Skor verilerini ayıkla
@@ -93,16 +131,11 @@ def get_match_result(match_id: int) -> Dict[str, Any]:
         logging.error(f"❌ Maç sonucu alınırken hata (ID: {match_id}): {str(e)}")
         raise
 
-def get_db_connection():
-    """Veritabanı bağlantısı oluşturur"""
-    logging.debug("Veritabanı bağlantısı oluşturuluyor...")
-    return sqlite3.connect('soccer_analysis.db')
-
 def get_completed_matches() -> List[Dict[str, Any]]:
     """0-0 skorlu maçları veritabanından alır"""
     logging.info("🔍 0-0 skorlu maçlar aranıyor...")
     try:
-        conn = get_db_connection()
+        conn = acquire_reader()
         cursor = conn.cursor()
         
         # En az 2 saat önce başlamış ve skoru 0-0 olan maçları al
@@ -110,20 +143,7 @@ def get_completed_matches() -> List[Dict[str, Any]]:
         current_date = two_hours_ago.strftime("%Y-%m-%d")
         current_time = two_hours_ago.strftime("%H:%M")
         
-        query = """
-        SELECT m.match_id, m.match_date, m.match_time, m.league, 
-               m.home_team, m.away_team, 
-               ms.home_score, ms.away_score, 
-               ms.ht_home_score, ms.ht_away_score
-        FROM matches m
-        INNER JOIN match_scores ms ON m.match_id = ms.match_id
-        WHERE (m.match_date < ? OR (m.match_date = ? AND m.match_time <= ?))
-        AND ms.home_score = 0 AND ms.away_score = 0
-        AND ms.ht_home_score = 0 AND ms.ht_away_score = 0
-        ORDER BY m.match_date DESC, m.match_time ASC
-        """
-        
-        cursor.execute(query, (current_date, current_date, current_time))
+        cursor.execute(COMPLETED_MATCHES_QUERY, (current_date, current_date, current_time))
         matches = cursor.fetchall()
         
         result = []
@@ -151,13 +171,13 @@ def get_completed_matches() -> List[Dict[str, Any]]:
         return []
     finally:
         if 'conn' in locals():
-            conn.close()
+            release_connection(conn)
 
 def update_match_scores(match_id: int, scores: Dict[str, Any]) -> bool:
     """Maç skorlarını günceller"""
     logging.info(f"📝 Maç skoru güncelleniyor (ID: {match_id})")
     try:
-        conn = get_db_connection()
+        conn = acquire_writer()
         cursor = conn.cursor()
         
         # Önce mevcut skorları kontrol et
@@ -232,7 +252,7 @@ def update_match_scores(match_id: int, scores: Dict[str, Any]) -> bool:
         return False
     finally:
         if 'conn' in locals():
-            conn.close()
+            release_connection(conn)
 
 def process_match(match: Dict[str, Any]) -> Tuple[bool, bool, Dict[str, Any]]:
     """Tek bir maçı işler ve sonucu döndürür"""
@@ -242,8 +262,9 @@ def process_match(match: Dict[str, Any]) -> Tuple[bool, bool, Dict[str, Any]]:
                     f"Tarih: {match['match_date']} {match['match_time']}\n"
                     f"Maç: {match['home_team']} vs {match['away_team']}")
         
-        # API'den maç sonucunu al
-        scores = get_match_result(match['match_id'])
+        # Maç sonucunu al (maç bittikten sonra arşivlenmiş yanıt varsa API'ye gidilmez)
+        fetched_after = get_final_fetch_time(match['match_date'], match['match_time'])
+        scores = get_match_result(match['match_id'], fetched_after)
         
         # Skoru güncelle
         is_updated = update_match_scores(match['match_id'], scores)
@@ -322,6 +343,10 @@ def analyze_results():
         logging.info(f"📦 Toplam batch sayısı: {batch_count}")
         logging.info(f"❌ Hata sayısı: {total_matches - total_success}")
         
+        limiter_stats = RESULT_LIMITER.snapshot()
+        logging.info(f"⚙️ Eş zamanlılık limiti: {limiter_stats['limit']} "
+                     f"(p95: {limiter_stats['p95'] or 0:.2f}s, hata oranı: {limiter_stats['error_rate']:.0%})")
+        
         return True
         
     except Exception as e:
@@ -0,0 +1,241 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+from concurrency import BudgetExhaustedError
+
+# Uç nokta bazlı yeniden deneme ve devre kesici ayarları
+ENDPOINT_CONFIGS = {
+    'fetch-matches': {
+        'max_attempts': 5,
+        'base_delay': 2.0,
+        'max_delay': 60.0,
+        'failure_threshold': 3,
+        'reset_timeout': 60.0
+    },
+    'analyze-match': {
+        'max_attempts': 3,
+        'base_delay': 1.0,
+        'max_delay': 30.0,
+        'failure_threshold': 10,
+        'reset_timeout': 30.0
+    }
+}
+
+DEFAULT_CONFIG = {
+    'max_attempts': 3,
+    'base_delay': 1.0,
+    'max_delay': 30.0,
+    'failure_threshold': 5,
+    'reset_timeout': 30.0
+}
+
+class ApiResponseError(Exception):
+    """API yanıt verdi ama içerik başarısız; yeniden denenir, devreyi açmaz"""
+
+class CircuitOpenError(Exception):
+    """Devre açıkken yapılan çağrılar beklemeden bu hatayla sonlanır"""
+
+class RetryPolicy:
+    """Tam jitter'lı üstel geri çekilme politikası"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 1.0, max_delay: float = 30.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def compute_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """attempt (0'dan başlar) sonrası beklenecek süreyi döndürür"""
+        if retry_after is not None:
+            return min(self.max_delay, max(0.0, retry_after))
+        # Full jitter: [0, min(max_delay, base * 2^attempt)] aralığından rastgele
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+class CircuitBreaker:
+    """Uç nokta başına devre kesici (closed -> open -> half_open -> closed)"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def before_call(self):
+        """Çağrıya izin verilip verilmediğini kontrol eder, açıksa hemen hata fırlatır"""
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    raise CircuitOpenError(f"Devre açık: {self.name}")
+                self._state = self.HALF_OPEN
+                self._probe_started = None
+
+            if self._state == self.HALF_OPEN:
+                # Yarı açıkta yalnızca tek bir deneme isteğine izin ver; iptal edilip
+                # sonuçlanmayan deneme reset_timeout sonra yenisine yer açar
+                now = time.monotonic()
+                if self._probe_started is not None and now - self._probe_started < self.reset_timeout:
+                    raise CircuitOpenError(f"Devre yarı açık, deneme isteği sürüyor: {self.name}")
+                self._probe_started = now
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logging.info(f"Devre kapandı: {self.name}")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logging.warning(f"Devre açıldı: {self.name} ({self._failures} ardışık hata)")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_started = None
+
+_policies: Dict[str, RetryPolicy] = {}
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+def _config_for(endpoint: str) -> Dict[str, Any]:
+    return {**DEFAULT_CONFIG, **ENDPOINT_CONFIGS.get(endpoint, {})}
+
+def configure_endpoint(endpoint: str, **overrides):
+    """Bir uç noktanın ayarlarını değiştirir ve durumunu sıfırlar"""
+    with _registry_lock:
+        ENDPOINT_CONFIGS[endpoint] = {**ENDPOINT_CONFIGS.get(endpoint, {}), **overrides}
+        _policies.pop(endpoint, None)
+        _breakers.pop(endpoint, None)
+
+def get_policy(endpoint: str) -> RetryPolicy:
+    with _registry_lock:
+        if endpoint not in _policies:
+            config = _config_for(endpoint)
+            _policies[endpoint] = RetryPolicy(config['max_attempts'], config['base_delay'], config['max_delay'])
+        return _policies[endpoint]
+
+def get_breaker(endpoint: str) -> CircuitBreaker:
+    with _registry_lock:
+        if endpoint not in _breakers:
+            config = _config_for(endpoint)
+            _breakers[endpoint] = CircuitBreaker(endpoint, config['failure_threshold'], config['reset_timeout'])
+        return _breakers[endpoint]
+
+def _status_of(exc: Exception) -> Optional[int]:
+    """requests veya aiohttp hatasından HTTP durum kodunu çıkarır"""
+    status = getattr(exc, 'status', None)
+    if status is None and getattr(exc, 'response', None) is not None:
+        status = getattr(exc.response, 'status_code', None)
+    return status
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After başlığını (saniye veya HTTP tarihi) saniyeye çevirir"""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+def _retry_after_of(exc: Exception) -> Optional[float]:
+    headers = getattr(exc, 'headers', None)
+    if headers is None and getattr(exc, 'response', None) is not None:
+        headers = getattr(exc.response, 'headers', None)
+    if not headers:
+        return None
+    return parse_retry_after(headers.get('Retry-After'))
+
+def _is_retryable(exc: Exception) -> bool:
+    """4xx hataları (429 hariç) ve kendini kalıcı olarak işaretleyen hatalar yeniden denemeye değmez"""
+    if not getattr(exc, 'retryable', True):
+        return False
+    status = _status_of(exc)
+    return status is None or status == 429 or status >= 500
+
+def _counts_as_failure(exc: Exception) -> bool:
+    """Servisin sağlıksız olduğunu gösteren hatalar devreyi açar"""
+    if isinstance(exc, ApiResponseError):
+        return False
+    status = _status_of(exc)
+    return status is None or status == 429 or status >= 500
+
+def _on_error(endpoint: str, breaker: CircuitBreaker, policy: RetryPolicy, attempt: int, exc: Exception) -> Optional[float]:
+    """Hatayı kaydeder; yeniden denenecekse beklenecek süreyi, denenmeyecekse None döndürür"""
+    if isinstance(exc, BudgetExhaustedError):
+        # İstek hiç gönderilmedi; servisin sağlığı hakkında bilgi vermez
+        return None
+
+    if _counts_as_failure(exc):
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+
+    if attempt >= policy.max_attempts - 1 or not _is_retryable(exc):
+        return None
+
+    delay = policy.compute_delay(attempt, _retry_after_of(exc))
+    logging.info(f"[{endpoint}] {type(exc).__name__}: {str(exc)} - "
+                 f"yeniden deneniyor ({attempt + 2}/{policy.max_attempts}), {delay:.1f} sn sonra...")
+    return delay
+
+def retry_call(endpoint: str, func, *args, **kwargs):
+    """Senkron çağrıyı uç noktanın politikası ve devre kesicisiyle çalıştırır"""
+    policy = get_policy(endpoint)
+    breaker = get_breaker(endpoint)
+
+    for attempt in range(policy.max_attempts):
+        breaker.before_call()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            delay = _on_error(endpoint, breaker, policy, attempt, e)
+            if delay is None:
+                raise
+            time.sleep(delay)
+            continue
+        breaker.record_success()
+        return result
+
+async def retry_call_async(endpoint: str, func, *args, **kwargs):
+    """Asenkron çağrıyı uç noktanın politikası ve devre kesicisiyle çalıştırır"""
+    policy = get_policy(endpoint)
+    breaker = get_breaker(endpoint)
+
+    for attempt in range(policy.max_attempts):
+        breaker.before_call()
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as e:
+            delay = _on_error(endpoint, breaker, policy, attempt, e)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+            continue
+        breaker.record_success()
+        return result
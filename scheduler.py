@@ -3,6 +3,9 @@ import time
 from datetime import datetime, timedelta
 import pytz
 from bot import process_matches
+from refresh import refresh_matches
+from archive import archive_old_matches
+from snapshot import publish_snapshot
 from telegram_bot import send_message, cleanup, send_photo
 from twitter_bot import send_twitter_message, set_test_mode
 from message_handler import (
@@ -28,6 +31,9 @@ GOOD_MORNING_MESSAGES = {
     6: "Pazar gününden herkese günaydın! 🌅 Haftanın son gününde futbol şöleni devam ediyor! ⚽"
 }
 
+# Yaklaşan maçların yenilenme aralığı (dakika)
+REFRESH_INTERVAL_MINUTES = 15
+
 def is_turkish_time(hour: int, minute: int = 0) -> bool:
     """Verilen saatin Türkiye saati olup olmadığını kontrol eder"""
     now = datetime.now(TR_TIMEZONE)
@@ -39,11 +45,53 @@ def daily_match_analysis():
     try:
         process_matches()
         logging.info("✅ Günün maçları analiz edildi ve veritabanına kaydedildi.")
+        # Paylaşım sorguları bu kopyadan okur, yenileme yazımlarıyla çakışmaz
+        publish_snapshot()
     except Exception as e:
         error_msg = f"❌ Maç analizi sırasında hata oluştu: {str(e)}"
         logging.error(error_msg)
         send_message(error_msg)  # Sadece hata durumunda mesaj gönder
 
+def archive_old_data():
+    """Eski maçları aylık arşiv veritabanlarına taşır"""
+    try:
+        archive_old_matches()
+    except Exception as e:
+        logging.error(f"Eski maçlar arşivlenirken hata oluştu: {e}")
+
+def refresh_and_publish(extra_ids=None):
+    """Paylaşımdan önce maçları yeniler; değişen maç olduysa snapshot'ı yeniden yayınlar
+
+    Sadece paylaşım öncesi işlerden çağrılır: gün içindeki periyodik yenilemeler
+    snapshot'a dokunmaz, paylaşılan içerik gün boyunca tekrarlanabilir kalır.
+    """
+    stats = refresh_matches(extra_ids=extra_ids)
+    if stats['changed']:
+        publish_snapshot()
+
+def refresh_upcoming_matches():
+    """Başlamasına az kalan maçların oran ve tahminlerini yeniler (snapshot yeniden yayınlanmaz)"""
+    try:
+        refresh_matches()
+    except Exception as e:
+        logging.error(f"Yaklaşan maçlar yenilenirken hata oluştu: {e}")
+
+def refresh_major_league_matches():
+    """Paylaşılacak major lig maçlarını paylaşımdan önce yeniler"""
+    try:
+        match_ids = [p['match_id'] for p in get_major_league_predictions()]
+        refresh_and_publish(match_ids)
+    except Exception as e:
+        logging.error(f"Major lig maçları yenilenirken hata oluştu: {e}")
+
+def refresh_ht_goals_matches():
+    """İlk yarı gol listesindeki maçları paylaşımdan önce yeniler"""
+    try:
+        match_ids = [p['match_id'] for p in get_ht_goals_predictions()]
+        refresh_and_publish(match_ids)
+    except Exception as e:
+        logging.error(f"İY gol listesi maçları yenilenirken hata oluştu: {e}")
+
 def send_good_morning():
     """Günaydın mesajı gönderir"""
     try:
@@ -354,7 +402,13 @@ def test_all_functions():
 def run_scheduler():
     """Zamanlanmış görevleri çalıştırır"""
     # Tüm zamanlamalar Türkiye saatine göre (UTC+3)
+    schedule.every().day.at("03:30").do(archive_old_data)
     schedule.every().day.at("04:00").do(daily_match_analysis)
+    
+    # Oran ve tahmin yenilemeleri: yaklaşan maçlar düzenli, paylaşılacaklar paylaşımdan hemen önce
+    schedule.every(REFRESH_INTERVAL_MINUTES).minutes.do(refresh_upcoming_matches)
+    schedule.every().day.at("08:50").do(refresh_major_league_matches)
+    schedule.every().day.at("11:20").do(refresh_ht_goals_matches)
     schedule.every().day.at("07:50").do(send_good_morning)
     schedule.every().day.at("08:30").do(send_daily_matches_ready)
     schedule.every().day.at("08:45").do(send_advertisement)  # First ad after matches ready
@@ -0,0 +1,198 @@
+import json
+from typing import Dict, Any, List, Iterator, Iterable, Tuple, Union, TypedDict
+from retry import ApiResponseError
+
+try:
+    import orjson
+except ImportError:  # orjson yoksa standart json kullanılır
+    orjson = None
+
+def loads(raw: Union[bytes, str]) -> Any:
+    """JSON çözer; orjson kuruluysa onu kullanır"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+class PayloadError(ApiResponseError):
+    """API yanıtı beklenen şemaya uymuyor
+
+    Bozuk (yarım) JSON geçici bir hata olabilir ve yeniden denenir; şema
+    ihlali her denemede aynı sonucu vereceği için yeniden denenmez.
+    """
+
+    def __init__(self, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.retryable = retryable
+
+class MatchInfo(TypedDict):
+    id: int
+    mac_tarihi: str
+    mac_saati: str
+    lig: str
+    mac: str  # "Ev Sahibi - Deplasman"
+    stadium: str
+    weather: str
+
+class AnalyzeMatchData(TypedDict, total=False):
+    """analyze-match yanıtındaki 'data' alanı (ilk beş bölüm zorunludur)"""
+    info: MatchInfo
+    tahminler: Dict[str, str]
+    home_away_goal: Dict[str, Any]
+    yuzdeler: Dict[str, str]
+    son_10_mac: Dict[str, str]
+    bahis_oranlari: Dict[str, Dict[str, Dict[str, Any]]]
+    korner_oranlari: Dict[str, Any]
+    cifte_sans_oranlari: Dict[str, Any]
+    skor_oranlari: Dict[str, Any]
+    match_statistics: Dict[str, Dict[str, Dict[str, Any]]]
+    h2h_matches: Dict[str, Any]
+    poisson: Dict[str, Dict[str, Dict[str, Any]]]
+    score: Dict[str, Any]
+
+# Zorunlu bölümler ve her bölümde bulunması gereken alanlar
+ANALYZE_REQUIRED_FIELDS = {
+    'info': ('id', 'mac_tarihi', 'mac_saati', 'lig', 'mac', 'stadium', 'weather'),
+    'tahminler': (),
+    'home_away_goal': ('home_goal', 'away_goal', 'home_goal_ht', 'away_goal_ht'),
+    'yuzdeler': (
+        'ev_gol_yuzdesi', 'dep_gol_yuzdesi', 'ust_yuzdesi_1', 'ust_yuzdesi2', 'ust_yuzdesi3',
+        'ms_yuzdeleri', 'ev_gol_yuzdesi_ht', 'dep_gol_yuzdesi_ht', 'ust_yuzdesi_05_ht',
+        'ust_yuzdesi_15_ht', 'ust_yuzdesi_25_ht', 'iy_yuzdeleri_'
+    ),
+    'son_10_mac': ('ev_sahibi', 'deplasman')
+}
+
+LAST_10_FIELDS = ('over_25', 'btts', 'ht_over_05', 'over_35', 'over_15', 'ht_over_15')
+H2H_MATCH_FIELDS = ('date', 'league', 'home_team', 'away_team', 'score', 'ht_score', 'corners', 'ht_corners')
+H2H_STATISTICS_FIELDS = (
+    'total_matches', 'over_25', 'btts', 'ht_over_05', 'over_35', 'over_15', 'ht_over_15',
+    'home_wins', 'away_wins', 'draws'
+)
+
+def _expect(value: Any, expected_type, path: str, *path_args) -> Any:
+    """Tip kontrolü; hata yolu (path) sadece hata durumunda biçimlendirilir"""
+    if not isinstance(value, expected_type):
+        raise PayloadError(f"{path.format(*path_args)}: {expected_type.__name__} bekleniyordu, "
+                           f"{type(value).__name__} geldi")
+    return value
+
+def _require(section: Dict[str, Any], fields: Iterable[str], path: str, *path_args):
+    missing = [field for field in fields if field not in section]
+    if missing:
+        raise PayloadError(f"{path.format(*path_args)}: eksik alan(lar): {', '.join(missing)}")
+
+def _match_id(value: Any, path: str, *path_args) -> int:
+    """Maç ID'sini int'e çevirir (API bazen string döndürebilir)"""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    raise PayloadError(f"{path.format(*path_args)}: geçersiz maç ID'si: {value!r}")
+
+def _validate_odds_list(data: Dict[str, Any], section: str, odds_key: str):
+    """korner/çifte şans/skor oranlarının Data.oddsList yapısını doğrular"""
+    if 'Data' not in data:
+        return
+    odds_list = _expect(_expect(data['Data'], dict, '{}.Data', section).get('oddsList', []), list,
+                        '{}.Data.oddsList', section)
+    for i, odds in enumerate(odds_list):
+        _expect(odds, dict, '{}.Data.oddsList[{}]', section, i)
+        if odds_key in odds:
+            _expect(odds[odds_key], dict, '{}.Data.oddsList[{}].{}', section, i, odds_key)
+
+def validate_analyze_match(data: Any) -> AnalyzeMatchData:
+    """analyze-match 'data' alanını doğrular; maç ID'si int'e çevrilmiş bir kopya döndürür
+
+    Çözülen yanıt değiştirilmez: sadece üst seviye ve 'info' sözlükleri kopyalanır.
+    """
+    _expect(data, dict, 'data')
+    for section, fields in ANALYZE_REQUIRED_FIELDS.items():
+        if section not in data:
+            raise PayloadError(f"data: eksik bölüm: {section}")
+        _require(_expect(data[section], dict, section), fields, section)
+
+    info = dict(data['info'], id=_match_id(data['info']['id'], 'info.id'))
+    data = dict(data, info=info)
+    if ' - ' not in _expect(info['mac'], str, 'info.mac'):
+        raise PayloadError(f"info.mac: 'Ev Sahibi - Deplasman' biçimi bekleniyordu: {info['mac']!r}")
+
+    if 'bahis_oranlari' in data:
+        for bookmaker, odds_data in _expect(data['bahis_oranlari'], dict, 'bahis_oranlari').items():
+            _expect(odds_data, dict, 'bahis_oranlari.{}', bookmaker)
+            for side in ('acilis', 'kapanis'):
+                if side in odds_data:
+                    _expect(odds_data[side], dict, 'bahis_oranlari.{}.{}', bookmaker, side)
+
+    if 'korner_oranlari' in data:
+        _validate_odds_list(_expect(data['korner_oranlari'], dict, 'korner_oranlari'), 'korner_oranlari', 'odds')
+        for i, odds in enumerate(data['korner_oranlari'].get('Data', {}).get('oddsList', [])):
+            if 'odds' in odds:
+                _expect(odds['odds'].get('f'), dict, 'korner_oranlari.Data.oddsList[{}].odds.f', i)
+    if 'cifte_sans_oranlari' in data:
+        _validate_odds_list(_expect(data['cifte_sans_oranlari'], dict, 'cifte_sans_oranlari'), 'cifte_sans_oranlari', 'fodds')
+    if 'skor_oranlari' in data:
+        _validate_odds_list(_expect(data['skor_oranlari'], dict, 'skor_oranlari'), 'skor_oranlari', 'odds')
+
+    if 'match_statistics' in data:
+        statistics = _expect(data['match_statistics'], dict, 'match_statistics')
+        for team_type in ('home', 'away'):
+            team = _expect(statistics.get(team_type), dict, 'match_statistics.{}', team_type)
+            last_10 = _expect(team.get('last_10'), dict, 'match_statistics.{}.last_10', team_type)
+            _require(last_10, LAST_10_FIELDS, 'match_statistics.{}.last_10', team_type)
+
+    if 'h2h_matches' in data:
+        h2h = _expect(data['h2h_matches'], dict, 'h2h_matches')
+        for i, match in enumerate(_expect(h2h.get('matches', []), list, 'h2h_matches.matches')):
+            _require(_expect(match, dict, 'h2h_matches.matches[{}]', i), H2H_MATCH_FIELDS, 'h2h_matches.matches[{}]', i)
+        if 'statistics' in h2h:
+            _require(_expect(h2h['statistics'], dict, 'h2h_matches.statistics'), H2H_STATISTICS_FIELDS, 'h2h_matches.statistics')
+
+    if 'poisson' in data and 'poisson' in _expect(data['poisson'], dict, 'poisson'):
+        for dist_type, values in _expect(data['poisson']['poisson'], dict, 'poisson.poisson').items():
+            _expect(values, dict, 'poisson.poisson.{}', dist_type)
+
+    if 'score' in data:
+        _expect(data['score'], dict, 'score')
+
+    return data
+
+def _decode_envelope(raw: Union[bytes, str], endpoint: str) -> Any:
+    """{"status": "success", "data": ...} zarfını çözer ve 'data' alanını döndürür"""
+    try:
+        body = loads(raw)
+    except ValueError as e:
+        # Yarım kalmış yanıt geçici olabilir, yeniden denenir
+        raise PayloadError(f"{endpoint}: geçersiz JSON: {str(e)}", retryable=True)
+
+    if not body:
+        raise ApiResponseError(f"{endpoint}: API boş yanıt döndürdü")
+    if not isinstance(body, dict):
+        raise PayloadError(f"{endpoint}: JSON nesnesi bekleniyordu, {type(body).__name__} geldi")
+    if body.get('status') != 'success' or 'data' not in body:
+        raise ApiResponseError(f"{endpoint}: API yanıtı başarısız veya veri yok: {str(body)[:200]}")
+    return body['data']
+
+def decode_analyze_match(raw: Union[bytes, str]) -> AnalyzeMatchData:
+    """analyze-match yanıt gövdesini çözer ve doğrular"""
+    return validate_analyze_match(_decode_envelope(raw, 'analyze-match'))
+
+def decode_fetch_matches(raw: Union[bytes, str]) -> List[Any]:
+    """fetch-matches yanıt gövdesini çözer; maç listesi boşsa hata fırlatır"""
+    matches = _decode_envelope(raw, 'fetch-matches')
+    if not matches:
+        raise ApiResponseError("fetch-matches: maç listesi boş")
+    return _expect(matches, list, 'fetch-matches.data')
+
+def iter_match_ids(matches: Iterable[Any]) -> Iterator[Tuple[int, Any]]:
+    """Maç listesini tek tek doğrulayarak (index, match_id) üretir
+
+    Geçersiz bir kayıt tüm listeyi bozmaz: PayloadError olarak üretilir ve
+    çağıran tarafından sayılıp atlanır.
+    """
+    for i, match in enumerate(matches):
+        try:
+            if not isinstance(match, (list, tuple)) or not match:
+                raise PayloadError(f"fetch-matches.data[{i}]: boş olmayan liste bekleniyordu: {str(match)[:100]}")
+            yield i, _match_id(match[0], 'fetch-matches.data[{}][0]', i)
+        except PayloadError as e:
+            yield i, e
@@ -0,0 +1,139 @@
+import os
+import time
+import sqlite3
+import logging
+import argparse
+import threading
+from datetime import datetime
+from typing import Optional, Tuple
+import pytz
+from db_connection import DB_PATH, connect, get_pool
+
+TR_TIMEZONE = pytz.timezone('Europe/Istanbul')
+
+# Paylaşım sorgularının okuduğu, günlük analiz bitince yayınlanan salt okunur kopya
+SNAPSHOT_PATH = os.getenv('DAILY_SNAPSHOT_PATH', 'soccer_analysis_snapshot.db')
+
+# Yayınlanan dosyanın tanınması için (inode, mtime) ve okunan snapshot tarihi
+_published: dict = {'file_id': None, 'date': None}
+_published_lock = threading.Lock()
+
+# Snapshot'a kopyalanan tablo; paylaşım sorgularının hepsi sadece bunu okur
+SNAPSHOT_TABLE = 'daily_predictions'
+
+def publish_snapshot(snapshot_date: str = None, db_path: str = DB_PATH,
+                     snapshot_path: str = SNAPSHOT_PATH) -> str:
+    """Günün paylaşım verisinin tutarlı bir kopyasını alır ve snapshot olarak yayınlar
+
+    Snapshot'a sadece o tarihin daily_predictions satırları (ve tablonun
+    index'leri) girer; ana veritabanının tamamı kopyalanmaz. Kopya aynı
+    dizinde geçici bir dosyaya tek okuma transaction'ında alınır (yazıcıyı
+    bloklamaz), sonra os.replace ile atomik olarak yerine konur. Okuyucular
+    ya eski ya yeni dosyanın tamamını görür; yarım yazılmış bir snapshot
+    hiçbir zaman okunmaz.
+    """
+    snapshot_date = snapshot_date or datetime.now(TR_TIMEZONE).strftime("%Y-%m-%d")
+    directory = os.path.dirname(os.path.abspath(snapshot_path))
+    temp_path = os.path.join(directory, f".{os.path.basename(snapshot_path)}.{os.getpid()}.tmp")
+
+    started = time.perf_counter()
+    if os.path.exists(temp_path):
+        # Yarıda kalmış eski bir yayından arta kalan dosya
+        os.remove(temp_path)
+    try:
+        # Snapshot tek dosyadır; -wal/-shm dosyası olmadan okunabilmeli (varsayılan DELETE günlüğü)
+        target = sqlite3.connect(temp_path, isolation_level=None)
+        try:
+            target.execute("ATTACH DATABASE ? AS source", (os.path.abspath(db_path),))
+            # Şema okuması ve kopya aynı transaction'da: ana veritabanının tek bir anını görür
+            target.execute("BEGIN")
+            schema = target.execute(
+                "SELECT type, sql FROM source.sqlite_master WHERE tbl_name = ? AND sql IS NOT NULL",
+                (SNAPSHOT_TABLE,)
+            ).fetchall()
+            if not schema:
+                raise RuntimeError(f"{db_path}: {SNAPSHOT_TABLE} tablosu yok, önce migrations.py çalıştırılmalı")
+            for _, sql in schema:
+                if sql.startswith('CREATE TABLE'):
+                    target.execute(sql)
+            count = target.execute(
+                f"INSERT INTO main.{SNAPSHOT_TABLE} SELECT * FROM source.{SNAPSHOT_TABLE} WHERE match_date = ?",
+                (snapshot_date,)
+            ).rowcount
+            for _, sql in schema:
+                if not sql.startswith('CREATE TABLE'):
+                    target.execute(sql)
+            target.execute("CREATE TABLE snapshot_info (snapshot_date TEXT NOT NULL, created_at TEXT NOT NULL)")
+            target.execute(
+                "INSERT INTO snapshot_info (snapshot_date, created_at) VALUES (?, ?)",
+                (snapshot_date, datetime.now(TR_TIMEZONE).isoformat(timespec='seconds'))
+            )
+            target.execute("COMMIT")
+            target.execute("DETACH DATABASE source")
+        finally:
+            target.close()
+
+        with open(temp_path, 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(temp_path, snapshot_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    logging.info(f"📸 {snapshot_date} snapshot'ı yayınlandı ({count} tahmin, "
+                 f"{os.path.getsize(snapshot_path) // 1024} KB, {time.perf_counter() - started:.2f} sn)")
+    return snapshot_path
+
+def _file_id(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+def get_snapshot_date(snapshot_path: str = SNAPSHOT_PATH) -> Optional[str]:
+    """Yayınlanmış snapshot'ın tarihini döndürür (yoksa None)
+
+    Dosya değiştiyse (yeni snapshot yayınlandıysa) eski dosyaya açık
+    havuz kapatılır; kullanımdaki bağlantılar iade edilince kapanır.
+    """
+    file_id = _file_id(snapshot_path)
+    if file_id is None:
+        return None
+
+    with _published_lock:
+        if file_id != _published['file_id']:
+            get_pool(snapshot_path, immutable=True).close()
+            conn = connect(snapshot_path, immutable=True)
+            try:
+                row = conn.execute("SELECT snapshot_date FROM snapshot_info").fetchone()
+            finally:
+                conn.close()
+            _published['file_id'] = file_id
+            _published['date'] = row[0] if row else None
+        return _published['date']
+
+def acquire_snapshot_reader(today: str = None, snapshot_path: str = SNAPSHOT_PATH,
+                            db_path: str = DB_PATH) -> sqlite3.Connection:
+    """Günün snapshot'ından okuma bağlantısı döndürür (db_connection.release_connection ile iade edilir)
+
+    Bugünün snapshot'ı henüz yayınlanmadıysa (analiz bitmedi ya da hata
+    aldı) ana veritabanının okuma havuzuna düşülür.
+    """
+    today = today or datetime.now(TR_TIMEZONE).strftime("%Y-%m-%d")
+    if get_snapshot_date(snapshot_path) == today:
+        return get_pool(snapshot_path, immutable=True).acquire_reader()
+
+    logging.warning(f"{today} snapshot'ı bulunamadı, ana veritabanından okunuyor")
+    return get_pool(db_path).acquire_reader()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Günün paylaşım verisinin salt okunur snapshot'ını yayınlar")
+    parser.add_argument('--date', help="Snapshot tarihi (varsayılan: bugün)")
+    parser.add_argument('--output', default=SNAPSHOT_PATH, help="Snapshot dosyası")
+    args = parser.parse_args()
+
+    publish_snapshot(args.date, snapshot_path=args.output)
@@ -0,0 +1,372 @@
+import os
+import json
+import math
+import random
+import asyncio
+import logging
+import argparse
+import time
+from collections import defaultdict
+from typing import Dict, Any, List, Callable, Optional
+from aiohttp import web
+from payload_store import PayloadStore
+
+# Yerel test sunucusunun varsayılan adresi
+STUB_HOST = os.getenv('STUB_API_HOST', '127.0.0.1')
+STUB_PORT = int(os.getenv('STUB_API_PORT', '8765'))
+
+# Sentetik veri için lig ve bahis şirketi havuzları
+SYNTHETIC_LEAGUES = [
+    'Spanish La Liga', 'English Premier League', 'German Bundesliga', 'Italian Serie A',
+    'French Ligue 1', 'Turkey Super Lig', 'Netherlands Eredivisie', 'Portugal Primeira Liga',
+    'Brazil Serie A', 'Japan J1 League'
+]
+SYNTHETIC_BOOKMAKERS = ['Bet365', 'Pinnacle', 'William Hill', 'Betfair']
+PREDICTIONS = ['2.5 Üst', '2.5 Alt', 'KG Var', 'KG Yok', 'MS 1', 'MS 2', '']
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Gecikme dağılımı tanımını örnekleyiciye çevirir
+
+    Desteklenen biçimler (saniye): "0.05", "const:0.05", "uniform:0.01,0.2",
+    "normal:0.1,0.03", "lognormal:0.1,0.5" (medyan, sigma), "exp:0.1" (ortalama).
+    """
+    kind, _, args = spec.partition(':') if ':' in spec else ('const', '', spec)
+    params = [float(x) for x in args.split(',')] if args else []
+
+    if kind == 'const':
+        return lambda rng: params[0]
+    if kind == 'uniform':
+        return lambda rng: rng.uniform(params[0], params[1])
+    if kind == 'normal':
+        return lambda rng: max(0.0, rng.gauss(params[0], params[1]))
+    if kind == 'lognormal':
+        return lambda rng: rng.lognormvariate(math.log(params[0]), params[1])
+    if kind == 'exp':
+        return lambda rng: rng.expovariate(1.0 / params[0])
+    raise ValueError(f"Bilinmeyen gecikme dağılımı: {spec}")
+
+def _percent(rng: random.Random) -> str:
+    return f"{rng.randint(5, 95)}%"
+
+def _odd(rng: random.Random, low: float = 1.1, high: float = 6.0) -> str:
+    return f"{rng.uniform(low, high):.2f}"
+
+def synthetic_match_ids(date_str: str, count: int) -> List[int]:
+    """Tarihe göre sabit (her çalıştırmada aynı) maç ID'leri üretir"""
+    base = int(date_str.replace('-', '')) % 1000000
+    return [base * 100000 + i for i in range(count)]
+
+def synthetic_analysis(match_id: int, date_str: str, seed: int = 0) -> Dict[str, Any]:
+    """insert_match_info'nun beklediği yapıda sentetik bir analyze-match yanıtı üretir"""
+    rng = random.Random(f"{seed}:{match_id}")
+    home_team = f"Takım {rng.randint(1, 500)}"
+    away_team = f"Takım {rng.randint(501, 1000)}"
+    home_goals, away_goals = rng.randint(0, 4), rng.randint(0, 3)
+    ht_home, ht_away = rng.randint(0, home_goals), rng.randint(0, away_goals)
+
+    def last_10() -> Dict[str, int]:
+        return {key: rng.randint(0, 10) for key in ('over_25', 'btts', 'ht_over_05', 'over_35', 'over_15', 'ht_over_15')}
+
+    def odds_side(prefix: str) -> Dict[str, str]:
+        side = {f"{prefix}_{key}": _odd(rng) for key in ('ms1', 'msx', 'ms2', 'iy1', 'iyx', 'iy2', 'oran', 'oran_ht', 'taraf', 'taraf_ht')}
+        side[f"{prefix}_goalline"] = str(rng.choice([2.0, 2.25, 2.5, 2.75, 3.0]))
+        side[f"{prefix}_goalline_ht"] = str(rng.choice([0.75, 1.0, 1.25]))
+        return side
+
+    return {
+        'info': {
+            'id': match_id,
+            'mac_tarihi': date_str,
+            'mac_saati': f"{rng.randint(12, 22):02d}:{rng.choice([0, 15, 30, 45]):02d}",
+            'lig': rng.choice(SYNTHETIC_LEAGUES),
+            'mac': f"{home_team} - {away_team}",
+            'stadium': f"Stadyum {rng.randint(1, 300)}",
+            'weather': rng.choice(['Güneşli', 'Yağmurlu', 'Bulutlu'])
+        },
+        'tahminler': {
+            'ust_tahmini': rng.choice(PREDICTIONS),
+            'kg_tahmini': rng.choice(PREDICTIONS),
+            'ms_tahmini': rng.choice(PREDICTIONS),
+            'iy_gol_tahmini': rng.choice(PREDICTIONS),
+            'korner_tahmini': rng.choice(PREDICTIONS),
+            'riskli_tahmin': rng.choice(PREDICTIONS)
+        },
+        'home_away_goal': {
+            'home_goal': round(rng.uniform(0.3, 2.8), 2),
+            'away_goal': round(rng.uniform(0.3, 2.4), 2),
+            'home_goal_ht': round(rng.uniform(0.1, 1.4), 2),
+            'away_goal_ht': round(rng.uniform(0.1, 1.2), 2)
+        },
+        'yuzdeler': {
+            key: _percent(rng) for key in (
+                'ev_gol_yuzdesi', 'dep_gol_yuzdesi', 'ust_yuzdesi_1', 'ust_yuzdesi2', 'ust_yuzdesi3',
+                'ms_yuzdeleri', 'ev_gol_yuzdesi_ht', 'dep_gol_yuzdesi_ht', 'ust_yuzdesi_05_ht',
+                'ust_yuzdesi_15_ht', 'ust_yuzdesi_25_ht', 'iy_yuzdeleri_'
+            )
+        },
+        'son_10_mac': {
+            'ev_sahibi': ''.join(rng.choice('GBM') for _ in range(10)),
+            'deplasman': ''.join(rng.choice('GBM') for _ in range(10))
+        },
+        'bahis_oranlari': {
+            bookmaker: {'acilis': odds_side('acilis'), 'kapanis': odds_side('kapanis')}
+            for bookmaker in SYNTHETIC_BOOKMAKERS
+        },
+        'korner_oranlari': {'Data': {'oddsList': [
+            {'cn': bookmaker, 'hr': False, 'odds': {'f': {'u': _odd(rng, 1.7, 2.1), 'g': '9.5', 'd': _odd(rng, 1.7, 2.1)}}}
+            for bookmaker in SYNTHETIC_BOOKMAKERS
+        ]}},
+        'cifte_sans_oranlari': {'Data': {'oddsList': [
+            {'cid': bookmaker, 'fodds': {'u': _odd(rng, 1.1, 1.6), 'g': _odd(rng, 1.1, 1.6), 'd': _odd(rng, 1.1, 1.6)}}
+            for bookmaker in SYNTHETIC_BOOKMAKERS
+        ]}},
+        'skor_oranlari': {'Data': {'oddsList': [
+            {'cid': bookmaker, 'odds': {f"{h}-{a}": _odd(rng, 5.0, 80.0) for h in range(4) for a in range(4)}}
+            for bookmaker in SYNTHETIC_BOOKMAKERS
+        ]}},
+        'match_statistics': {'home': {'last_10': last_10()}, 'away': {'last_10': last_10()}},
+        'h2h_matches': {
+            'matches': [
+                {
+                    'date': f"{rng.randint(2015, 2024)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                    'league': rng.choice(SYNTHETIC_LEAGUES),
+                    'home_team': home_team,
+                    'away_team': away_team,
+                    'score': f"{rng.randint(0, 4)}-{rng.randint(0, 4)}",
+                    'ht_score': f"{rng.randint(0, 2)}-{rng.randint(0, 2)}",
+                    'corners': f"{rng.randint(0, 10)}-{rng.randint(0, 10)}",
+                    'ht_corners': f"{rng.randint(0, 5)}-{rng.randint(0, 5)}"
+                }
+                for _ in range(5)
+            ],
+            'statistics': {
+                'total_matches': 5, 'over_25': rng.randint(0, 5), 'btts': rng.randint(0, 5),
+                'ht_over_05': rng.randint(0, 5), 'over_35': rng.randint(0, 5), 'over_15': rng.randint(0, 5),
+                'ht_over_15': rng.randint(0, 5), 'home_wins': 2, 'away_wins': 2, 'draws': 1
+            }
+        },
+        'poisson': {'poisson': {
+            dist_type: {str(goals): round(rng.uniform(0, 0.4), 3) for goals in range(6)}
+            for dist_type in ('home', 'away', 'home_ht', 'away_ht')
+        }},
+        'score': {
+            'home_score': str(home_goals),
+            'away_score': str(away_goals),
+            'ht_score': f"{ht_home}-{ht_away}"
+        }
+    }
+
+class StubApi:
+    """soccer API'nin /fetch-matches ve /analyze-match uç noktalarının yerel taklidi
+
+    Yanıtlar kayıtlı dosyalardan (fixtures dizini veya yanıt arşivi) ya da
+    sentetik olarak üretilir. Gecikme, hata enjeksiyonu ve hız sınırı
+    (match_id, deneme) ikilisine göre tohumlanır; istek sırası değişse de
+    aynı istek aynı sonucu alır.
+    """
+
+    def __init__(self, matches_per_day: int = 100, seed: int = 0,
+                 fetch_latency: str = '0', analyze_latency: str = '0',
+                 error_rate: float = 0.0, timeout_rate: float = 0.0, malformed_rate: float = 0.0,
+                 error_status: int = 503, hang_seconds: float = 120.0,
+                 max_rps: float = None, max_concurrent: int = None,
+                 fixtures_dir: str = None, archive_dir: str = None):
+        self.matches_per_day = matches_per_day
+        self.seed = seed
+        self.fetch_latency = parse_latency(fetch_latency)
+        self.analyze_latency = parse_latency(analyze_latency)
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.malformed_rate = malformed_rate
+        self.error_status = error_status
+        self.hang_seconds = hang_seconds
+        self.max_rps = max_rps
+        self._tokens = float(max_rps or 0)
+        self._tokens_updated = time.monotonic()
+        self._semaphore = asyncio.Semaphore(max_concurrent) if max_concurrent else None
+        self._attempts = defaultdict(int)
+        self.stats = defaultdict(int)
+
+        # Kayıtlı yanıtlar: tarih -> maç listesi, match_id -> analiz
+        self.recorded_matches: Dict[str, List[list]] = {}
+        self.recorded_analyses: Dict[int, Dict[str, Any]] = {}
+        if fixtures_dir:
+            self._load_fixtures(fixtures_dir)
+        if archive_dir:
+            self._load_archive(archive_dir)
+
+    def _load_fixtures(self, fixtures_dir: str):
+        """fixtures/fetch-matches/<tarih>.json ve fixtures/analyze-match/<id>.json dosyalarını okur"""
+        matches_dir = os.path.join(fixtures_dir, 'fetch-matches')
+        analyses_dir = os.path.join(fixtures_dir, 'analyze-match')
+        if os.path.isdir(matches_dir):
+            for name in os.listdir(matches_dir):
+                with open(os.path.join(matches_dir, name), encoding='utf-8') as f:
+                    self.recorded_matches[os.path.splitext(name)[0]] = json.load(f)
+        if os.path.isdir(analyses_dir):
+            for name in os.listdir(analyses_dir):
+                with open(os.path.join(analyses_dir, name), encoding='utf-8') as f:
+                    self.recorded_analyses[int(os.path.splitext(name)[0])] = json.load(f)
+        logging.info(f"Fixture yüklendi: {len(self.recorded_matches)} gün, {len(self.recorded_analyses)} analiz")
+
+    def _load_archive(self, archive_dir: str):
+        """Yanıt arşivindeki en yeni analizleri kayıtlı yanıt olarak kullanır"""
+        from database import format_date
+
+        store = PayloadStore(archive_dir)
+        for match_id, _, digest, codec in store.latest_entries():
+            payload = store.load(digest, codec)
+            self.recorded_analyses[match_id] = payload
+            info = payload.get('info', {})
+            try:
+                date_str = format_date(info['mac_tarihi'])
+            except (KeyError, ValueError):
+                continue
+            self.recorded_matches.setdefault(date_str, []).append(
+                [match_id, info.get('mac_saati'), info.get('lig'), info.get('mac')]
+            )
+        logging.info(f"Arşivden {len(self.recorded_analyses)} analiz yüklendi")
+
+    def _take_token(self) -> Optional[float]:
+        """Hız sınırı aşılmadıysa None, aşıldıysa Retry-After süresini döndürür"""
+        if not self.max_rps:
+            return None
+        now = time.monotonic()
+        self._tokens = min(self.max_rps, self._tokens + (now - self._tokens_updated) * self.max_rps)
+        self._tokens_updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return None
+        return (1 - self._tokens) / self.max_rps
+
+    async def _respond(self, endpoint: str, key: Any, latency: Callable[[random.Random], float],
+                       build: Callable[[], Dict[str, Any]]) -> web.Response:
+        """Gecikme ve hata enjeksiyonunu uygulayıp yanıtı döndürür"""
+        self.stats[f"{endpoint}_requests"] += 1
+        attempt = self._attempts[(endpoint, key)]
+        self._attempts[(endpoint, key)] += 1
+        rng = random.Random(f"{self.seed}:{endpoint}:{key}:{attempt}")
+
+        retry_after = self._take_token()
+        if retry_after is not None:
+            self.stats['rate_limited'] += 1
+            return web.json_response({'status': 'error', 'message': 'rate limited'}, status=429,
+                                     headers={'Retry-After': f"{retry_after:.2f}"})
+
+        roll = rng.random()
+        if roll < self.timeout_rate:
+            # İstemci zaman aşımına uğrayana kadar yanıt verme
+            self.stats['timeouts'] += 1
+            await asyncio.sleep(self.hang_seconds)
+            return web.json_response({'status': 'error', 'message': 'timeout'}, status=504)
+        roll -= self.timeout_rate
+
+        await asyncio.sleep(latency(rng))
+
+        if roll < self.error_rate:
+            self.stats['errors'] += 1
+            return web.json_response({'status': 'error', 'message': 'injected failure'}, status=self.error_status)
+        roll -= self.error_rate
+
+        body = json.dumps(build(), ensure_ascii=False)
+        if roll < self.malformed_rate:
+            self.stats['malformed'] += 1
+            body = body[:max(1, len(body) // 2)]
+        return web.Response(text=body, content_type='application/json')
+
+    async def _limited(self, coro):
+        if self._semaphore is None:
+            return await coro
+        async with self._semaphore:
+            return await coro
+
+    async def handle_fetch_matches(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        date_str = data.get('date', '')
+
+        def build() -> Dict[str, Any]:
+            if date_str in self.recorded_matches:
+                matches = self.recorded_matches[date_str]
+            else:
+                matches = [[match_id] for match_id in synthetic_match_ids(date_str, self.matches_per_day)]
+            return {'status': 'success', 'data': matches}
+
+        return await self._limited(self._respond('fetch-matches', date_str, self.fetch_latency, build))
+
+    async def handle_analyze_match(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        match_id = int(data['match_id'])
+
+        def build() -> Dict[str, Any]:
+            if match_id in self.recorded_analyses:
+                return {'status': 'success', 'data': self.recorded_analyses[match_id]}
+            # Sentetik ID'lerin ilk 6 hanesi tarihi taşır
+            date_digits = f"{match_id // 100000:06d}"
+            date_str = f"20{date_digits[:2]}-{date_digits[2:4]}-{date_digits[4:6]}"
+            return {'status': 'success', 'data': synthetic_analysis(match_id, date_str, self.seed)}
+
+        return await self._limited(self._respond('analyze-match', match_id, self.analyze_latency, build))
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(dict(self.stats))
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post('/fetch-matches', self.handle_fetch_matches)
+        app.router.add_post('/analyze-match', self.handle_analyze_match)
+        app.router.add_get('/stats', self.handle_stats)
+        return app
+
+async def start_stub_server(stub: StubApi, host: str = STUB_HOST, port: int = STUB_PORT) -> web.AppRunner:
+    """Sunucuyu mevcut event loop'ta başlatır; kapatmak için runner.cleanup() çağrılır"""
+    runner = web.AppRunner(stub.make_app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logging.info(f"Yerel API sunucusu çalışıyor: http://{host}:{port}")
+    return runner
+
+def stub_env(host: str = STUB_HOST, port: int = STUB_PORT) -> Dict[str, str]:
+    """bot.py ve result.py'yi yerel sunucuya yönlendiren ortam değişkenleri"""
+    base_url = f"http://{host}:{port}"
+    return {
+        'FETCH_MATCHES_URL': f"{base_url}/fetch-matches",
+        'ANALYZE_MATCH_URL': f"{base_url}/analyze-match",
+        'API_URL': base_url
+    }
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler()]
+    )
+
+    parser = argparse.ArgumentParser(description="soccer API için yerel test sunucusu")
+    parser.add_argument('--host', default=STUB_HOST)
+    parser.add_argument('--port', type=int, default=STUB_PORT)
+    parser.add_argument('--matches-per-day', type=int, default=100, help="Sentetik günlük maç sayısı")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--fetch-latency', default='0', help="Örn. 0.5, uniform:0.2,1.0")
+    parser.add_argument('--analyze-latency', default='0', help="Örn. lognormal:0.2,0.5, exp:0.3")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="5xx döndürülen istek oranı")
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--timeout-rate', type=float, default=0.0, help="Yanıt verilmeyen istek oranı")
+    parser.add_argument('--hang-seconds', type=float, default=120.0)
+    parser.add_argument('--malformed-rate', type=float, default=0.0, help="Bozuk JSON döndürülen istek oranı")
+    parser.add_argument('--max-rps', type=float, default=None, help="Aşılınca 429 + Retry-After döner")
+    parser.add_argument('--max-concurrent', type=int, default=None, help="Aynı anda işlenen istek sınırı")
+    parser.add_argument('--fixtures', default=None, help="Kayıtlı yanıtların bulunduğu dizin")
+    parser.add_argument('--archive', default=None, help="Yanıt arşivi dizini (payload_archive)")
+    args = parser.parse_args()
+
+    stub = StubApi(
+        matches_per_day=args.matches_per_day, seed=args.seed,
+        fetch_latency=args.fetch_latency, analyze_latency=args.analyze_latency,
+        error_rate=args.error_rate, timeout_rate=args.timeout_rate, malformed_rate=args.malformed_rate,
+        error_status=args.error_status, hang_seconds=args.hang_seconds,
+        max_rps=args.max_rps, max_concurrent=args.max_concurrent,
+        fixtures_dir=args.fixtures, archive_dir=args.archive
+    )
+    for name, value in stub_env(args.host, args.port).items():
+        print(f"export {name}={value}")
+    web.run_app(stub.make_app(), host=args.host, port=args.port, access_log=None)
@@ -1,4 +1,5 @@
-import sqlite3
+from archive import query_all
+from queries import build_match_data_query
 import pandas as pd
 import logging
 from datetime import datetime
@@ -13,51 +14,13 @@ load_dotenv()
 # Türkiye saat dilimi
 TR_TIMEZONE = pytz.timezone('Europe/Istanbul')
 
-def get_db_connection():
-    """Veritabanı bağlantısı oluşturur"""
-    logging.debug("Veritabanı bağlantısı oluşturuluyor...")
-    return sqlite3.connect('soccer_analysis.db')
-
 def get_match_data(start_date: str = None, end_date: str = None) -> List[Dict[str, Any]]:
     """Veritabanından maç verilerini alır"""
     logging.info("🔍 Maç verileri alınıyor...")
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        query = """
-        SELECT 
-            m.match_date,
-            m.league,
-            m.home_team,
-            m.away_team,
-            p.over_prediction,
-            p.btts_prediction,
-            p.match_result_prediction,
-            p.ht_goal_prediction,
-            p.risky_prediction,
-            ms.ht_home_score,
-            ms.ht_away_score,
-            ms.home_score,
-            ms.away_score
-        FROM matches m
-        LEFT JOIN predictions p ON m.match_id = p.match_id
-        LEFT JOIN match_scores ms ON m.match_id = ms.match_id
-        WHERE ms.home_score IS NOT NULL
-        """
-        
-        params = []
-        if start_date:
-            query += " AND m.match_date >= ?"
-            params.append(start_date)
-        if end_date:
-            query += " AND m.match_date <= ?"
-            params.append(end_date)
-            
-        query += " ORDER BY m.match_date DESC, m.match_time ASC"
-        
-        cursor.execute(query, params)
-        matches = cursor.fetchall()
+        # Ana veritabanı ve aralıktaki aylık arşivler birlikte sorgulanır
+        query, params = build_match_data_query(start_date, end_date)
+        matches = query_all(query, params, start_date, end_date)
         
         result = []
         for match in matches:
@@ -82,9 +45,6 @@ def get_match_data(start_date: str = None, end_date: str = None) -> List[Dict[st
     except Exception as e:
         logging.error(f"❌ Maç verileri alınırken hata: {str(e)}")
         return []
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
 def export_to_excel(matches: List[Dict[str, Any]], filename: str = None) -> bool:
     """Maç verilerini Excel dosyasına aktarır"""
@@ -0,0 +1,65 @@
+import os
+from datetime import datetime, timedelta
+
+import archive
+from database import insert_matches_batch
+from db_connection import connect
+from migrations import migrate
+from stub_api import synthetic_analysis, synthetic_match_ids
+
+MATCH_DATA_QUERY = """
+    SELECT m.match_id, m.match_date, l.name, ht.name, at.name, p.over_prediction, o.ms1_closing,
+           (SELECT COUNT(*) FROM h2h_matches h WHERE h.match_id = m.match_id)
+    FROM matches m
+    JOIN leagues l ON l.league_id = m.league_id
+    JOIN teams ht ON ht.team_id = m.home_team_id
+    JOIN teams at ON at.team_id = m.away_team_id
+    LEFT JOIN predictions p ON p.match_id = m.match_id
+    LEFT JOIN odds o ON o.match_id = m.match_id
+        AND o.bookmaker_id = (SELECT bookmaker_id FROM bookmakers WHERE name = 'Bet365')
+    WHERE m.match_date BETWEEN ? AND ?
+    ORDER BY m.match_date DESC, m.match_id
+"""
+
+def test_query_all_matches_hot_database_after_archiving(tmp_path):
+    db_path = str(tmp_path / 'soccer_analysis.db')
+    archive_dir = str(tmp_path / 'db_archive')
+    today = datetime.now()
+    # İki eski ay arşive taşınır, bugünün maçları ana veritabanında kalır
+    dates = [(today - timedelta(days=days)).strftime("%Y-%m-%d") for days in (200, 160, 0)]
+
+    conn = connect(db_path)
+    try:
+        migrate(conn)
+        for date_str in dates:
+            insert_matches_batch(conn, [synthetic_analysis(match_id, date_str)
+                                        for match_id in synthetic_match_ids(date_str, 20)])
+        params = [dates[0], dates[-1]]
+        before = conn.execute(MATCH_DATA_QUERY, params).fetchall()
+    finally:
+        conn.close()
+
+    # Arşiv dosyası kendi sözlük ID'lerini atar; ana veritabanındakilerle çakışmamalı
+    os.makedirs(archive_dir)
+    archive_conn = connect(archive.archive_path(dates[0][:7], archive_dir))
+    try:
+        migrate(archive_conn)
+        archive_conn.execute("INSERT INTO bookmakers (name) VALUES ('Betfair')")
+        archive_conn.execute("INSERT INTO teams (name) VALUES ('Takım 999999')")
+        archive_conn.commit()
+    finally:
+        archive_conn.close()
+
+    stats = archive.archive_old_matches(90, archive_dir, db_path)
+    assert sum(stats.values()) == 40
+
+    after = archive.query_all(MATCH_DATA_QUERY, params, dates[0], dates[-1], archive_dir, db_path)
+    assert after == before
+
+    hot = connect(db_path)
+    try:
+        assert hot.execute("SELECT COUNT(*) FROM matches").fetchone()[0] == 20
+        assert hot.execute("SELECT COUNT(*) FROM odds_history WHERE match_id NOT IN "
+                           "(SELECT match_id FROM matches)").fetchone()[0] == 0
+    finally:
+        hot.close()
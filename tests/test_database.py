@@ -0,0 +1,24 @@
+from database import insert_matches_batch
+from db_connection import connect
+from migrations import migrate
+from stub_api import synthetic_analysis
+
+def test_rows_without_bookmaker_are_not_duplicated(tmp_path):
+    match_id = 24030500001
+    conn = connect(str(tmp_path / 'soccer_analysis.db'))
+    try:
+        migrate(conn)
+        match = synthetic_analysis(match_id, '2024-03-05')
+        corner_list = match['korner_oranlari']['Data']['oddsList']
+        corner_list[0]['cn'] = ''
+        del corner_list[1]['cn']
+
+        for _ in range(3):
+            result = insert_matches_batch(conn, [match])
+            assert result['written'] == [match_id]
+
+        assert conn.execute("SELECT COUNT(*) FROM corner_odds WHERE bookmaker_id IS NULL").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM corner_odds WHERE match_id = ?",
+                            (match_id,)).fetchone()[0] == len(corner_list) - 2
+    finally:
+        conn.close()
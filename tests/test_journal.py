@@ -0,0 +1,43 @@
+from journal import IngestJournal, PENDING, IN_FLIGHT, DONE, FAILED, SKIPPED
+
+RUN_ID = '2024-03-05'
+
+def test_resume_after_crash_continues_unfinished_matches(tmp_path):
+    path = str(tmp_path / 'ingest_journal.db')
+
+    journal = IngestJournal(path)
+    assert journal.start_run(RUN_ID, RUN_ID) is False
+    journal.register(RUN_ID, [1, 2, 3, 4, 5])
+    journal.mark_skipped(RUN_ID, [5])
+    journal.mark_in_flight(RUN_ID, 1)
+    journal.mark_done(RUN_ID, 1)
+    journal.mark_in_flight(RUN_ID, 2)
+    journal.mark_failed(RUN_ID, 2, "HTTP 500")
+    journal.mark_in_flight(RUN_ID, 3)
+    # Çökme: 3 yarıda kaldı, 4 hiç başlamadı, finish_run çağrılmadı
+    journal.close()
+
+    journal = IngestJournal(path)
+    try:
+        assert journal.start_run(RUN_ID, RUN_ID) is True
+        assert not journal.is_complete(RUN_ID)
+        assert journal.match_ids(RUN_ID, [PENDING, IN_FLIGHT]) == [3, 4]
+        assert journal.match_ids(RUN_ID, [FAILED]) == [2]
+
+        # Tekrar kaydetme mevcut durumları ezmez
+        journal.register(RUN_ID, [1, 2, 3, 4, 5])
+        assert journal.match_ids(RUN_ID, [DONE, SKIPPED]) == [1, 5]
+
+        for match_id in (3, 4):
+            journal.mark_in_flight(RUN_ID, match_id)
+            journal.mark_done(RUN_ID, match_id)
+        journal.finish_run(RUN_ID)
+        assert journal.is_complete(RUN_ID)
+
+        counts = journal.summary(RUN_ID)
+        assert (counts[DONE], counts[FAILED], counts[SKIPPED], counts['total']) == (3, 1, 1, 5)
+        assert journal.conn.execute(
+            "SELECT attempts FROM run_matches WHERE run_id = ? AND match_id = 3", (RUN_ID,)
+        ).fetchone() == (2,)
+    finally:
+        journal.close()
@@ -0,0 +1,81 @@
+from database import create_tables, get_score_odds
+from db_connection import connect
+from migrations import migrate, get_schema_version, LATEST_VERSION
+from odds_history import get_odds_series
+
+MATCH_ID = 24030500001
+
+def _baseline_database(path):
+    """Sürümlemeden önceki (user_version = 0) şemada, eski biçimde verisi olan bir veritabanı"""
+    conn = connect(str(path))
+    conn.execute("BEGIN")
+    create_tables(conn)
+    conn.execute(
+        "INSERT INTO matches (match_id, match_date, match_time, league, home_team, away_team) "
+        "VALUES (?, '2024-03-05', '20:00', 'English Premier League', 'Arsenal', 'Chelsea')", (MATCH_ID,)
+    )
+    conn.execute(
+        "INSERT INTO predictions (match_id, over_prediction, ht_goal_prediction) VALUES (?, '2.5 Üst', 'İY 0.5 Üst')",
+        (MATCH_ID,)
+    )
+    conn.execute(
+        "INSERT INTO percentages (match_id, home_goal_percent, over_05_ht_percent, over_15_ht_percent, "
+        "match_result_percents) VALUES (?, '71%', '80%', '', '45%-30%-25%')", (MATCH_ID,)
+    )
+    # Aynı bahis şirketi için tekrar eden satırlar: migration 3 en yenisini bırakır
+    for closing in ('2.10', '2.25'):
+        conn.execute(
+            "INSERT INTO odds (match_id, bookmaker, ms1_closing, msx_closing, ms2_closing, closing_goalline_ht) "
+            "VALUES (?, 'Bet365', ?, '3.40', '3.10', 1.25)", (MATCH_ID, closing)
+        )
+    conn.execute(
+        "INSERT INTO corner_odds (match_id, bookmaker, over_value, over_line, under_value, is_live) "
+        "VALUES (?, 'Pinnacle', 1.9, 9.5, 1.95, 0)", (MATCH_ID,)
+    )
+    for score_type, value in (('h1', 7.5), ('d1', 9.0), ('g1', 11.0)):
+        conn.execute("INSERT INTO score_odds (match_id, bookmaker, score_type, odds_value) VALUES (?, 'Bet365', ?, ?)",
+                     (MATCH_ID, score_type, value))
+    conn.execute(
+        "INSERT INTO h2h_matches (match_id, game_date, league, home_team, away_team, score) "
+        "VALUES (?, '2023-10-21', 'English Premier League', 'Chelsea', 'Arsenal', '2-2')", (MATCH_ID,)
+    )
+    conn.commit()
+    return conn
+
+def test_migrates_baseline_database_to_latest(tmp_path):
+    conn = _baseline_database(tmp_path / 'baseline.db')
+    try:
+        assert get_schema_version(conn) == 0
+        assert migrate(conn) == LATEST_VERSION
+        assert get_schema_version(conn) == LATEST_VERSION
+
+        assert conn.execute("""
+            SELECT l.name, l.is_major, ht.name, at.name FROM matches m
+            JOIN leagues l ON l.league_id = m.league_id
+            JOIN teams ht ON ht.team_id = m.home_team_id
+            JOIN teams at ON at.team_id = m.away_team_id
+        """).fetchall() == [('English Premier League', 1, 'Arsenal', 'Chelsea')]
+
+        assert conn.execute(
+            "SELECT home_goal_percent, over_05_ht_percent, over_15_ht_percent, match_result_percents FROM percentages"
+        ).fetchone() == (71, 80, None, '45%-30%-25%')
+        assert conn.execute("SELECT ms1_closing, msx_closing FROM odds").fetchall() == [(2.25, 3.4)]
+
+        score_types, odds = get_score_odds(conn, MATCH_ID)['Bet365']
+        assert score_types == ['h1', 'd1', 'g1']
+        assert list(odds) == [7.5, 9.0, 11.0]
+
+        assert conn.execute(
+            "SELECT league, has_any_prediction, is_major_league, ht_eligible FROM daily_predictions"
+        ).fetchall() == [('English Premier League', 1, 1, 1)]
+
+        series = get_odds_series(conn, MATCH_ID, bookmaker='Bet365', market='ms')[('Bet365', 'ms')]
+        assert list(series['ms1_closing']) == [2.25]
+
+        assert conn.execute("PRAGMA foreign_key_check").fetchall() == []
+        assert conn.execute("PRAGMA integrity_check").fetchone() == ('ok',)
+
+        # Güncel veritabanında tekrar çalıştırmak bir şey değiştirmez
+        assert migrate(conn) == LATEST_VERSION
+    finally:
+        conn.close()
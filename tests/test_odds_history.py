@@ -0,0 +1,80 @@
+import copy
+import math
+import random
+
+import numpy as np
+
+from database import insert_matches_batch
+from db_connection import connect
+from migrations import migrate
+from odds_history import encode_deltas, apply_deltas, get_odds_series
+from stub_api import synthetic_analysis
+
+def test_delta_round_trip():
+    rng = random.Random(7)
+    state = [None, None, None]
+    replayed = [None, None, None]
+    for _ in range(2000):
+        current = [rng.choice([None, rng.randint(-5000, 1_000_000)]) if rng.random() < 0.3 else value
+                   for value in state]
+        blob = encode_deltas(tuple(state), tuple(current))
+        if current == state:
+            assert blob is None
+            continue
+        assert apply_deltas(replayed, blob) == current
+        state = current
+
+def test_unchanged_values_encode_to_nothing():
+    assert encode_deltas((2100, None, 3400), (2100, None, 3400)) is None
+
+def test_write_path_records_movements(tmp_path):
+    match_id = 24030500001
+    conn = connect(str(tmp_path / 'history.db'))
+    try:
+        migrate(conn)
+        match = synthetic_analysis(match_id, '2024-03-05')
+        insert_matches_batch(conn, [match])
+        # Aynı yanıtla yenileme geçmişe satır eklemez
+        insert_matches_batch(conn, [match])
+
+        moved = copy.deepcopy(match)
+        first_price = float(match['bahis_oranlari']['Bet365']['kapanis']['kapanis_ms1'])
+        moved['bahis_oranlari']['Bet365']['kapanis']['kapanis_ms1'] = f"{first_price + 0.05:.2f}"
+        moved['bahis_oranlari']['Bet365']['kapanis']['kapanis_msx'] = ''
+        insert_matches_batch(conn, [moved])
+
+        series = get_odds_series(conn, match_id, bookmaker='Bet365', market='ms')[('Bet365', 'ms')]
+        assert series['observed_at'].dtype == np.int64 and series['ms1_closing'].dtype == np.float64
+        assert len(series['observed_at']) == 2
+        assert series['observed_at'][0] < series['observed_at'][1]
+        assert list(series['ms1_closing']) == [first_price, round(first_price + 0.05, 2)]
+        assert not math.isnan(series['msx_closing'][0]) and math.isnan(series['msx_closing'][1])
+
+        # Değişmeyen bahis şirketlerinin serisi tek gözlemde kalır
+        other = get_odds_series(conn, match_id, bookmaker='Pinnacle', market='ms')[('Pinnacle', 'ms')]
+        assert len(other['observed_at']) == 1
+    finally:
+        conn.close()
+
+def test_rebuild_uses_archived_fetch_time(tmp_path, monkeypatch):
+    import database
+    import payload_store
+
+    db_path = str(tmp_path / 'soccer_analysis.db')
+    monkeypatch.setattr(database, 'create_connection', lambda: connect(db_path))
+    store = payload_store.PayloadStore(str(tmp_path / 'payload_archive'))
+    fetched = {24030500001: 1709640000.0, 24030500002: 1709650000.5}
+    for match_id, fetched_at in fetched.items():
+        store.put(match_id, synthetic_analysis(match_id, '2024-03-05'), fetched_at=fetched_at)
+
+    stats = payload_store.rebuild_database(store, workers=1)
+    assert stats == {'successful': 2, 'failed': 0}
+
+    conn = connect(db_path)
+    try:
+        for match_id, fetched_at in fetched.items():
+            observed = {int(value) for points in get_odds_series(conn, match_id).values()
+                        for value in points['observed_at']}
+            assert observed == {int(fetched_at * 1000)}
+    finally:
+        conn.close()
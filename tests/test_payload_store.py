@@ -0,0 +1,33 @@
+import os
+import time
+import concurrent.futures
+
+import payload_store
+from payload_store import PayloadStore
+
+PAYLOAD = {'info': {'id': 1, 'mac': 'Arsenal - Chelsea'}, 'score': {'home': 2, 'away': 1}}
+
+def test_concurrent_puts_of_same_payload(tmp_path):
+    store = PayloadStore(str(tmp_path))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        digests = set(executor.map(lambda i: store.put(i, PAYLOAD), range(64)))
+
+    assert len(digests) == 1
+    assert store.get(1) == PAYLOAD
+    prefix_dir = os.path.dirname(store._object_path(digests.pop()))
+    assert not [name for name in os.listdir(prefix_dir) if name.endswith('.tmp')]
+
+def test_evict_keeps_fresh_unindexed_objects(tmp_path):
+    store = PayloadStore(str(tmp_path))
+    digest = store.put(1, PAYLOAD)
+    store._connect().execute("DELETE FROM payloads")
+    store._connect().commit()
+
+    # Index kaydı henüz eklenmemiş yeni bir nesne silinmez
+    assert store.evict()['objects'] == 0
+    assert os.path.exists(store._object_path(digest))
+
+    # Bekleme süresi geçmiş sahipsiz nesne silinir
+    old = time.time() - payload_store.EVICT_GRACE_SECONDS - 60
+    os.utime(store._object_path(digest), (old, old))
+    assert store.evict()['objects'] == 1
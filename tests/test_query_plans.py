@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from database import insert_matches_batch
+from db_connection import connect
+from migrations import migrate
+from query_plans import explain, table_scans, get_hot_queries
+from stub_api import synthetic_analysis, synthetic_match_ids
+
+def test_hot_queries_use_indexes(tmp_path):
+    today = datetime.now().strftime("%Y-%m-%d")
+    conn = connect(str(tmp_path / 'soccer_analysis.db'))
+    try:
+        migrate(conn)
+        insert_matches_batch(conn, [synthetic_analysis(match_id, today)
+                                    for match_id in synthetic_match_ids(today, 50)])
+
+        queries = get_hot_queries(today)
+        assert queries
+        for name, query, params in queries:
+            plan = explain(conn, query, params)
+            assert table_scans(plan) == [], f"{name}: {plan}"
+    finally:
+        conn.close()
@@ -0,0 +1,13 @@
+import copy
+
+from schemas import validate_analyze_match
+from stub_api import synthetic_analysis
+
+def test_validate_returns_normalized_copy():
+    data = synthetic_analysis(24030500001, '2024-03-05')
+    data['info']['id'] = '24030500001'
+    original = copy.deepcopy(data)
+
+    validated = validate_analyze_match(data)
+    assert validated['info']['id'] == 24030500001
+    assert data == original
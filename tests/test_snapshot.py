@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+
+import snapshot
+from database import insert_matches_batch
+from db_connection import connect
+from migrations import migrate
+from queries import MAJOR_LEAGUE_PREDICTIONS_QUERY
+from query_plans import explain, table_scans
+from stub_api import synthetic_analysis, synthetic_match_ids
+
+def test_snapshot_holds_only_the_days_predictions(tmp_path):
+    db_path = str(tmp_path / 'soccer_analysis.db')
+    snapshot_path = str(tmp_path / 'snapshot.db')
+    today = datetime.now().strftime("%Y-%m-%d")
+    yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+
+    conn = connect(db_path)
+    try:
+        migrate(conn)
+        for date_str in (yesterday, today):
+            insert_matches_batch(conn, [synthetic_analysis(match_id, date_str)
+                                        for match_id in synthetic_match_ids(date_str, 20)])
+        expected = conn.execute(MAJOR_LEAGUE_PREDICTIONS_QUERY, (today,)).fetchall()
+        assert expected
+    finally:
+        conn.close()
+
+    snapshot.publish_snapshot(today, db_path=db_path, snapshot_path=snapshot_path)
+    assert snapshot.get_snapshot_date(snapshot_path) == today
+
+    conn = connect(snapshot_path, immutable=True)
+    try:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        assert tables == {'daily_predictions', 'snapshot_info'}
+        assert conn.execute("SELECT DISTINCT match_date FROM daily_predictions").fetchall() == [(today,)]
+        assert conn.execute(MAJOR_LEAGUE_PREDICTIONS_QUERY, (today,)).fetchall() == expected
+        assert table_scans(explain(conn, MAJOR_LEAGUE_PREDICTIONS_QUERY, [today])) == []
+    finally:
+        conn.close()